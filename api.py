@@ -0,0 +1,416 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from urllib.parse import urlsplit
+import cv2
+import numpy as np
+from models.threat import ThreatVideoDiscriminator
+from models.batcher import DynamicBatcher
+from utils.video_io import open_reader, open_writer
+from utils.custom_logger import custom_logger
+import config
+
+logger = custom_logger(__name__)
+
+GENDER_LABELS = ["Female", "Male"]
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class FileBody:
+    """응답 본문을 메모리에 올리지 않고 파일에서 청크 단위로 보냄"""
+
+    def __init__(self, path: str, chunk: int = 1 << 20):
+        self.path = path
+        self.chunk = chunk
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or REASONS.get(status, ""))
+        self.status = status
+
+
+class Request:
+    """본문은 필요한 핸들러만 읽도록 스트림 상태로 둡니다 (영상 업로드는 디스크로 바로 기록)."""
+
+    def __init__(self, method, path, query, headers, reader):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.reader = reader
+        self.length = int(headers.get("content-length", 0) or 0)
+        self._consumed = False
+
+    async def body(self, max_bytes: int):
+        if self.length > max_bytes:
+            raise HTTPError(413, f"body larger than {max_bytes} bytes")
+        self._consumed = True
+        return await self.reader.readexactly(self.length) if self.length else b""
+
+    async def save_body(self, path: str, max_bytes: int, chunk: int = 1 << 20):
+        if self.length > max_bytes:
+            raise HTTPError(413, f"body larger than {max_bytes} bytes")
+        self._consumed = True
+        remaining = self.length
+        with open(path, "wb") as f:
+            while remaining:
+                data = await self.reader.read(min(chunk, remaining))
+                if not data:
+                    raise HTTPError(400, "incomplete body")
+                f.write(data)
+                remaining -= len(data)
+
+    async def drain(self):
+        if not self._consumed and self.length:
+            await self.reader.readexactly(self.length)
+            self._consumed = True
+
+
+def result_to_json(result):
+    d = result["detections"]
+    genders = result["genders"]
+    return {
+        "boxes": d.boxes.tolist(),
+        "confs": np.round(d.confs, 4).tolist(),
+        "genders": None if genders is None else [GENDER_LABELS[int(g)] for g in genders],
+        "pairs": [{"i": int(i), "j": int(j), "distance": round(float(dist), 2)}
+                  for (i, j), dist in zip(result["pairs"], result["distances"])],
+        "threat": bool(len(result["distances"])),
+    }
+
+
+class ThreatAPI:
+    """
+    asyncio HTTP 추론 API (표준 라이브러리만 사용)
+
+        GET  /health             상태 + 동적 배처 통계
+        POST /analyze            본문: 인코딩된 이미지 (JPEG/PNG) → 박스 / 성별 / 거리 위반 쌍 JSON
+        POST /videos             본문: 영상 파일 → 작업 ID (202). 결과 영상은 백그라운드에서 생성
+        GET  /videos/<id>        작업 상태
+        GET  /videos/<id>/result 결과 영상 (video/mp4, 청크 단위 전송)
+        DELETE /videos/<id>      끝난 작업과 결과 영상 삭제
+
+    끝난 작업은 job_ttl_s 가 지나거나 max_jobs 개를 넘으면 오래된 것부터 결과 영상과 함께 삭제됩니다.
+
+    /analyze 요청과 영상 작업의 프레임은 모두 같은 DynamicBatcher 로 들어가
+    max_wait_ms 안에 모인 것끼리 한 번의 탐지 / 분류 배치로 처리됩니다.
+    """
+
+    def __init__(self, model: ThreatVideoDiscriminator,
+                 max_batch: int = config.API_MAX_BATCH,
+                 max_wait_ms: float = config.API_MAX_WAIT_MS,
+                 output_dir: str = config.API_OUTPUT_DIR,
+                 max_body_mb: int = config.API_MAX_BODY_MB,
+                 max_video_jobs: int = 2,
+                 job_ttl_s: float = config.API_JOB_TTL_S,
+                 max_jobs: int = config.API_MAX_JOBS):
+        self.model = model
+        self.batcher = DynamicBatcher(model.analyze_batch, max_batch, max_wait_ms)
+        self.output_dir = output_dir
+        self.max_body = max_body_mb << 20
+        self.max_video_jobs = max_video_jobs
+        self.job_ttl = job_ttl_s
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self._job_slots = None
+        self._server = None
+
+    async def start(self, host: str, port: int):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.batcher.start()
+        self._job_slots = asyncio.Semaphore(self.max_video_jobs)
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.close()
+
+    # ------------------------------------------------------------------ HTTP
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                try:
+                    status, body, content_type = await self._dispatch(request)
+                except HTTPError as e:
+                    status, body, content_type = e.status, {"error": str(e)}, "application/json"
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    logger.exception("request failed")
+                    status, body, content_type = 500, {"error": str(e)}, "application/json"
+                # 본문 오류 (400 / 413) 나 서버 오류 후에는 연결을 닫음. 그 외에는 남은 본문을 비워 다음 요청을 읽을 수 있게 함
+                keep_alive = request.headers.get("connection", "").lower() != "close" and status not in (400, 413, 500)
+                if keep_alive:
+                    await request.drain()
+                await self._write_response(writer, status, body, content_type, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split()
+        except ValueError:
+            return None
+        headers = {}
+        while True:
+            raw = await reader.readline()
+            if raw in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = raw.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        query = dict(p.partition("=")[::2] for p in url.query.split("&") if p)
+        return Request(method.upper(), url.path.rstrip("/") or "/", query, headers, reader)
+
+    async def _write_response(self, writer, status, body, content_type, keep_alive):
+        if content_type == "application/json":
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        if isinstance(body, FileBody):
+            await self._write_file(writer, status, body, content_type, keep_alive)
+            return
+        writer.write(self._head(status, content_type, len(body), keep_alive) + body)
+        await writer.drain()
+
+    async def _write_file(self, writer, status, body, content_type, keep_alive):
+        loop = asyncio.get_running_loop()
+        # 열어 둔 파일은 전송 중에 작업이 삭제돼도 끝까지 읽을 수 있음
+        with open(body.path, "rb") as f:
+            writer.write(self._head(status, content_type, os.fstat(f.fileno()).st_size, keep_alive))
+            while True:
+                data = await loop.run_in_executor(None, f.read, body.chunk)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        await writer.drain()
+
+    @staticmethod
+    def _head(status, content_type, length, keep_alive):
+        return (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {length}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1")
+
+    async def _dispatch(self, req):
+        self._evict_jobs()
+        parts = [p for p in req.path.split("/") if p]
+        if parts == ["health"]:
+            self._allow(req, "GET")
+            return 200, {"status": "ok", "batcher": self.batcher.stats(),
+                         "jobs": {k: v["status"] for k, v in self.jobs.items()}}, "application/json"
+        if parts == ["analyze"]:
+            self._allow(req, "POST")
+            return 200, await self._analyze(req), "application/json"
+        if parts == ["videos"]:
+            self._allow(req, "POST")
+            return 202, await self._submit_video(req), "application/json"
+        if len(parts) in (2, 3) and parts[0] == "videos":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(404, f"unknown job: {parts[1]}")
+            if len(parts) == 2:
+                self._allow(req, "GET", "DELETE")
+                if req.method == "DELETE":
+                    if job["finished"] is None:
+                        raise HTTPError(409, f"job is {job['status']}")
+                    self._delete_job(job)
+                    return 200, {"deleted": job["id"]}, "application/json"
+                return 200, self._job_view(job), "application/json"
+            if parts[2] == "result":
+                self._allow(req, "GET")
+                if job["status"] != "done":
+                    raise HTTPError(409, f"job is {job['status']}")
+                return 200, FileBody(job["output"]), "video/mp4"
+        raise HTTPError(404, f"no route: {req.method} {req.path}")
+
+    @staticmethod
+    def _allow(req, *methods):
+        if req.method not in methods:
+            raise HTTPError(405, f"{req.method} not allowed")
+
+    # ------------------------------------------------------------- handlers
+    async def _analyze(self, req):
+        data = await req.body(self.max_body)
+        frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise HTTPError(400, "body is not a decodable image")
+        t = time.perf_counter()
+        result = await self.batcher.submit(frame)
+        out = result_to_json(result)
+        out["latency_ms"] = round((time.perf_counter() - t) * 1e3, 2)
+        return out
+
+    async def _submit_video(self, req):
+        if not req.length:
+            raise HTTPError(400, "empty body")
+        job_id = uuid.uuid4().hex[:12]
+        suffix = os.path.splitext(req.query.get("name", ""))[1] or ".mp4"
+        fd, upload = tempfile.mkstemp(prefix=f"upload_{job_id}_", suffix=suffix, dir=self.output_dir)
+        os.close(fd)
+        try:
+            await req.save_body(upload, self.max_body)
+        except BaseException:
+            os.remove(upload)
+            raise
+        job = {"id": job_id, "status": "queued", "frames": 0, "total": None, "error": None,
+               "output": os.path.join(self.output_dir, f"{job_id}.mp4"), "elapsed_s": None, "finished": None}
+        self.jobs[job_id] = job
+        asyncio.get_running_loop().create_task(self._run_video(job, upload))
+        return self._job_view(job)
+
+    @staticmethod
+    def _job_view(job):
+        view = {k: v for k, v in job.items() if k not in ("output", "finished")}
+        view["result"] = f"/videos/{job['id']}/result" if job["status"] == "done" else None
+        return view
+
+    async def _run_video(self, job, upload, chunk: int = 8):
+        loop = asyncio.get_running_loop()
+        async with self._job_slots:
+            job["status"] = "running"
+            t = time.perf_counter()
+            cap = writer = None
+            try:
+                cap = open_reader(upload, backend=self.model.video_backend)
+                if not cap.isOpened():
+                    raise RuntimeError("Cannot open uploaded video")
+                job["total"] = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+                fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+                size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+                writer = open_writer(job["output"], fps, size, backend=self.model.video_backend,
+                                     **self.model.video_options)
+                while True:
+                    frames = await loop.run_in_executor(None, self._read_chunk, cap, chunk)
+                    if not frames:
+                        break
+                    # 같은 배처로 보내 /analyze 요청과 함께 배치됨
+                    results = await asyncio.gather(*(self.batcher.submit(f) for f in frames))
+                    await loop.run_in_executor(None, self._draw_chunk, writer, frames, results)
+                    job["frames"] += len(frames)
+                job["status"] = "done"
+            except Exception as e:
+                logger.exception(f"video job {job['id']} failed")
+                job["status"], job["error"] = "failed", str(e)
+            finally:
+                if cap is not None:
+                    cap.release()
+                if writer is not None:
+                    writer.release()
+                os.remove(upload)
+                job["elapsed_s"] = round(time.perf_counter() - t, 3)
+                job["finished"] = time.monotonic()
+
+    def _delete_job(self, job):
+        self.jobs.pop(job["id"], None)
+        try:
+            os.remove(job["output"])
+        except FileNotFoundError:
+            pass
+
+    def _evict_jobs(self):
+        """보관 시간이 지난 끝난 작업과, max_jobs 를 넘는 가장 오래된 끝난 작업을 결과 영상과 함께 삭제"""
+        finished = sorted((j for j in self.jobs.values() if j["finished"] is not None), key=lambda j: j["finished"])
+        now = time.monotonic()
+        for k, job in enumerate(finished):
+            if now - job["finished"] > self.job_ttl or len(finished) - k > self.max_jobs:
+                self._delete_job(job)
+
+    @staticmethod
+    def _read_chunk(cap, n):
+        frames = []
+        while len(frames) < n:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        return frames
+
+    def _draw_chunk(self, writer, frames, results):
+        for frame, res in zip(frames, results):
+            d, pairs = res["detections"], res["pairs"]
+            writer.write(self.model.analyzer.draw(frame, d.boxes, res["genders"], d.centers,
+                                                  (pairs[:, 0], pairs[:, 1], res["distances"])))
+
+
+async def serve(api: ThreatAPI, host: str, port: int):
+    server = await api.start(host, port)
+    logger.info(f"🚀 http://{host}:{port} (max_batch={api.batcher.max_batch}, "
+                f"max_wait={api.batcher.max_wait * 1e3:.0f}ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await api.close()
+
+
+def main():
+    """
+    위협 분석 HTTP API 서버
+
+    사용법:
+        python api.py --port 8000 [--max-batch 16] [--max-wait-ms 10]
+
+        curl -X POST --data-binary @frame.jpg http://127.0.0.1:8000/analyze
+        curl -X POST --data-binary @assets/threat_1.mp4 http://127.0.0.1:8000/videos
+        curl http://127.0.0.1:8000/videos/<id>
+        curl -o result.mp4 http://127.0.0.1:8000/videos/<id>/result
+        curl -X DELETE http://127.0.0.1:8000/videos/<id>
+    """
+    parser = argparse.ArgumentParser(description='위협 분석 HTTP API (동적 배치)')
+    parser.add_argument('--host', type=str, default=config.API_HOST)
+    parser.add_argument('--port', type=int, default=config.API_PORT)
+    parser.add_argument('--det-model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('--cls-model', type=str, default=config.CLS_MODEL_PATH)
+    parser.add_argument('--no-cls', action='store_true', help='성별 분류 없이 사람 탐지 + 거리 위협 판단만 수행')
+    parser.add_argument('--backend', type=str, choices=['torch', 'onnxruntime', 'openvino'], default='torch')
+    parser.add_argument('--int8-cls', action='store_true', help='quantize.py 로 만든 INT8 성별 분류기 사용')
+    parser.add_argument('--max-batch', type=int, default=config.API_MAX_BATCH, help='동적 배치 최대 크기')
+    parser.add_argument('--max-wait-ms', type=float, default=config.API_MAX_WAIT_MS,
+                        help='첫 요청 이후 배치를 모으는 최대 대기 시간 (ms)')
+    parser.add_argument('-o', '--output', type=str, default=config.API_OUTPUT_DIR, help='영상 작업 결과 디렉토리')
+    parser.add_argument('--job-ttl', type=float, default=config.API_JOB_TTL_S,
+                        help='끝난 영상 작업 / 결과 파일 보관 시간 (초)')
+    parser.add_argument('--max-jobs', type=int, default=config.API_MAX_JOBS,
+                        help='보관할 끝난 영상 작업 최대 수 (넘으면 오래된 것부터 삭제)')
+    parser.add_argument('--video-backend', type=str, choices=['auto', 'pyav', 'ffmpeg', 'opencv'],
+                        default=config.VIDEO_BACKEND, help='영상 작업의 디코드 / 인코드 백엔드')
+    parser.add_argument('--codec', type=str, default=config.VIDEO_CODEC,
+                        help='결과 영상 인코더 (pyav / ffmpeg: libx264, libx265, h264_nvenc ..., opencv: mp4v 등 FourCC)')
+    parser.add_argument('--crf', type=int, default=config.VIDEO_CRF, help='결과 영상 품질 (낮을수록 고화질)')
+    parser.add_argument('--preset', type=str, default=config.VIDEO_PRESET, help='인코딩 속도 프리셋 (ultrafast ~ veryslow)')
+    args = parser.parse_args()
+
+    model = ThreatVideoDiscriminator(use_classifier=not args.no_cls, fast_detector=True,
+                                     det_model_path=args.det_model, cls_model_path=args.cls_model,
+                                     backend=args.backend, quantized_classifier=args.int8_cls,
+                                     video_backend=args.video_backend,
+                                     video_options=dict(codec=args.codec, crf=args.crf, preset=args.preset))
+    api = ThreatAPI(model, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, output_dir=args.output,
+                    job_ttl_s=args.job_ttl, max_jobs=args.max_jobs)
+    try:
+        asyncio.run(serve(api, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
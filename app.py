@@ -1,27 +1,54 @@
+import os
 import streamlit as st
-import tempfile
+import threading
 import time
-import cv2
+from models.live import LiveAnalysisWorker, UploadSpool, peak_rss_mb
 from models.threat import ThreatVideoDiscriminator
-from scipy.spatial.distance import cdist
+
+
+@st.cache_resource
+def load_processor(use_classifier: bool):
+    """모델은 프로세스 전체에서 한 번만 로드 (rerun / 세션 간 공유)"""
+    return ThreatVideoDiscriminator(use_classifier=use_classifier)
+
+
+@st.cache_resource
+def inference_lock():
+    """공유 모델을 여러 세션의 분석 스레드가 동시에 쓰지 않도록 하는 락"""
+    return threading.Lock()
+
 
 st.set_page_config(page_title="Threat Analysis", layout="wide")
 st.title("🎥 Threat Video Analyzer")
 
+with st.sidebar:
+    use_classifier = st.checkbox("성별 분류 사용", value=True)
+    display_fps = st.slider("표시 FPS", min_value=5, max_value=60, value=30)
+
 video_file = st.file_uploader("Upload a video file", type=["mp4", "avi", "mov", "mkv", "MOV"])
+# 수 GB 영상은 업로드 대신 서버에 있는 파일 경로를 직접 지정 (복사 없음)
+video_path = st.text_input("또는 서버의 영상 경로", value="").strip()
 analyze_button = st.button("🔍 Run Analysis")
 
 col1, col2, col3 = st.columns(3)
-if video_file and analyze_button:
-    temp_video = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-    temp_video.write(video_file.read())
+if (video_file or video_path) and analyze_button:
+    if video_path and not os.path.isfile(video_path):
+        st.error(f"❌ File not found: {video_path}")
+        st.stop()
+
+    # 업로드는 청크 단위로 임시 파일에 기록하며, 기록 중에도 분석을 시작 (UploadSpool 참고)
+    spool = None
+    if not video_path:
+        suffix = os.path.splitext(video_file.name)[1].lower() or ".mp4"
+        spool = UploadSpool(video_file, suffix=suffix).start()
 
-    processor = ThreatVideoDiscriminator()
-    cap = cv2.VideoCapture(temp_video.name)
+    processor = load_processor(use_classifier)
+    worker = LiveAnalysisWorker(processor, spool or video_path, lock=inference_lock()).start()
 
     with col1:
         st.subheader("🎞️ Live Video Feed")
         video_feed = st.empty()
+        perf_placeholder = st.empty()
 
     with col2:
         st.subheader("👥 Cropped Persons")
@@ -32,56 +59,58 @@ if video_file and analyze_button:
         gauge_placeholder = st.empty()
         message_placeholder = st.empty()
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        boxes, centers = processor.detector.detect(frame)
-        genders = []
-        cropped_imgs = []
-
-        if processor.use_classifier:
-            for (x1, y1, x2, y2) in boxes:
-                crop = frame[y1:y2, x1:x2]
-                cropped_imgs.append(crop)
-                gender = processor.classifier.classify(crop)
-                genders.append(gender)
-        else:
-            genders = None
-
-        annotated = processor.analyzer.draw(frame, boxes, genders, centers)
-
-        # col1 - 실시간 프레임 표시
-        video_feed.image(annotated, channels="BGR")
-        if cropped_imgs:
-            # Resize & Convert to RGB
-            cropped_imgs_fixed = [
-                cv2.cvtColor(cv2.resize(img, (150, 200)), cv2.COLOR_BGR2RGB)
-                for img in cropped_imgs
-            ]
-            cropped_images_area.image(cropped_imgs_fixed, use_container_width=False)
-
-        # col3 - 경고 여부 판단 및 게이지 표시
-        alert = False
-        alert_level = 0 
-
-        if centers is not None and len(centers) >= 2:
-            dist_matrix = cdist(centers, centers, metric='euclidean')
-            for i in range(len(centers)):
-                for j in range(i + 1, len(centers)):
-                    if dist_matrix[i][j] < processor.analyzer.distance_threshold:
-                        alert = True
-                        alert_level = 100
-                        break
-
-        if alert:
-            gauge_placeholder.progress(alert_level, text="🚨 위험: 사람이 너무 가깝습니다!")
-            message_placeholder.markdown("#### 🚨 **거리 임계값을 초과했습니다**")
-        else:
-            gauge_placeholder.progress(alert_level, text="✅ 정상 상태")
-            message_placeholder.markdown("✅ 현재 거리 안전.")
-
-        time.sleep(1 / 30)  # FPS 제한
-
-    cap.release()
-    st.success("✅ Analysis completed!")
+    # 표시 루프: 표시 주기마다 가장 최근 결과만 그림 (추론이 밀리면 중간 프레임은 건너뜀)
+    # rerun / 세션 종료로 스크립트가 중단되어도 finally 에서 분석 스레드와 임시 파일을 정리
+    interval = 1 / display_fps
+    last_seq = -1
+    shown = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            tick = time.perf_counter()
+            finished = worker.done
+            item = worker.ring.latest()
+            if item is not None and item.seq != last_seq:
+                last_seq = item.seq
+                shown += 1
+
+                # col1 - 실시간 프레임 표시
+                video_feed.image(item.annotated, channels="BGR")
+                if item.crops:
+                    cropped_images_area.image(item.crops, use_container_width=False)
+
+                # col3 - 경고 여부 판단 및 게이지 표시
+                if item.alert:
+                    gauge_placeholder.progress(100, text="🚨 위험: 사람이 너무 가깝습니다!")
+                    message_placeholder.markdown("#### 🚨 **거리 임계값을 초과했습니다**")
+                else:
+                    gauge_placeholder.progress(0, text="✅ 정상 상태")
+                    message_placeholder.markdown("✅ 현재 거리 안전.")
+
+            # 실시간 성능 / 메모리 표시
+            stats = worker.stats()
+            progress = f"{stats['processed']}/{stats['total']}" if stats["total"] > 0 else f"{stats['processed']}"
+            readout = (f"⚡ 추론 {stats['fps']:.1f} FPS · 지연 {stats['latency_ms']:.0f} ms · "
+                       f"표시 {shown / (time.perf_counter() - started):.1f} FPS · "
+                       f"건너뜀 {stats['processed'] - shown} · 진행 {progress}")
+            if spool is not None and not spool.finished.is_set():
+                total = f"/{spool.total / (1 << 20):.0f}" if spool.total else ""
+                readout += f" · 업로드 기록 {spool.written / (1 << 20):.0f}{total} MB"
+            peak = peak_rss_mb()
+            if peak is not None:
+                readout += f" · 최대 메모리 {peak:.0f} MB"
+            perf_placeholder.caption(readout)
+
+            if finished:
+                break
+            time.sleep(max(0.0, interval - (time.perf_counter() - tick)))
+    finally:
+        worker.stop()
+        if spool is not None:
+            spool.cleanup()
+
+    if worker.error is not None:
+        st.error(f"❌ Analysis failed: {worker.error}")
+    else:
+        peak = peak_rss_mb()
+        st.success("✅ Analysis completed!" + (f" (최대 메모리 {peak:.0f} MB)" if peak is not None else ""))
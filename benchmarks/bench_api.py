@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import time
+import cv2
+import numpy as np
+from benchmarks.bench_fast_detector import read_frames
+import config
+
+
+class Client:
+    """keep-alive 연결 하나로 요청을 보내는 최소 HTTP/1.1 클라이언트 (표준 라이브러리만 사용)"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b""):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        data = await self.reader.readexactly(length)
+        return status, data
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+async def run_level(host, port, images, concurrency, requests):
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        client = Client(host, port)
+        try:
+            for k in counter:
+                t = time.perf_counter()
+                status, _ = await client.request("POST", "/analyze", images[k % len(images)])
+                latencies.append(time.perf_counter() - t)
+                errors += status != 200
+        finally:
+            await client.close()
+
+    t = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return np.asarray(latencies) * 1e3, time.perf_counter() - t, errors
+
+
+async def health(host, port):
+    client = Client(host, port)
+    try:
+        _, data = await client.request("GET", "/health")
+        return json.loads(data)["batcher"]
+    finally:
+        await client.close()
+
+
+async def bench(args):
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise RuntimeError(f"Cannot read frames from: {args.video}")
+    images = [cv2.imencode(".jpg", f)[1].tobytes() for f in frames]
+
+    await run_level(args.host, args.port, images, 1, 3)  # warmup
+    print(f"{'concurrency':>11} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>10} {'errors':>6}")
+    for c in args.concurrency:
+        before = await health(args.host, args.port)
+        lat, elapsed, errors = await run_level(args.host, args.port, images, c, args.requests)
+        after = await health(args.host, args.port)
+        batches = after["batches"] - before["batches"]
+        mean_batch = len(lat) / batches if batches > 0 else float("nan")
+        print(f"{c:>11d} {len(lat) / elapsed:8.2f} {np.percentile(lat, 50):8.2f} "
+              f"{np.percentile(lat, 99):8.2f} {mean_batch:10.2f} {errors:>6d}")
+
+
+def main():
+    """
+    HTTP API (/analyze) 부하 생성기: 동시 요청 수별 p50 / p99 지연과 처리량, 평균 배치 크기
+
+    사용법:
+        python api.py --port 8000 &
+        python -m benchmarks.bench_api --port 8000 -c 1 4 16 64 -r 256
+    """
+    parser = argparse.ArgumentParser(description='HTTP API 부하 테스트')
+    parser.add_argument('--host', type=str, default=config.API_HOST)
+    parser.add_argument('--port', type=int, default=config.API_PORT)
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH, help='요청 이미지로 쓸 영상')
+    parser.add_argument('-n', '--frames', type=int, default=32, help='요청 이미지로 쓸 프레임 수')
+    parser.add_argument('-c', '--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('-r', '--requests', type=int, default=256, help='동시성 수준별 요청 수')
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import time
+import numpy as np
+import torch
+from models.threat import FastPersonDetector, GenderClassifier
+from benchmarks.bench_fast_detector import read_frames, match_iou
+import config
+
+
+def raw_output(model, img):
+    with torch.inference_mode():
+        out = model(img)
+    out = out[0] if isinstance(out, (list, tuple)) else out
+    return out.float().cpu().numpy()
+
+
+def sample_boxes(frame, n, rng):
+    h, w = frame.shape[:2]
+    x1, y1 = rng.integers(0, w // 2, n), rng.integers(0, h // 2, n)
+    return np.stack([x1, y1, x1 + rng.integers(16, w // 2, n), y1 + rng.integers(32, h // 2, n)], 1)
+
+
+def timed(fn, repeat):
+    fn()
+    t = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t) / repeat
+
+
+def main():
+    """
+    torch / onnxruntime / openvino 백엔드 수치 parity 및 처리량 비교
+
+    사전 준비:
+        python export.py --formats onnx openvino
+
+    사용법:
+        python -m benchmarks.bench_backends -v assets/threat_1.mp4 --backends onnxruntime openvino
+    """
+    parser = argparse.ArgumentParser(description='추론 백엔드 parity / 처리량 비교')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('--det-model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('--cls-model', type=str, default=config.CLS_MODEL_PATH)
+    parser.add_argument('--backends', type=str, nargs='+', choices=['onnxruntime', 'openvino'],
+                        default=['onnxruntime', 'openvino'])
+    parser.add_argument('-n', '--frames', type=int, default=30)
+    parser.add_argument('--crops', type=int, default=16, help='분류기 배치 크기 (프레임당 사람 수)')
+    parser.add_argument('--atol', type=float, default=1e-3, help='raw 출력 최대 절대오차 허용치')
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise RuntimeError(f"Cannot read frames from: {args.video}")
+    rng = np.random.default_rng(0)
+    boxes = [sample_boxes(f, args.crops, rng) for f in frames]
+
+    ref_det = FastPersonDetector(args.det_model, device="cpu")
+    ref_cls = GenderClassifier(args.cls_model, device="cpu")
+    det_img = torch.from_numpy(np.ascontiguousarray(
+        ref_det.letterbox(image=frames[0])[..., ::-1].transpose(2, 0, 1)[None])).float() / 255
+    cls_img = torch.from_numpy(ref_cls._letterbox_crops(
+        [frames[0][y1:y2, x1:x2] for x1, y1, x2, y2 in boxes[0]]).copy()).float() / 255
+
+    ref_det_raw = raw_output(ref_det.model, det_img)
+    ref_cls_raw = raw_output(ref_cls.model, cls_img)
+    ref_dets, t_det = timed(lambda: [ref_det.detect(f) for f in frames], 1)
+    ref_probs, t_cls = timed(lambda: [ref_cls.classify_batch(f, b)[1] for f, b in zip(frames, boxes)], 1)
+
+    n = len(frames)
+    print(f"frames: {n}, crops/frame: {args.crops}")
+    print(f"{'backend':<12} {'det ms/f':>9} {'cls ms/f':>9} {'det max|Δ|':>11} {'cls max|Δ|':>11} "
+          f"{'box IoU≥.9':>11} {'argmax =':>9}")
+    print(f"{'torch':<12} {t_det / n * 1e3:>9.2f} {t_cls / n * 1e3:>9.2f} {'-':>11} {'-':>11} {'-':>11} {'-':>9}")
+
+    failed = False
+    for backend in args.backends:
+        det = FastPersonDetector(args.det_model, device="cpu", backend=backend)
+        cls = GenderClassifier(args.cls_model, device="cpu", backend=backend)
+
+        det_diff = np.abs(raw_output(det.model, det_img) - ref_det_raw).max()
+        cls_diff = np.abs(raw_output(cls.model, cls_img) - ref_cls_raw).max()
+        dets, t_det_b = timed(lambda: [det.detect(f) for f in frames], 1)
+        probs, t_cls_b = timed(lambda: [cls.classify_batch(f, b)[1] for f, b in zip(frames, boxes)], 1)
+
+        n_ref = sum(len(d.boxes) for d in ref_dets)
+        ious = np.concatenate([match_iou(r.boxes, d.boxes) for r, d in zip(ref_dets, dets)] or [np.empty(0)])
+        box_match = (ious >= 0.9).sum() / n_ref if n_ref else 1.0
+        agree = np.mean([(p.argmax(1) == r.argmax(1)).mean() for p, r in zip(probs, ref_probs)])
+
+        print(f"{backend:<12} {t_det_b / n * 1e3:>9.2f} {t_cls_b / n * 1e3:>9.2f} {det_diff:>11.2e} "
+              f"{cls_diff:>11.2e} {box_match * 100:>10.1f}% {agree * 100:>8.1f}%")
+        failed |= det_diff > args.atol or cls_diff > args.atol
+
+    if failed:
+        raise SystemExit(f"❌ parity 실패: raw 출력 오차가 atol={args.atol} 를 초과했습니다")
+    print("✅ parity 통과")
+
+
+if __name__ == "__main__":
+    main()
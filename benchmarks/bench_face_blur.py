@@ -0,0 +1,104 @@
+import argparse
+import time
+import cv2
+import numpy as np
+from models.privacy import HeadMasker, MASK_METHODS, expand_boxes
+from models.threat import HeadDetector
+import config
+
+
+def gaussian_51(frame, boxes):
+    """기존 face_blur.py 의 머리 영역 블러"""
+    for x1, y1, x2, y2 in boxes:
+        frame[y1:y2, x1:x2] = cv2.GaussianBlur(frame[y1:y2, x1:x2], (51, 51), 0)
+    return frame
+
+
+def random_heads(rng, shape, n, size):
+    h, w = shape[:2]
+    xy = rng.integers(0, [w - size, h - size], size=(n, 2))
+    return np.concatenate([xy, xy + size], axis=1)
+
+
+def read_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def main():
+    """
+    머리 영역 익명화 벤치마크
+
+    1) 가리기 커널: 기존 51x51 GaussianBlur vs 모자이크 vs 축소 ROI 블러 (임의 머리 박스, 머리 크기별)
+    2) 전체 단계 (--head-model 또는 realutils 필요): 매 프레임 탐지 + GaussianBlur vs HeadMasker (배치 keyframe)
+
+    사용법:
+        python -m benchmarks.bench_face_blur -v assets/threat_1.mp4 -n 200 [--head-model weights/head.pt] [--interval 4]
+    """
+    parser = argparse.ArgumentParser(description='머리 영역 익명화 벤치마크')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('-n', '--frames', type=int, default=200)
+    parser.add_argument('--heads', type=int, default=20, help='커널 비교에 쓸 프레임당 머리 수')
+    parser.add_argument('--head-model', type=str, default=config.HEAD_MODEL_PATH)
+    parser.add_argument('--interval', type=int, default=config.FACE_BLUR_INTERVAL)
+    parser.add_argument('--batch-frames', type=int, default=config.FACE_BLUR_BATCH)
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise RuntimeError(f"Cannot read frames from: {args.video}")
+    rng = np.random.default_rng(0)
+    height, width = frames[0].shape[:2]
+    print(f"frames: {len(frames)} ({width}x{height}), 프레임당 머리 {args.heads}")
+
+    kernels = {"gaussian51": gaussian_51, **MASK_METHODS}
+    print(f"{'head px':>8} " + " ".join(f"{name:>12}" for name in kernels) + "  (ms/frame)")
+    for size in (32, 64, 128):
+        boxes = [expand_boxes(random_heads(rng, frames[0].shape, args.heads, size), frames[0].shape)
+                 for _ in frames]
+        row = []
+        for fn in kernels.values():
+            work = [f.copy() for f in frames]
+            t = time.perf_counter()
+            for frame, b in zip(work, boxes):
+                fn(frame, b)
+            row.append((time.perf_counter() - t) / len(frames) * 1e3)
+        print(f"{size:>8} " + " ".join(f"{ms:12.3f}" for ms in row))
+
+    try:
+        detector = HeadDetector(args.head_model)
+    except ImportError as e:
+        print(f"전체 단계 비교 건너뜀 (--head-model 또는 realutils 필요): {e}")
+        return
+
+    detector.detect_batch(frames[:2])
+    work = [f.copy() for f in frames]
+    t = time.perf_counter()
+    for frame in work:
+        gaussian_51(frame, detector.detect(frame).boxes)
+    t_legacy = time.perf_counter() - t
+
+    masker = HeadMasker(detector, interval=args.interval)
+    work = [f.copy() for f in frames]
+    t = time.perf_counter()
+    for start in range(0, len(work), args.batch_frames):
+        masker.apply(work[start:start + args.batch_frames])
+    t_masker = time.perf_counter() - t
+
+    n = len(frames)
+    print(f"{'mode':>22} {'fps':>8} {'ms/frame':>9}")
+    print(f"{'per-frame + gaussian51':>22} {n / t_legacy:8.2f} {t_legacy / n * 1e3:9.2f}")
+    print(f"{'HeadMasker':>22} {n / t_masker:8.2f} {t_masker / n * 1e3:9.2f}  "
+          f"(탐지 {masker.stats['keyframes']} / {n} 프레임)")
+    print(f"speedup: {t_legacy / t_masker:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
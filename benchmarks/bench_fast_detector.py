@@ -0,0 +1,98 @@
+import argparse
+import time
+import cv2
+import numpy as np
+import torch
+from models.threat import PersonDetector, FastPersonDetector
+from utils.prepro import box_iou
+import config
+
+
+def read_frames(video_path, max_frames):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def match_iou(ref_boxes, boxes):
+    """ref 박스마다 IoU 가 가장 큰 박스를 greedy 로 1:1 매칭하여 IoU 목록을 반환합니다."""
+    if len(ref_boxes) == 0 or len(boxes) == 0:
+        return np.empty(0)
+    iou = box_iou(torch.from_numpy(ref_boxes).float(), torch.from_numpy(boxes).float()).numpy()
+    matched = []
+    while iou.size and iou.max() > 0:
+        r, c = np.unravel_index(iou.argmax(), iou.shape)
+        matched.append(iou[r, c])
+        iou[r, :] = 0
+        iou[:, c] = 0
+    return np.array(matched)
+
+
+def timeit(fn, frames, warmup=3):
+    for frame in frames[:warmup]:
+        fn(frame)
+    t = time.perf_counter()
+    out = [fn(frame) for frame in frames]
+    return out, (time.perf_counter() - t) / len(frames)
+
+
+def main():
+    """
+    YOLO() 경로 vs FastPersonDetector 속도 비교 및 IoU 매칭 parity 검사
+
+    사용법:
+        python -m benchmarks.bench_fast_detector -v assets/threat_1.mp4 -n 100
+    """
+    parser = argparse.ArgumentParser(description='FastPersonDetector 벤치마크 / parity 검사')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('-m', '--model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('-n', '--frames', type=int, default=100)
+    parser.add_argument('--conf', type=float, default=config.DET_CONF_THRES)
+    parser.add_argument('--min-iou', type=float, default=0.9, help='parity 통과 기준 IoU')
+    parser.add_argument('--min-match', type=float, default=0.95, help='parity 통과 기준 매칭 비율 (recall, precision 모두)')
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise RuntimeError(f"Cannot read frames from: {args.video}")
+
+    yolo = PersonDetector(args.model)
+    fast = FastPersonDetector(args.model, conf_thres=args.conf)
+
+    def yolo_detect(frame):
+        return yolo._parse(yolo.model(frame, conf=args.conf, iou=config.DET_IOU_THRES, verbose=False)[0])
+
+    ref, t_yolo = timeit(yolo_detect, frames)
+    out, t_fast = timeit(fast.detect, frames)
+
+    n_ref = sum(len(d.boxes) for d in ref)
+    n_out = sum(len(d.boxes) for d in out)
+    ious = np.concatenate([match_iou(r.boxes, o.boxes) for r, o in zip(ref, out)] or [np.empty(0)])
+    n_good = int((ious >= args.min_iou).sum())
+
+    print(f"frames: {len(frames)}  ({frames[0].shape[1]}x{frames[0].shape[0]})")
+    print(f"YOLO()             : {t_yolo * 1e3:8.2f} ms/frame  ({1 / t_yolo:6.1f} fps)  boxes={n_ref}")
+    print(f"FastPersonDetector : {t_fast * 1e3:8.2f} ms/frame  ({1 / t_fast:6.1f} fps)  boxes={n_out}")
+    print(f"speedup            : {t_yolo / t_fast:.2f}x")
+    if n_ref == 0:
+        raise SystemExit("❌ parity 검사 불가: YOLO 탐지 박스가 없습니다 (사람이 나오는 영상 / 구간을 지정하세요)")
+
+    # 1:1 매칭이므로 recall 은 빠진 박스, precision 은 추가 / 중복 박스를 잡아냄
+    recall = n_good / n_ref
+    precision = n_good / n_out if n_out else 0.0
+    print(f"parity             : IoU >= {args.min_iou} 매칭 {n_good}개, "
+          f"recall {n_good}/{n_ref} ({recall * 100:.1f}%), precision {n_good}/{n_out} ({precision * 100:.1f}%), "
+          f"mean IoU {ious.mean() if len(ious) else float('nan'):.4f}")
+    if min(recall, precision) < args.min_match:
+        raise SystemExit(f"❌ parity 실패: recall {recall:.3f} / precision {precision:.3f} < {args.min_match}")
+    print("✅ parity 통과")
+
+
+if __name__ == "__main__":
+    main()
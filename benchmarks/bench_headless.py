@@ -0,0 +1,85 @@
+import argparse
+import os
+import tempfile
+import time
+import cv2
+from models.threat import ThreatVideoDiscriminator
+from utils.video_io import open_reader, resolve_backend
+import config
+
+
+def decode_only(video_path, max_frames, backend):
+    cap = open_reader(video_path, backend=backend)
+    n = 0
+    t = time.perf_counter()
+    while n < max_frames:
+        ret, _ = cap.read()
+        if not ret:
+            break
+        n += 1
+    cap.release()
+    return n, time.perf_counter() - t
+
+
+def main():
+    """
+    렌더링 경로 (그리기 + utils/video_io 인코딩) vs headless 분석 경로의 처리 FPS 비교
+
+    두 경로 모두 같은 모델로 같은 프레임 구간을 디코드부터 처리하며, 디코드만 한 기준값도 함께 보고합니다.
+    디코드 / 인코딩은 --video-backend, --codec 을 따릅니다 (기본: auto 백엔드의 libx264, opencv 는 mp4v).
+
+    사용법:
+        python -m benchmarks.bench_headless -v assets/threat_1.mp4 -n 300 [--no-cls] [--batch-frames 8] [--threaded]
+            [--video-backend opencv --codec mp4v]
+    """
+    parser = argparse.ArgumentParser(description='headless 분석 모드 벤치마크')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('-n', '--frames', type=int, default=300)
+    parser.add_argument('--det-model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('--cls-model', type=str, default=config.CLS_MODEL_PATH)
+    parser.add_argument('--no-cls', action='store_true')
+    parser.add_argument('--fast', action='store_true', help='FastPersonDetector 사용')
+    parser.add_argument('--batch-frames', type=int, default=1)
+    parser.add_argument('--threaded', action='store_true')
+    parser.add_argument('--video-backend', type=str, choices=['auto', 'pyav', 'ffmpeg', 'opencv'],
+                        default=config.VIDEO_BACKEND)
+    parser.add_argument('--codec', type=str, default=config.VIDEO_CODEC)
+    args = parser.parse_args()
+
+    backend = resolve_backend(args.video_backend)
+    model = ThreatVideoDiscriminator(use_classifier=not args.no_cls, fast_detector=args.fast,
+                                     det_model_path=args.det_model, cls_model_path=args.cls_model,
+                                     video_backend=backend, video_options=dict(codec=args.codec))
+    video_kwargs = dict(batch_frames=args.batch_frames, threaded=args.threaded, end_frame=args.frames)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model.output_path = os.path.join(tmp, "warmup.mp4")
+        model.process_video(args.video, batch_frames=1, end_frame=3)
+
+        n, t_decode = decode_only(args.video, args.frames, backend)
+        if n == 0:
+            raise RuntimeError(f"Cannot read frames from: {args.video}")
+
+        model.output_path = os.path.join(tmp, "render.mp4")
+        t = time.perf_counter()
+        model.process_video(args.video, **video_kwargs)
+        t_render = time.perf_counter() - t
+
+        model.headless = True
+        t = time.perf_counter()
+        summary = model.process_video(args.video, **video_kwargs)
+        t_headless = time.perf_counter() - t
+        model.headless = False
+
+    height, width = cv2.VideoCapture(args.video).read()[1].shape[:2]
+    codec = args.codec if backend != "opencv" or len(args.codec) == 4 else "mp4v"
+    print(f"frames: {n} ({width}x{height}), 경고 프레임 {summary['alert_frames']}, 영상 백엔드 {backend} / {codec}")
+    print(f"{'mode':>10} {'fps':>8} {'ms/frame':>9}")
+    for name, elapsed in (("decode", t_decode), ("render", t_render), ("headless", t_headless)):
+        print(f"{name:>10} {n / elapsed:8.2f} {elapsed / n * 1e3:9.2f}")
+    print(f"headless speedup: {t_render / t_headless:.2f}x "
+          f"(그리기 + 인코딩 {(t_render - t_headless) / n * 1e3:.2f} ms/frame)")
+
+
+if __name__ == "__main__":
+    main()
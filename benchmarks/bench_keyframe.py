@@ -0,0 +1,123 @@
+import argparse
+import time
+import cv2
+import numpy as np
+from models.detections import Detections
+from models.threat import PersonDetector, FastPersonDetector
+from models.keyframe import KeyframeDetector
+from models.proximity import ProximityEngine
+from benchmarks.bench_fast_detector import read_frames, match_iou
+import config
+
+
+def synthetic_clip(n, size=(1280, 720), seed=0):
+    """
+    텍스처 배경 위를 텍스처 사람 박스 (60x150) 들이 걷는 합성 영상과 프레임별 정답 박스
+
+    두 쌍이 프레임 양 끝에서 서로 마주 보고 걸어와 거리 임계값 (DISTANCE_THRESHOLD) 안으로 들어왔다가 멀어지며
+    (영상 중반 이후 경보 구간), 두 쌍의 세로 간격은 임계값의 1.25 배보다 넓습니다.
+    학습된 탐지기 / 샘플 영상 없이 박스 전파와 경보 recall 을 재현할 때 사용합니다.
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    background = cv2.GaussianBlur(rng.integers(0, 255, (h, w, 3), dtype=np.uint8), (0, 0), 3)
+    # (x0, y0, vx, vy): 위쪽 쌍, 아래쪽 쌍
+    people = [(40, 40, 3.0, 0.2), (1180, 40, -3.0, 0.0),
+              (200, 530, 1.5, -0.1), (1020, 530, -1.5, 0.1)]
+    textures = [cv2.GaussianBlur(rng.integers(0, 255, (150, 60, 3), dtype=np.uint8), (0, 0), 1.5) for _ in people]
+    frames, truth = [], []
+    for t in range(n):
+        frame = background.copy()
+        boxes = []
+        for (x0, y0, vx, vy), tex in zip(people, textures):
+            x = int(np.clip(x0 + vx * t, 0, w - 60))
+            y = int(np.clip(y0 + vy * t, 0, h - 150))
+            frame[y:y + 150, x:x + 60] = tex
+            boxes.append((x, y, x + 60, y + 150))
+        boxes = np.array(boxes, dtype=np.int32)
+        frames.append(frame)
+        truth.append(Detections(boxes, (boxes[:, :2] + boxes[:, 2:]) // 2,
+                                np.ones(len(boxes), np.float32), np.zeros(len(boxes), np.int32)))
+    return frames, truth
+
+
+class OracleDetector:
+    """합성 영상의 정답 박스를 돌려주는 탐지기. latency_ms 만큼 추론 시간을 흉내 냅니다."""
+
+    def __init__(self, frames, truth, latency_ms: float):
+        self.truth = {id(f): d for f, d in zip(frames, truth)}
+        self.latency = latency_ms / 1e3
+
+    def detect(self, frame):
+        time.sleep(self.latency)
+        return self.truth[id(frame)]
+
+
+def run(detect, frames):
+    t = time.perf_counter()
+    out = [detect(frame) for frame in frames]
+    return out, time.perf_counter() - t
+
+
+def main():
+    """
+    매 프레임 탐지 vs 적응형 keyframe 탐지 (박스 전파) 비교
+
+    매 프레임 탐지 결과를 기준으로 다음을 보고합니다.
+        - 처리 시간 / speedup, 탐지기 호출 수
+        - 위협 경보 (거리 임계값 위반 프레임) recall / 오경보 프레임 수
+        - 박스 IoU 매칭 비율
+
+    사용법:
+        python -m benchmarks.bench_keyframe -v assets/threat_1.mp4 -n 300 [--max-stride 8]
+        python -m benchmarks.bench_keyframe --synthetic -n 300 --max-stride 4 8 16 [--latency-ms 80]
+    """
+    parser = argparse.ArgumentParser(description='적응형 keyframe 탐지 벤치마크')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('-m', '--model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('-n', '--frames', type=int, default=300)
+    parser.add_argument('--fast', action='store_true', help='FastPersonDetector 사용')
+    parser.add_argument('--max-stride', type=int, nargs='+', default=[config.KEYFRAME_MAX_STRIDE])
+    parser.add_argument('--min-iou', type=float, default=0.5, help='박스 매칭 기준 IoU')
+    parser.add_argument('--synthetic', action='store_true',
+                        help='영상 / 탐지 모델 대신 합성 영상과 정답 탐지기 사용 (--latency-ms 로 추론 시간 가정)')
+    parser.add_argument('--latency-ms', type=float, default=80.0, help='--synthetic 탐지기의 가정 추론 시간')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        frames, truth = synthetic_clip(args.frames)
+        detector = OracleDetector(frames, truth, args.latency_ms)
+    else:
+        frames = read_frames(args.video, args.frames)
+        if not frames:
+            raise RuntimeError(f"Cannot read frames from: {args.video}")
+        detector = FastPersonDetector(args.model) if args.fast else PersonDetector(args.model)
+    proximity = ProximityEngine(config.DISTANCE_THRESHOLD)
+    for frame in frames[:3]:
+        detector.detect(frame)
+
+    ref, t_ref = run(detector.detect, frames)
+    ref_alert = np.array([proximity.any_violation(d.centers) for d in ref])
+    n_ref = sum(len(d.boxes) for d in ref)
+
+    print(f"frames: {len(frames)}  ({frames[0].shape[1]}x{frames[0].shape[0]}), "
+          f"경보 프레임 {int(ref_alert.sum())}")
+    print(f"every-frame : {t_ref / len(frames) * 1e3:7.2f} ms/frame, 탐지기 호출 {len(frames)}")
+
+    for max_stride in args.max_stride:
+        kf = KeyframeDetector(detector, max_stride=max_stride)
+        out, t_kf = run(kf.detect, frames)
+        alert = np.array([proximity.any_violation(d.centers) for d in out])
+        recall = (alert & ref_alert).sum() / ref_alert.sum() if ref_alert.any() else 1.0
+        false_alarm = int((alert & ~ref_alert).sum())
+        ious = np.concatenate([match_iou(r.boxes, o.boxes) for r, o in zip(ref, out)] or [np.empty(0)])
+        match_rate = (ious >= args.min_iou).sum() / n_ref if n_ref else 1.0
+        print(f"keyframe(≤{max_stride:2d}): {t_kf / len(frames) * 1e3:7.2f} ms/frame "
+              f"({t_ref / max(t_kf, 1e-9):.2f}x), 탐지기 호출 {kf.stats['keyframes']} "
+              f"(guard {kf.stats['guard_triggers']}), "
+              f"경보 recall {recall * 100:.1f}% (Δ {(recall - 1) * 100:+.1f}%p), 오경보 {false_alarm} 프레임, "
+              f"박스 매칭 {match_rate * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
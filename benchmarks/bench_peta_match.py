@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from preprocess.preprocess_peta import FilenameIndex, collect_folder, match_label_scan
+import config
+
+STYLES = ("cuhk", "index", "regex", "mixed")
+
+
+def make_folder(root, name, style, n, rng):
+    """
+    PETA 하위 폴더 형식의 합성 폴더 (빈 이미지 파일 + Label.txt)
+
+    스타일별 파일명 (0001.png / 3_12.jpg / cam-3-x1.jpg, p_3.jpg 등) 에 누락 이미지, 겹치는 접두어 (1 / 10 / 100),
+    정규식 특수문자 / 구분자가 들어간 라벨키를 섞습니다.
+    """
+    archive = os.path.join(root, name, "archive")
+    os.makedirs(archive)
+    files, lines = set(), []
+    for i in range(1, n + 1):
+        kind = style if style != "mixed" else rng.choice(STYLES[:3])
+        if kind == "cuhk":
+            key = f"{i:04d}.png"
+            names = [key]
+        elif kind == "index":
+            key = str(i)
+            names = [f"{i}_{rng.randint(1, 999)}.jpg"] + ([f"{i}_b.bmp"] if rng.random() < 0.3 else [])
+        else:
+            key = str(i) if rng.random() < 0.9 else rng.choice([f"{i}.x", f"({i})", f"{i}_a", f"{i}-", "a+b"])
+            names = [rng.choice([f"cam-{i}-x{rng.randint(0, 9)}.jpg", f"p_{i}.jpg", f"{i}-front.png",
+                                 f"c_{i}_{i}_d.jpg", f"q-{i}.JPG"])]
+        for fname in names:
+            if rng.random() < 0.9:
+                files.add(fname)
+        tag = rng.choice([config.MALE_TAG, config.FEMALE_TAG, "upperBodyBlack"])
+        lines.append(f"{key} {tag} accessoryNothing")
+    lines.append("broken")
+    for fname in files:
+        open(os.path.join(archive, fname), "wb").close()
+    with open(os.path.join(archive, config.LABEL_FILENAME), "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return os.path.join(root, name)
+
+
+def fuzz(rng, rounds):
+    """임의 파일명 / 라벨키에 대해 FilenameIndex.match 와 match_label_scan 결과가 같은지 검사"""
+    alphabet = "0123_-.ab"
+    for _ in range(rounds):
+        images = list({"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 7))) + rng.choice([".jpg", ".png"])
+                       for _ in range(rng.randint(0, 40))})
+        index = FilenameIndex(images)
+        for _ in range(20):
+            key = "".join(rng.choice(alphabet + "(+") for _ in range(rng.randint(1, 4)))
+            try:
+                expected = match_label_scan(images, key)
+            except Exception:
+                continue  # 기존 구현도 실패하는 정규식 (e.g. 짝이 맞지 않는 괄호)
+            got = index.match(key)
+            if got != expected:
+                raise AssertionError(f"mismatch for key {key!r}: {got} != {expected} (images={images})")
+
+
+def main():
+    """
+    PETA 라벨-파일명 매칭: 라벨마다 전체 목록을 훑는 기존 방식 vs 폴더당 FilenameIndex
+
+    합성 폴더에서 두 방식의 collect_folder 결과 (매칭 목록, 방식별 건수, 폴더 통계, 누락 목록) 가
+    같은지 확인한 뒤 처리 시간을 비교합니다. 임의 파일명 / 라벨키 fuzz 검사도 함께 실행합니다.
+
+    사용법:
+        python -m benchmarks.bench_peta_match -n 500 2000 [--fuzz 2000]
+    """
+    parser = argparse.ArgumentParser(description='PETA 파일명 매칭 벤치마크')
+    parser.add_argument('-n', '--labels', type=int, nargs='+', default=[500, 2000], help='폴더당 라벨 수')
+    parser.add_argument('--fuzz', type=int, default=2000, help='fuzz 검사 반복 수')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fuzz(rng, args.fuzz)
+    print(f"fuzz: {args.fuzz} 회 일치")
+
+    print(f"{'style':>6} {'labels':>7} {'images':>7} {'scan s':>8} {'index s':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.labels:
+            for style in STYLES:
+                folder = make_folder(tmp, f"{style}_{n}", style, n, rng)
+                t = time.perf_counter()
+                expected = collect_folder(folder, indexed=False)
+                t_scan = time.perf_counter() - t
+                t = time.perf_counter()
+                got = collect_folder(folder, indexed=True)
+                t_index = time.perf_counter() - t
+                if got != expected:
+                    raise AssertionError(f"collect_folder mismatch in {folder}")
+                print(f"{style:>6} {n:7d} {got['folder_stats']['image_count']:7d} {t_scan:8.3f} {t_index:8.3f} "
+                      f"{t_scan / t_index:7.1f}x")
+    print("모든 폴더에서 매칭 결과 / 통계 일치")
+
+
+if __name__ == "__main__":
+    main()
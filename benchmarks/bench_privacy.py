@@ -0,0 +1,97 @@
+import argparse
+import os
+import tempfile
+import time
+from face_blur import blur_heads_in_video
+from models.threat import ThreatVideoDiscriminator
+import config
+
+
+def timed(fn, *args, **kwargs):
+    t = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - t
+
+
+def trim(video_path, output_path, frames, backend):
+    """두 방식이 같은 프레임 구간을 처리하도록 앞 frames 프레임만 잘라 둡니다."""
+    from utils.video_io import open_reader, open_writer
+    cap = open_reader(video_path, backend=backend)
+    writer = open_writer(output_path, cap.fps, cap.size, backend=backend)
+    n = 0
+    while n < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        writer.write(frame)
+        n += 1
+    cap.release()
+    writer.release()
+    return n
+
+
+def main():
+    """
+    익명화 + 위협 분석: 두 번의 패스 (face_blur.py → main.py) vs 한 번의 패스 (--anonymize) 처리 시간 비교
+
+        - analysis only     : 익명화 없이 분석 + 렌더링 (기준값)
+        - single (person)   : 사람 탐지 박스 윗부분을 가림 (추가 탐지기 없음)
+        - single (detector) : 같은 패스에서 머리 탐지기를 keyframe 마다 실행 (--head-model 필요)
+        - two-pass          : 매 프레임 머리 탐지 + 블러 영상 저장 후 그 영상을 다시 분석 (--head-model 필요)
+
+    사용법:
+        python -m benchmarks.bench_privacy -v assets/threat_1.mp4 -n 300 [--head-model weights/head.pt] [--no-cls]
+    """
+    parser = argparse.ArgumentParser(description='단일 패스 익명화 벤치마크')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('-n', '--frames', type=int, default=300)
+    parser.add_argument('--det-model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('--cls-model', type=str, default=config.CLS_MODEL_PATH)
+    parser.add_argument('--head-model', type=str, default=config.HEAD_MODEL_PATH)
+    parser.add_argument('--no-cls', action='store_true')
+    parser.add_argument('--batch-frames', type=int, default=8)
+    parser.add_argument('--video-backend', type=str, default=config.VIDEO_BACKEND)
+    args = parser.parse_args()
+
+    model_kwargs = dict(use_classifier=not args.no_cls, det_model_path=args.det_model,
+                        cls_model_path=args.cls_model, video_backend=args.video_backend)
+    plain = ThreatVideoDiscriminator(**model_kwargs)
+    person = ThreatVideoDiscriminator(anonymize=True, head_source="person", **model_kwargs)
+    detector = None
+    if args.head_model:
+        detector = ThreatVideoDiscriminator(anonymize=True, head_source="detector",
+                                            head_model_path=args.head_model, **model_kwargs)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "clip.mp4")
+        n = trim(args.video, clip, args.frames, args.video_backend)
+        if n == 0:
+            raise RuntimeError(f"Cannot read frames from: {args.video}")
+
+        plain.output_path = os.path.join(tmp, "warmup.mp4")
+        plain.process_video(clip, end_frame=2)
+        for name, model in (("analysis only", plain), ("single (person)", person), ("single (detector)", detector)):
+            if model is None:
+                continue
+            model.output_path = os.path.join(tmp, "out.mp4")
+            results.append((name, timed(model.process_video, clip, batch_frames=args.batch_frames)))
+
+        if args.head_model:
+            blurred = os.path.join(tmp, "blurred.mp4")
+            t_blur = timed(blur_heads_in_video, clip, blurred, video_backend=args.video_backend,
+                           head_model_path=args.head_model, interval=1)
+            plain.output_path = os.path.join(tmp, "out.mp4")
+            t_analysis = timed(plain.process_video, blurred, batch_frames=args.batch_frames)
+            results.append(("two-pass", t_blur + t_analysis))
+        else:
+            print("two-pass / single (detector) 건너뜀: --head-model 필요")
+
+    print(f"frames: {n}")
+    print(f"{'mode':>18} {'fps':>8} {'ms/frame':>9}")
+    for name, elapsed in results:
+        print(f"{name:>18} {n / elapsed:8.2f} {elapsed / n * 1e3:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
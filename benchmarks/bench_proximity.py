@@ -0,0 +1,68 @@
+import argparse
+import time
+import numpy as np
+from scipy.spatial.distance import cdist
+from models.proximity import ProximityEngine
+import config
+
+
+def legacy_pairs(centers, distance_threshold):
+    """기존 cdist + 이중 for 루프 방식"""
+    pairs = []
+    if len(centers) >= 2:
+        dist_matrix = cdist(centers, centers, metric='euclidean')
+        for i in range(len(centers)):
+            for j in range(i + 1, len(centers)):
+                if dist_matrix[i][j] < distance_threshold:
+                    pairs.append((i, j))
+    return pairs
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    """
+    ProximityEngine 벤치마크 (N = 2 ~ 2000 명)
+
+    사용법:
+        python -m benchmarks.bench_proximity [--width 3840 --height 2160]
+    """
+    parser = argparse.ArgumentParser(description='거리 위반 쌍 계산 벤치마크')
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('-n', '--sizes', type=int, nargs='+', default=[2, 10, 50, 100, 250, 500, 1000, 2000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    threshold = config.DISTANCE_THRESHOLD
+    dense = ProximityEngine(threshold, kdtree_min_n=10 ** 9)
+    kdtree = ProximityEngine(threshold, kdtree_min_n=0)
+    auto = ProximityEngine(threshold)
+
+    print(f"{'N':>6} {'pairs':>8} {'legacy ms':>10} {'triu ms':>10} {'kdtree ms':>10} {'auto ms':>10}")
+    for n in args.sizes:
+        centers = np.stack([rng.integers(0, args.width, n), rng.integers(0, args.height, n)], axis=1)
+        expected = legacy_pairs(centers, threshold)
+        for engine in (dense, kdtree, auto):
+            i, j, _ = engine.pairs(centers)
+            assert list(zip(i.tolist(), j.tolist())) == expected, f"mismatch at N={n}"
+
+        legacy_repeat = args.repeat if n <= 500 else 1
+        t_legacy = timeit(lambda: legacy_pairs(centers, threshold), legacy_repeat)
+        t_dense = timeit(lambda: dense.pairs(centers), args.repeat)
+        t_kdtree = timeit(lambda: kdtree.pairs(centers), args.repeat)
+        t_auto = timeit(lambda: auto.pairs(centers), args.repeat)
+        print(f"{n:>6} {len(expected):>8} {t_legacy * 1e3:>10.3f} {t_dense * 1e3:>10.3f} "
+              f"{t_kdtree * 1e3:>10.3f} {t_auto * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import numpy as np
+from models.threat import FastPersonDetector
+from models.regions import RegionDetector, video_rois
+from benchmarks.bench_fast_detector import read_frames, timeit
+import config
+
+
+def main():
+    """
+    전체 프레임 탐지 vs ROI 크롭 / 타일 탐지 비교 (고해상도 영상용)
+
+    정답 박스가 없으므로 모드별로 다음을 보고합니다.
+        - 프레임당 처리 시간, 탐지기 입력 크롭 수
+        - 프레임당 사람 수, 그중 작은 사람 (박스 높이 < 프레임 높이의 --small 비율) 수
+        - 탐지 1건당 처리 시간 (단위 연산량당 recall 의 근사)
+
+    사용법:
+        python -m benchmarks.bench_regions -v cam_4k.mp4 -n 50 [--roi-file config/rois.yaml --camera cam_4k]
+    """
+    parser = argparse.ArgumentParser(description='ROI / 타일 탐지 벤치마크')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('-m', '--model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('-n', '--frames', type=int, default=50)
+    parser.add_argument('--roi-file', type=str, default=None)
+    parser.add_argument('--camera', type=str, default=None)
+    parser.add_argument('--small', type=float, default=0.05, help='작은 사람 기준 (프레임 높이 대비 박스 높이)')
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise RuntimeError(f"Cannot read frames from: {args.video}")
+    height, width = frames[0].shape[:2]
+
+    detector = FastPersonDetector(args.model)
+    modes = {"full-frame": detector, "tiled": RegionDetector(detector, tiled=True)}
+    if args.roi_file:
+        rois = video_rois(args.roi_file, args.video, args.camera)
+        modes["roi"] = RegionDetector(detector, rois=rois)
+        modes["roi+tiled"] = RegionDetector(detector, rois=rois, tiled=True)
+
+    print(f"frames: {len(frames)}  ({width}x{height})")
+    for name, det in modes.items():
+        out, t = timeit(det.detect, frames)
+        crops = len(det._layout((height, width))[0]) if isinstance(det, RegionDetector) else 1
+        n = np.array([len(d.boxes) for d in out])
+        small = sum(int(((d.boxes[:, 3] - d.boxes[:, 1]) < args.small * height).sum()) for d in out)
+        per_det = f"{t * 1e3 / n.mean():7.2f} ms" if n.sum() else "      -"
+        print(f"{name:11s}: {t * 1e3:8.2f} ms/frame, 크롭 {crops:3d}, 사람 {n.mean():6.2f}/frame "
+              f"(작은 사람 {small / len(frames):5.2f}/frame), 탐지 1건당 {per_det}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from preprocess.shards import CLASSES, PackedShards, convert_folder_dataset
+from utils.prepro import LetterBox
+import config
+
+
+def read_folder_epoch(split_dir, batch_size):
+    """폴더 구조에서 한 epoch: 파일마다 open / decode / letterbox (ultralytics 폴더 로더와 같은 파일별 I/O)"""
+    letterbox = LetterBox((config.CLS_IMGSZ, config.CLS_IMGSZ))
+    files = [os.path.join(split_dir, label, f) for label in CLASSES
+             if os.path.isdir(os.path.join(split_dir, label)) for f in os.listdir(os.path.join(split_dir, label))]
+    n = 0
+    for start in range(0, len(files), batch_size):
+        batch = [letterbox(image=cv2.imread(f)) for f in files[start:start + batch_size]]
+        n += len(np.stack(batch))
+    return n
+
+
+def read_shard_epoch(shard_dir, batch_size):
+    return sum(len(labels) for _, labels in PackedShards(shard_dir).iter_batches(batch_size, shuffle=True))
+
+
+def compare(folder, shard_root, split, batch_size):
+    """폴더 / shard 한 epoch 읽기 시간 출력"""
+    results = []
+    for name, fn, path in (("folder", read_folder_epoch, os.path.join(folder, split)),
+                           ("shards", read_shard_epoch, os.path.join(shard_root, split))):
+        t = time.perf_counter()
+        n = fn(path, batch_size)
+        results.append((name, n, time.perf_counter() - t))
+
+    print(f"{'source':>8} {'images':>8} {'s/epoch':>9} {'img/s':>9}")
+    for name, n, elapsed in results:
+        print(f"{name:>8} {n:8d} {elapsed:9.3f} {n / elapsed:9.1f}")
+
+
+def main():
+    """
+    성별 분류 학습 데이터 읽기: 폴더 구조 (파일별 open / stat / decode) vs shard (순차 읽기) 한 epoch 시간 비교
+
+    --shard-dir 가 없으면 --folder 를 임시 디렉토리에 shard 변환한 뒤 비교하고, 끝나면 삭제합니다.
+    파일 캐시 영향을 줄이려면 측정 전에 페이지 캐시를 비우거나 (echo 3 > /proc/sys/vm/drop_caches) NAS 경로에서 실행하세요.
+
+    사용법:
+        python -m benchmarks.bench_shards --folder prepro_data/prepro_peta --split train [--shard-dir prepro_data/shards_peta]
+    """
+    parser = argparse.ArgumentParser(description='학습 데이터 shard 읽기 벤치마크')
+    parser.add_argument('--folder', type=str, default=config.PETA_OUTPUT_DIR, help='폴더 구조 전처리 결과')
+    parser.add_argument('--shard-dir', type=str, default=None, help='shard 루트 (없으면 --folder 를 변환)')
+    parser.add_argument('--split', type=str, default='train')
+    parser.add_argument('-b', '--batch-size', type=int, default=256)
+    parser.add_argument('--threads', type=int, default=8, help='변환 시 읽기 스레드 수')
+    args = parser.parse_args()
+
+    if args.shard_dir is not None:
+        compare(args.folder, args.shard_dir, args.split, args.batch_size)
+        return
+    with tempfile.TemporaryDirectory(prefix="bench_shards_") as shard_root:
+        t = time.perf_counter()
+        convert_folder_dataset(args.folder, shard_root, threads=args.threads)
+        print(f"변환: {time.perf_counter() - t:.2f}s → {shard_root}")
+        compare(args.folder, shard_root, args.split, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
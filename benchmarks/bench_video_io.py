@@ -0,0 +1,87 @@
+import argparse
+import os
+import tempfile
+import time
+from utils.video_io import open_reader, open_writer, resolve_backend
+import config
+
+
+def decode(video_path, backend, max_frames, width=None, threads=0):
+    cap = open_reader(video_path, backend=backend, width=width, threads=threads)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {video_path}")
+    frames = []
+    t = time.perf_counter()
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    elapsed = time.perf_counter() - t
+    fps, size = cap.fps, cap.size
+    cap.release()
+    return frames, elapsed, fps, size
+
+
+def encode(frames, path, fps, size, backend, **options):
+    writer = open_writer(path, fps, size, backend=backend, **options)
+    t = time.perf_counter()
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return time.perf_counter() - t
+
+
+def main():
+    """
+    영상 입출력 백엔드별 decode / encode / decode+encode FPS 와 결과 파일 크기 비교
+
+    사용할 수 없는 백엔드 (PyAV 미설치, ffmpeg 실행 파일 없음) 는 건너뜁니다.
+
+    사용법:
+        python -m benchmarks.bench_video_io -v assets/threat_1.mp4 -n 300 [--width 640] [--codec libx264 --crf 23 --preset veryfast]
+    """
+    parser = argparse.ArgumentParser(description='영상 입출력 백엔드 벤치마크')
+    parser.add_argument('-v', '--video', type=str, default=config.SAMPLE_VIDEO_PATH)
+    parser.add_argument('-n', '--frames', type=int, default=300)
+    parser.add_argument('--backends', type=str, nargs='+', default=['opencv', 'pyav', 'ffmpeg'])
+    parser.add_argument('--width', type=int, default=640, help='축소 디코드 가로 크기 (0 이면 생략)')
+    parser.add_argument('--threads', type=int, default=config.VIDEO_DECODE_THREADS, help='디코드 스레드 수 (0: 자동)')
+    parser.add_argument('--codec', type=str, default=config.VIDEO_CODEC)
+    parser.add_argument('--crf', type=int, default=config.VIDEO_CRF)
+    parser.add_argument('--preset', type=str, default=config.VIDEO_PRESET)
+    args = parser.parse_args()
+
+    options = dict(codec=args.codec, crf=args.crf, preset=args.preset)
+    n = 0
+    print(f"{'backend':>8} {'decode fps':>10} {'scaled fps':>10} {'encode fps':>10} {'dec+enc fps':>11} "
+          f"{'output MB':>9}  codec")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            try:
+                resolve_backend(backend)
+            except (ImportError, RuntimeError) as e:
+                print(f"{backend:>8} 건너뜀: {e}")
+                continue
+
+            frames, t_dec, fps, size = decode(args.video, backend, args.frames, threads=args.threads)
+            if not frames:
+                raise RuntimeError(f"Cannot read frames from: {args.video}")
+            if args.width:
+                scaled, t_scaled, _, _ = decode(args.video, backend, args.frames, args.width, args.threads)
+                scaled_fps = f"{len(scaled) / t_scaled:10.1f}"
+            else:
+                scaled_fps = f"{'-':>10}"
+
+            path = os.path.join(tmp, f"{backend}.mp4")
+            t_enc = encode(frames, path, fps, size, backend, **options)
+            codec = args.codec if backend != "opencv" or len(args.codec) == 4 else "mp4v"
+            n = len(frames)
+            print(f"{backend:>8} {n / t_dec:10.1f} {scaled_fps} {n / t_enc:10.1f} {n / (t_dec + t_enc):11.1f} "
+                  f"{os.path.getsize(path) / 2 ** 20:9.2f}  {codec}")
+    if n:
+        print(f"frames: {n} ({size[0]}x{size[1]})")
+
+
+if __name__ == "__main__":
+    main()
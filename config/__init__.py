@@ -4,9 +4,25 @@ __version__ = "1.0"
 
 
 __all__ = [CLS_MODEL_PATH, DET_MODEL_PATH, 
-           DISTANCE_THRESHOLD, SAMPLE_VIDEO_PATH
+           DISTANCE_THRESHOLD, DET_IMGSZ, DET_CONF_THRES, DET_IOU_THRES, CLS_IMGSZ, CLS_MAX_BATCH, PROXIMITY_KDTREE_MIN_N,
+           TRACK_IOU_THRES, TRACK_MAX_CENTER_DIST, TRACK_MAX_AGE,
+           GENDER_REFRESH_INTERVAL, GENDER_GROW_RATIO, GENDER_VOTE_WINDOW,
+           KEYFRAME_MAX_STRIDE, KEYFRAME_ALERT_MARGIN, KEYFRAME_HIGH_MOTION, KEYFRAME_LOW_MOTION,
+           MOTION_GATE_WIDTH, MOTION_PIXEL_THRES, MOTION_AREA_THRES, MOTION_MAX_SKIP,
+           TILE_OVERLAP, TILE_MAX_BATCH, TILE_MERGE_IOS, ROI_CONFIG_PATH,
+           STREAM_MAX_BATCH, STREAM_MAX_WAIT_MS,
+           API_HOST, API_PORT, API_MAX_BATCH, API_MAX_WAIT_MS, API_MAX_BODY_MB, API_OUTPUT_DIR,
+           API_JOB_TTL_S, API_MAX_JOBS,
+           UPLOAD_CHUNK_MB, UPLOAD_START_MB, STORE_CHUNK_FRAMES,
+           VIDEO_BACKEND, VIDEO_CODEC, VIDEO_CRF, VIDEO_PRESET, VIDEO_DECODE_THREADS,
+           HEAD_SOURCE, HEAD_TOP_RATIO, HEAD_WIDTH_RATIO, HEAD_MODEL_PATH, HEAD_CONF_THRES,
+           FACE_BLUR_INTERVAL, FACE_BLUR_PAD, FACE_BLUR_METHOD, FACE_BLUR_CELLS,
+           FACE_BLUR_BATCH, SAMPLE_VIDEO_PATH
            ,INPUT_VIDEO_PATH, OUTPUT_VIDEO_PATH,
            DET_REPO_ID, DET_MODEL_NAME, CLS_REPO_ID, CLS_MODEL_NAME,
            AIHUB_DATASET_ROOT,AIHUB_OUTPUT_DIR, PETA_DATASET_ROOT,PETA_OUTPUT_DIR, 
-           VALID_EXT, MALE_TAG, FEMALE_TAG, LABEL_FILENAME, SPLITS
+           VALID_EXT, MALE_TAG, FEMALE_TAG, LABEL_FILENAME, SPLITS,
+           PREPRO_MANIFEST_NAME, PREPRO_THREADS_PER_WORKER,
+           AIHUB_SHARD_DIR, PETA_SHARD_DIR, PACK_SHARD_SIZE,
+           QUANT_CALIB_SAMPLES, QUANT_MAX_ACC_DROP
            ]
\ No newline at end of file
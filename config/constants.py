@@ -1,6 +1,60 @@
 CLS_MODEL_PATH = "Gender_cls/artifacts/weights/best.pt"
 DET_MODEL_PATH = "models/PersonDet_v3.2.0.pt"
 DISTANCE_THRESHOLD = 300
+DET_IMGSZ = 640
+DET_CONF_THRES = 0.25
+DET_IOU_THRES = 0.7  # ultralytics predictor 기본값과 동일
+CLS_IMGSZ = 224
+CLS_MAX_BATCH = 64  # 한 번의 분류 추론에 넣을 최대 크롭 수
+PROXIMITY_KDTREE_MIN_N = 64  # 이 인원 이상이면 거리 계산에 KD-tree 반경 질의 사용
+
+# 추적 / 트랙 단위 성별 캐시
+TRACK_IOU_THRES = 0.3  # 트랙-박스 IoU 매칭 최소값
+TRACK_MAX_CENTER_DIST = 0.5  # IoU 미매칭 시 중심점 거리 매칭 허용치 (박스 높이 대비)
+TRACK_MAX_AGE = 30  # 이 프레임 수 동안 보이지 않으면 트랙 제거
+GENDER_REFRESH_INTERVAL = 90  # 같은 트랙을 다시 분류하는 주기 (프레임)
+GENDER_GROW_RATIO = 1.5  # 박스 면적이 이 배율 이상 커지면 재분류
+GENDER_VOTE_WINDOW = 5  # 다수결에 사용할 최근 분류 결과 수
+KEYFRAME_MAX_STRIDE = 8  # keyframe 모드에서 탐지기 호출 간격 최대값 (프레임)
+KEYFRAME_ALERT_MARGIN = 0.25  # 거리 임계값의 (1 + margin) 배 이내 쌍이 있으면 매 프레임 탐지
+KEYFRAME_HIGH_MOTION = 8.0  # 박스 이동량 (px/frame) 이 이 값 이상이면 간격을 절반으로
+KEYFRAME_LOW_MOTION = 1.0  # 박스 이동량 (px/frame) 이 이 값 미만이면 간격을 1 증가
+MOTION_GATE_WIDTH = 160  # 움직임 게이트의 프레임 차분 해상도 (가로 px)
+MOTION_PIXEL_THRES = 25  # 변화 화소로 판단하는 밝기 차이
+MOTION_AREA_THRES = 0.002  # 변화 화소 비율이 이 값 이상이면 탐지기 실행
+MOTION_MAX_SKIP = 150  # 연속으로 건너뛸 수 있는 최대 프레임 수
+TILE_OVERLAP = 0.2  # 타일 탐지 시 인접 타일 겹침 비율
+TILE_MAX_BATCH = 32  # 타일 탐지 시 한 번에 추론할 최대 크롭 수
+TILE_MERGE_IOS = 0.8  # 타일 병합 시 더 작은 박스 대비 교집합 비율이 이 값 이상이면 중복으로 제거
+ROI_CONFIG_PATH = "config/rois.yaml"
+STREAM_MAX_BATCH = 16  # 멀티 카메라 서버의 스트림 간 최대 배치 크기
+STREAM_MAX_WAIT_MS = 30  # 배치 첫 프레임 디코드 후 배치를 채우기 위해 기다리는 최대 시간 (지연 예산)
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+API_MAX_BATCH = 16  # HTTP API 동적 배치 최대 크기
+API_MAX_WAIT_MS = 10  # 첫 요청 이후 배치를 모으는 최대 대기 시간
+API_MAX_BODY_MB = 512  # 요청 본문 최대 크기 (영상 업로드 포함)
+API_OUTPUT_DIR = "output/api"
+API_JOB_TTL_S = 3600  # 끝난 영상 작업 / 결과 파일 보관 시간 (초)
+API_MAX_JOBS = 100  # 보관할 끝난 영상 작업 최대 수 (넘으면 오래된 것부터 삭제)
+UPLOAD_CHUNK_MB = 8  # 업로드 파일을 디스크에 쓰는 청크 크기
+UPLOAD_START_MB = 4  # 이만큼 기록되면 (점진 디코드 가능한 컨테이너는) 분석 시작
+STORE_CHUNK_FRAMES = 1024  # 탐지 저장소의 청크당 프레임 수
+VIDEO_BACKEND = "auto"  # 영상 입출력 백엔드: auto (pyav → ffmpeg → opencv) / pyav / ffmpeg / opencv
+VIDEO_CODEC = "libx264"  # pyav / ffmpeg 백엔드의 출력 인코더 (opencv 는 mp4v)
+VIDEO_CRF = 23
+VIDEO_PRESET = "veryfast"
+VIDEO_DECODE_THREADS = 0  # 0: 디코더 자동
+HEAD_SOURCE = "person"  # 결과 영상 익명화의 머리 영역: person (사람 박스 윗부분 추정) / detector (머리 탐지기)
+HEAD_TOP_RATIO = 0.2  # person 모드: 사람 박스 높이 중 위쪽 이 비율을 머리로 추정
+HEAD_WIDTH_RATIO = 0.6  # person 모드: 사람 박스 폭 중 가운데 이 비율을 머리로 추정
+HEAD_MODEL_PATH = None  # YOLO 머리 탐지 가중치 (없으면 realutils.detect_heads 로 프레임마다 탐지)
+HEAD_CONF_THRES = 0.25
+FACE_BLUR_INTERVAL = 4  # 머리 탐지 keyframe 간격 (프레임)
+FACE_BLUR_PAD = 0.2  # 가릴 영역을 머리 박스 크기 대비 이 비율만큼 넓힘 (keyframe 사이 움직임)
+FACE_BLUR_METHOD = "pixelate"  # pixelate (모자이크) / blur (축소 ROI 가우시안)
+FACE_BLUR_CELLS = 8  # 모자이크의 긴 변 칸 수
+FACE_BLUR_BATCH = 16  # face_blur.py 의 배치 프레임 수
 SAMPLE_VIDEO_PATH = "assets/threat_1.mp4"
 INPUT_VIDEO_PATH = "assets/threat_1.mp4"
 OUTPUT_VIDEO_PATH = "output/result.mp4"
@@ -25,4 +79,13 @@ VALID_EXT = {".png", ".jpg", ".jpeg", ".bmp"}
 MALE_TAG = "personalMale"
 FEMALE_TAG = "personalFemale"
 LABEL_FILENAME = "Label.txt"
-SPLITS = [0.8, 0.1, 0.1]  # train, val, test
\ No newline at end of file
+SPLITS = [0.8, 0.1, 0.1]  # train, val, test
+PREPRO_MANIFEST_NAME = ".manifest.jsonl"  # 출력 디렉토리의 완료 항목 기록 (재실행 시 이어서 처리)
+PREPRO_THREADS_PER_WORKER = 4  # --workers 1 개당 복사 스레드 수
+AIHUB_SHARD_DIR = "prepro_data/shards_aihub"  # --format shards 출력 (preprocess/shards.py)
+PETA_SHARD_DIR = "prepro_data/shards_peta"
+PACK_SHARD_SIZE = 1024  # shard 당 이미지 수 (224x224x3 uint8 기준 약 150MB)
+
+# INT8 quantization (quantize.py)
+QUANT_CALIB_SAMPLES = 512  # calibration 에 사용할 크롭 수
+QUANT_MAX_ACC_DROP = 1.0  # 허용하는 val top-1 정확도 하락 (%p)
\ No newline at end of file
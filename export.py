@@ -0,0 +1,60 @@
+import argparse
+from ultralytics import YOLO
+from utils.custom_logger import custom_logger
+import config
+
+logger = custom_logger(__name__)
+
+
+def export_model(model_path, imgsz, formats, half=False):
+    """
+    하나의 가중치를 지정한 형식으로 export 합니다. (dynamic batch)
+
+    Args:
+        model_path (str): .pt 가중치 경로
+        imgsz (int): 입력 크기
+        formats (list[str]): ["onnx", "openvino"] 중 선택
+        half (bool): FP16 export (GPU 전용)
+
+    Returns:
+        dict: {형식: export 경로}
+    """
+    model = YOLO(model_path)
+    exported = {}
+    for fmt in formats:
+        logger.info(f"🔄 {model_path} → {fmt} (imgsz={imgsz}, dynamic batch)")
+        path = model.export(format=fmt, imgsz=imgsz, dynamic=True, half=half)
+        exported[fmt] = path
+        logger.info(f"✅ 저장 완료: {path}")
+    return exported
+
+
+def main():
+    """
+    탐지기/성별 분류기를 CPU 추론용 그래프로 export 하는 스크립트
+
+    사용법:
+        python export.py [--models det cls] [--formats onnx openvino]
+
+    export 된 모델은 PersonDetector / GenderClassifier 의 backend 인자로 선택합니다.
+        backend="onnxruntime" → <가중치>.onnx
+        backend="openvino"    → <가중치>_openvino_model/
+    """
+    parser = argparse.ArgumentParser(description='탐지/분류 모델 ONNX · OpenVINO export')
+    parser.add_argument('--models', type=str, nargs='+', choices=['det', 'cls'], default=['det', 'cls'],
+                        help='export 할 모델 (det: 사람 탐지, cls: 성별 분류)')
+    parser.add_argument('--formats', type=str, nargs='+', choices=['onnx', 'openvino'], default=['onnx'],
+                        help='export 형식')
+    parser.add_argument('--det-model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('--cls-model', type=str, default=config.CLS_MODEL_PATH)
+    parser.add_argument('--half', action='store_true', help='FP16 export (GPU 전용)')
+    args = parser.parse_args()
+
+    if 'det' in args.models:
+        export_model(args.det_model, config.DET_IMGSZ, args.formats, half=args.half)
+    if 'cls' in args.models:
+        export_model(args.cls_model, config.CLS_IMGSZ, args.formats, half=args.half)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,64 @@
 # face_blur.py
 
-import cv2
-from PIL import Image
-from realutils.detect import detect_heads
+import argparse
+from models.threat import HeadDetector
+from models.privacy import HeadMasker
+from utils.video_io import open_reader, open_writer
+import config
 
-def blur_heads_in_video(video_path: str, output_path: str = 'blurred_output.mp4'):
-    cap = cv2.VideoCapture(video_path)
+def blur_heads_in_video(video_path: str, output_path: str = 'blurred_output.mp4',
+                        video_backend: str = config.VIDEO_BACKEND, video_options: dict = None,
+                        head_model_path: str = config.HEAD_MODEL_PATH,
+                        batch_frames: int = config.FACE_BLUR_BATCH,
+                        interval: int = config.FACE_BLUR_INTERVAL,
+                        method: str = config.FACE_BLUR_METHOD):
+    """
+    영상의 머리 영역을 가려 저장합니다.
+
+    batch_frames 프레임씩 모아 그 안의 keyframe (interval 프레임마다) 을 한 번의 배치로 머리 탐지하고,
+    사이 프레임은 keyframe 박스를 재사용합니다 (models/privacy.HeadMasker).
+    위협 분석까지 할 경우 별도 패스 대신 `main.py --anonymize` 로 한 번의 디코드에서 함께 처리할 수 있습니다.
+    """
+    cap = open_reader(video_path, backend=video_backend)
     if not cap.isOpened():
         raise IOError(f"❌ Cannot open video: {video_path}")
 
-    width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    fps    = cap.get(cv2.CAP_PROP_FPS)
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out    = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    if batch_frames < interval:
+        print(f"⚠️ batch_frames ({batch_frames}) < interval ({interval}): keyframe 이후 새로 들어온 사람의 머리는 "
+              f"다음 keyframe 까지 가려지지 않습니다. --batch-frames 를 interval 이상으로 주세요")
+    masker = HeadMasker(HeadDetector(head_model_path), interval=interval, method=method)
+    out    = open_writer(output_path, cap.fps, cap.size, backend=video_backend, **(video_options or {}))
 
     print("🎥 블러 처리 시작...")
 
+    pending = []
     while True:
         ret, frame = cap.read()
+        if ret:
+            pending.append(frame)
+        if pending and (len(pending) == batch_frames or not ret):
+            masker.apply(pending)
+            for masked in pending:
+                out.write(masked)
+            pending = []
         if not ret:
             break
 
-        # OpenCV → PIL 변환
-        pil_img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-
-        # detect_heads 호출
-        results = detect_heads(pil_img)
-
-        # 바운딩 박스에 블러 처리
-        for (x1, y1, x2, y2), label, conf in results:
-            head = frame[y1:y2, x1:x2]
-            blurred = cv2.GaussianBlur(head, (51, 51), 0)
-            frame[y1:y2, x1:x2] = blurred
-
-        out.write(frame)
-
     cap.release()
     out.release()
-    print(f"✅ 저장 완료: {output_path}")
+    print(f"✅ 저장 완료: {output_path} (머리 탐지 {masker.stats['keyframes']} / {masker.stats['frames']} 프레임)")
 
 # 예시 실행
 if __name__ == "__main__":
-    blur_heads_in_video('threat_2.mp4', 'blurred_output2.mp4')
-
-
+    parser = argparse.ArgumentParser(description='영상 머리 영역 익명화')
+    parser.add_argument('-i', '--input', type=str, default='threat_2.mp4')
+    parser.add_argument('-o', '--output', type=str, default='blurred_output2.mp4')
+    parser.add_argument('--head-model', type=str, default=config.HEAD_MODEL_PATH,
+                        help='YOLO 머리 탐지 가중치 (없으면 realutils.detect_heads)')
+    parser.add_argument('--batch-frames', type=int, default=config.FACE_BLUR_BATCH)
+    parser.add_argument('--interval', type=int, default=config.FACE_BLUR_INTERVAL,
+                        help='머리 탐지 keyframe 간격 (1 이면 매 프레임 탐지)')
+    parser.add_argument('--method', type=str, choices=['pixelate', 'blur'], default=config.FACE_BLUR_METHOD)
+    args = parser.parse_args()
+    blur_heads_in_video(args.input, args.output, head_model_path=args.head_model,
+                        batch_frames=args.batch_frames, interval=args.interval, method=args.method)
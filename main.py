@@ -1,7 +1,136 @@
+import argparse
+import os
 from models.threat import ThreatVideoDiscriminator
+from models.parallel import process_video_parallel
+from models.regions import video_rois
+import config
 
-model = ThreatVideoDiscriminator(use_classifier=True, output_path="output/result1.mp4")
-model.process_video("assets/threat_1.mp4")
+VIDEO_EXT = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
 
-model = ThreatVideoDiscriminator(use_classifier=False , output_path="output/result2.mp4")
-model.process_video("assets/threat_1.mp4")
+
+def main():
+    """
+    영상 위협 분석 실행 스크립트
+
+    사용법:
+        python main.py -i assets/threat_1.mp4 -o output/result.mp4 [--no-cls] [--batch-frames K] [--threaded]
+        python main.py -i a.mp4 b.mp4 c.mp4 -o output/ --workers 4
+        python main.py -i assets/threat_1.mp4 --store output/threat_1.store  # 탐지 결과 저장소 함께 기록
+        python main.py -i assets/threat_1.mp4 --headless [--store output/threat_1.store]  # 경고 구간만
+        python main.py -i assets/threat_1.mp4 --anonymize [--head-source detector --head-model weights/head.pt]  # 머리 영역 가림
+    """
+    parser = argparse.ArgumentParser(description='거리 기반 보행자 위협 영상 분석')
+    parser.add_argument('-i', '--input', type=str, nargs='+', default=[config.INPUT_VIDEO_PATH],
+                        help='입력 영상 경로 (여러 개 지정 시 -o 는 결과 디렉토리, 영상 파일 경로를 주면 그 상위 디렉토리)')
+    parser.add_argument('-o', '--output', type=str, default=config.OUTPUT_VIDEO_PATH,
+                        help='결과 영상 저장 경로')
+    parser.add_argument('--no-cls', action='store_true',
+                        help='성별 분류기 없이 사람 탐지 + 거리 위협 판단만 수행')
+    parser.add_argument('--batch-frames', type=int, default=1,
+                        help='한 번에 배치 탐지할 프레임 수 (오프라인 처리 시 처리량 향상, 기본 1)')
+    parser.add_argument('--threaded', action='store_true',
+                        help='decode / infer / encode 를 스레드 파이프라인으로 겹쳐 실행')
+    parser.add_argument('--queue-size', type=int, default=8,
+                        help='threaded 모드의 단계 간 큐 크기 (기본 8)')
+    parser.add_argument('--backend', type=str, choices=['torch', 'onnxruntime', 'openvino'], default='torch',
+                        help='추론 백엔드 (onnxruntime / openvino 는 export.py 로 변환한 모델 사용)')
+    parser.add_argument('--int8-cls', action='store_true',
+                        help='quantize.py 로 만든 INT8 성별 분류기 사용')
+    parser.add_argument('--track-genders', action='store_true',
+                        help='사람을 추적하여 트랙마다 성별을 한 번만 분류 (캐시 + 다수결 평활화)')
+    parser.add_argument('--keyframe', action='store_true',
+                        help='적응형 간격의 keyframe 에서만 탐지하고 사이 프레임은 박스를 전파')
+    parser.add_argument('--motion-gate', action='store_true',
+                        help='사람이 없고 화면 변화가 없는 프레임은 탐지기를 건너뜀')
+    parser.add_argument('--roi-file', type=str, default=None,
+                        help=f'카메라별 관심 영역 다각형 yaml (예: {config.ROI_CONFIG_PATH})')
+    parser.add_argument('--camera', type=str, default=None,
+                        help='--roi-file 에서 찾을 카메라 ID (기본: 입력 영상 파일명)')
+    parser.add_argument('--tiled', action='store_true',
+                        help='고해상도 프레임을 겹치는 타일로 나눠 탐지 후 병합 (작은 / 먼 보행자)')
+    parser.add_argument('--store', type=str, default=None,
+                        help='프레임별 탐지 결과를 기록할 저장소 디렉토리 (입력이 여러 개면 그 아래 <영상 이름>/). '
+                             'query.py 로 질의 / 재렌더링')
+    parser.add_argument('--headless', action='store_true',
+                        help='결과 영상을 그리거나 인코딩하지 않고 분석만 수행 (경고 구간 출력, --store 로 결과 기록)')
+    parser.add_argument('--video-backend', type=str, choices=['auto', 'pyav', 'ffmpeg', 'opencv'],
+                        default=config.VIDEO_BACKEND,
+                        help='영상 디코드 / 인코드 백엔드 (auto: PyAV → ffmpeg → OpenCV 순으로 사용 가능한 것)')
+    parser.add_argument('--codec', type=str, default=config.VIDEO_CODEC,
+                        help='결과 영상 인코더 (pyav / ffmpeg: libx264, libx265, h264_nvenc ..., opencv: mp4v 등 FourCC)')
+    parser.add_argument('--crf', type=int, default=config.VIDEO_CRF, help='결과 영상 품질 (낮을수록 고화질)')
+    parser.add_argument('--preset', type=str, default=config.VIDEO_PRESET, help='인코딩 속도 프리셋 (ultrafast ~ veryslow)')
+    parser.add_argument('--decode-width', type=int, default=None,
+                        help='디코드 단계에서 이 가로 크기로 축소하여 분석 (거리 임계값 / 픽셀 좌표 ROI 도 같은 비율로 적용). '
+                             '결과 영상도 축소된 해상도로 기록되므로 원본 해상도 결과 영상이 필요하면 사용하지 마세요')
+    parser.add_argument('--anonymize', action='store_true',
+                        help='결과 영상의 머리 영역을 가림 (분석은 원본 프레임으로, face_blur.py 별도 패스 불필요)')
+    parser.add_argument('--head-source', type=str, choices=['person', 'detector'], default=config.HEAD_SOURCE,
+                        help='--anonymize 의 머리 영역: person (사람 탐지 박스 윗부분 추정, 추가 탐지 없음) / '
+                             'detector (별도 머리 탐지기를 keyframe 마다 실행)')
+    parser.add_argument('--head-model', type=str, default=config.HEAD_MODEL_PATH,
+                        help='--head-source detector 에 쓸 YOLO 머리 탐지 가중치 (없으면 realutils.detect_heads)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='프로세스 풀 워커 수. 1 이상이면 영상 1개는 프레임 구간으로, '
+                             '여러 개는 영상 단위로 나눠 병렬 처리 (기본 0: 단일 프로세스)')
+
+    args = parser.parse_args()
+    if (args.store or args.headless) and args.workers > 0:
+        parser.error('--store / --headless 는 단일 프로세스 모드 (--workers 0) 에서만 지원합니다')
+    if len(args.input) > 1 and os.path.splitext(args.output)[1].lower() in VIDEO_EXT:
+        # 여러 입력이면 -o 는 결과 디렉토리 (기본값 output/result.mp4 → output/)
+        args.output = os.path.dirname(args.output) or "."
+        print(f"📁 입력이 여러 개이므로 결과를 {args.output}/<영상 이름> 에 저장합니다")
+
+    video_kwargs = dict(batch_frames=args.batch_frames, threaded=args.threaded, queue_size=args.queue_size,
+                        decode_width=args.decode_width)
+    video_options = dict(codec=args.codec, crf=args.crf, preset=args.preset)
+
+    if args.workers > 0:
+        path = args.input if len(args.input) > 1 else args.input[0]
+        process_video_parallel(path, workers=args.workers, output_path=args.output,
+                               use_classifier=not args.no_cls, backend=args.backend,
+                               quantized_classifier=args.int8_cls, track_genders=args.track_genders,
+                               keyframe=args.keyframe, motion_gate=args.motion_gate,
+                               roi_file=args.roi_file, camera=args.camera, tiled=args.tiled,
+                               video_backend=args.video_backend, video_options=video_options,
+                               anonymize=args.anonymize, head_source=args.head_source, head_model_path=args.head_model,
+                               **video_kwargs)
+        return
+
+    model = ThreatVideoDiscriminator(use_classifier=not args.no_cls, output_path=args.output,
+                                     backend=args.backend, quantized_classifier=args.int8_cls,
+                                     track_genders=args.track_genders, keyframe=args.keyframe,
+                                     motion_gate=args.motion_gate,
+                                     rois=[] if args.roi_file else None, tiled=args.tiled,
+                                     headless=args.headless, video_backend=args.video_backend,
+                                     video_options=video_options, anonymize=args.anonymize,
+                                     head_source=args.head_source, head_model_path=args.head_model)
+    for video_path in args.input:
+        if len(args.input) > 1:
+            model.output_path = os.path.join(args.output, os.path.basename(video_path))
+        if model.regions is not None:
+            model.regions.set_rois(video_rois(args.roi_file, video_path, args.camera) if args.roi_file else None)
+        store_path = args.store
+        if store_path and len(args.input) > 1:
+            store_path = os.path.join(args.store, os.path.splitext(os.path.basename(video_path))[0])
+        summary = model.process_video(video_path, store_path=store_path, **video_kwargs)
+        if summary is not None:
+            print(f"📊 {video_path}: {summary['frames']} 프레임, 경고 프레임 {summary['alert_frames']}")
+            for start, end in summary["alert_intervals"]:
+                print(f"🚨 경고 {start:8.2f}s ~ {end:8.2f}s")
+        if args.threaded:
+            print(f"📊 파이프라인 큐 통계: {model.pipeline_stats}")
+        if model.gender_cache is not None:
+            print(f"📊 성별 분류 호출: {model.gender_cache.stats}")
+        if model.keyframe is not None:
+            print(f"📊 keyframe 탐지: {model.keyframe.stats}")
+        if model.head_masker is not None:
+            print(f"📊 머리 탐지: {model.head_masker.stats}")
+        if model.motion_gate is not None:
+            print(f"📊 움직임 게이트: {model.motion_gate.stats} "
+                  f"(건너뛴 비율 {model.motion_gate.skip_fraction * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+class DynamicBatcher:
+    """
+    asyncio 동적 배처
+
+    동시에 들어온 요청을 모아 batch_fn 한 번으로 처리합니다. 첫 요청이 들어온 뒤 max_wait_ms 안에
+    도착한 요청을 max_batch 까지 묶으며, batch_fn 은 단일 추론 스레드에서 실행되므로
+    재사용 버퍼를 가진 탐지기 / 분류기를 여러 요청이 동시에 건드리지 않습니다.
+
+    batch_fn(items: list) -> list 는 입력과 같은 순서 / 길이의 결과를 반환해야 합니다.
+    """
+
+    def __init__(self, batch_fn, max_batch: int, max_wait_ms: float):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="infer")
+        self.queue = None
+        self._task = None
+        self.batch_sizes = deque(maxlen=10000)
+        self.infer_times = deque(maxlen=10000)
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=True)
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            t = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.infer_times.append(time.perf_counter() - t)
+            self.batch_sizes.append(len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        return {"batches": len(self.batch_sizes),
+                "mean_batch": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+                "mean_infer_ms": float(np.mean(self.infer_times) * 1e3) if self.infer_times else 0.0}
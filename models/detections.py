@@ -0,0 +1,29 @@
+from typing import NamedTuple
+import numpy as np
+
+DETECTION_DTYPE = np.dtype([
+    ("box", np.int32, (4,)),
+    ("center", np.int32, (2,)),
+    ("conf", np.float32),
+    ("cls", np.int32),
+])
+
+
+class Detections(NamedTuple):
+    """한 프레임의 사람 탐지 결과 (모두 연속 NumPy 배열)"""
+    boxes: np.ndarray    # (N, 4) int32, x1 y1 x2 y2
+    centers: np.ndarray  # (N, 2) int32, cx cy
+    confs: np.ndarray    # (N,) float32
+    classes: np.ndarray  # (N,) int32
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, 4), np.int32), np.empty((0, 2), np.int32),
+                   np.empty(0, np.float32), np.empty(0, np.int32))
+
+    def to_structured(self):
+        """DETECTION_DTYPE 구조화 배열 (N,) 로 변환합니다."""
+        out = np.empty(len(self.boxes), dtype=DETECTION_DTYPE)
+        out["box"], out["center"] = self.boxes, self.centers
+        out["conf"], out["cls"] = self.confs, self.classes
+        return out
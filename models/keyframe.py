@@ -0,0 +1,151 @@
+import warnings
+import cv2
+import numpy as np
+from models.proximity import ProximityEngine
+from models.tracker import iou_matrix
+import config
+
+
+class KeyframeDetector:
+    """
+    적응형 keyframe 탐지기
+
+    탐지기는 stride 프레임마다 (keyframe) 한 번만 실행하고, 사이 프레임의 박스는
+    축소한 흑백 프레임의 Lucas-Kanade optical flow 로 이전 박스를 이동시켜 전파합니다.
+
+    전파한 박스에 거리 임계값의 (1 + alert_margin) 배 이내 쌍이 생기면 남은 간격을 버리고 다음 프레임을 keyframe 으로 합니다.
+
+    stride 는 keyframe 마다 다음 규칙으로 조정됩니다.
+        - 거리 임계값의 (1 + alert_margin) 배 이내에 있는 쌍이 있으면: min_stride
+        - 움직임 (박스 이동량 중앙값) 이 high_motion 이상이거나,
+          전파한 박스가 새 탐지 결과와 어긋나면 (IoU < drift_iou 또는 인원 수 변화): 절반으로
+        - 움직임이 low_motion 미만 (정적 장면) 이거나 전파가 정확했으면: 1 씩 증가 (최대 max_stride)
+
+    프레임 순서대로 호출해야 하는 stateful 탐지기이며, 영상마다 reset() 해야 합니다.
+    """
+
+    def __init__(self, detector,
+                 distance_threshold: float = config.DISTANCE_THRESHOLD,
+                 min_stride: int = 1,
+                 max_stride: int = config.KEYFRAME_MAX_STRIDE,
+                 alert_margin: float = config.KEYFRAME_ALERT_MARGIN,
+                 high_motion: float = config.KEYFRAME_HIGH_MOTION,
+                 low_motion: float = config.KEYFRAME_LOW_MOTION,
+                 drift_iou: float = 0.7,
+                 flow_width: int = 320):
+        self.detector = detector
+        self.min_stride = min_stride
+        self.max_stride = max_stride
+        self.high_motion = high_motion
+        self.low_motion = low_motion
+        self.drift_iou = drift_iou
+        self.flow_width = flow_width
+        self.alert_margin = alert_margin
+        self.set_distance_threshold(distance_threshold)
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        # 박스 내부 중앙 영역의 3x3 격자 점 (박스 크기 대비 비율)
+        g = np.array([0.25, 0.5, 0.75])
+        self.grid = np.stack(np.meshgrid(g, g), axis=-1).reshape(-1, 2)
+        self.reset()
+
+    def set_distance_threshold(self, distance_threshold: float):
+        self.guard = ProximityEngine(distance_threshold * (1 + self.alert_margin))
+
+    def reset(self):
+        self.stride = self.min_stride
+        self.countdown = 0
+        self.motion = 0.0
+        self.dets = None
+        self.prev_gray = None
+        self.scale = 1.0
+        self.stats = {"frames": 0, "keyframes": 0, "guard_triggers": 0}
+
+    @property
+    def model(self):
+        return self.detector.model
+
+    def detect(self, frame, structured: bool = False):
+        gray = self._small_gray(frame)
+        disp = None
+        if self.dets is not None and len(self.dets.boxes) and self.prev_gray is not None:
+            disp = self._box_flow(self.prev_gray, gray, self.dets.boxes)
+            valid = ~np.isnan(disp[:, 0])
+            if valid.any():
+                self.motion = float(np.median(np.linalg.norm(disp[valid], axis=1)))
+        else:
+            # 전파할 박스가 없으면 마지막으로 사람이 있던 프레임의 움직임을 간격 조절에 쓰지 않음
+            self.motion = 0.0
+
+        self.stats["frames"] += 1
+        if self.dets is None or self.countdown <= 0:
+            dets = self.detector.detect(frame)
+            self.stats["keyframes"] += 1
+            predicted = self._propagate(self.dets, disp, frame.shape[:2]) if self.dets is not None else None
+            self._adapt(dets, predicted)
+            self.countdown = self.stride - 1
+        else:
+            dets = self._propagate(self.dets, disp, frame.shape[:2])
+            self.countdown -= 1
+            if self.guard.any_violation(dets.centers):
+                # 간격 도중 가까워진 쌍은 다음 keyframe 까지 기다리지 않고 바로 다음 프레임에서 탐지
+                self.countdown = 0
+                self.stats["guard_triggers"] += 1
+
+        self.prev_gray = gray
+        self.dets = dets
+        return dets.to_structured() if structured else dets
+
+    def detect_batch(self, frames, structured: bool = False):
+        # 프레임 간 상태가 필요하므로 순서대로 처리
+        return [self.detect(frame, structured=structured) for frame in frames]
+
+    def _adapt(self, dets, predicted):
+        tracked = predicted is not None and self._agrees(predicted.boxes, dets.boxes)
+        if self.guard.any_violation(dets.centers):
+            self.stride = self.min_stride
+        elif self.motion >= self.high_motion or (predicted is not None and not tracked):
+            self.stride = max(self.min_stride, self.stride // 2)
+        elif self.motion < self.low_motion or tracked:
+            self.stride = min(self.max_stride, self.stride + 1)
+
+    def _agrees(self, predicted, detected):
+        """전파한 박스가 새 탐지 박스와 1:1 로 drift_iou 이상 겹치는지"""
+        if len(predicted) != len(detected):
+            return False
+        if not len(detected):
+            return True
+        return bool((iou_matrix(detected.astype(np.float64), predicted.astype(np.float64)).max(axis=1)
+                     >= self.drift_iou).all())
+
+    def _small_gray(self, frame):
+        h, w = frame.shape[:2]
+        self.scale = min(1.0, self.flow_width / w)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.scale < 1.0:
+            gray = cv2.resize(gray, (int(w * self.scale), int(h * self.scale)), interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _box_flow(self, prev_gray, gray, boxes):
+        """박스별 이동량 (N, 2) 원본 해상도 px. 추적 실패한 박스는 NaN"""
+        b = boxes.astype(np.float32) * self.scale
+        wh = b[:, 2:] - b[:, :2]
+        pts = (b[:, None, :2] + wh[:, None, :] * self.grid[None]).reshape(-1, 1, 2).astype(np.float32)
+        nxt, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, pts, None, **self.lk_params)
+        d = (nxt - pts).reshape(len(boxes), len(self.grid), 2)
+        ok = status.reshape(len(boxes), len(self.grid)).astype(bool)
+        d[~ok] = np.nan
+        with warnings.catch_warnings():
+            # 모든 점을 놓친 박스는 All-NaN 경고 대신 NaN 으로 남김
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return np.nanmedian(d, axis=1) / self.scale
+
+    def _propagate(self, dets, disp, shape):
+        if disp is None or not len(dets.boxes):
+            return dets
+        shift = np.nan_to_num(disp, nan=0.0)
+        boxes = dets.boxes + np.round(np.tile(shift, 2)).astype(np.int32)
+        h, w = shape
+        boxes[:, 0::2] = boxes[:, 0::2].clip(0, w)
+        boxes[:, 1::2] = boxes[:, 1::2].clip(0, h)
+        return type(dets)(boxes, (boxes[:, :2] + boxes[:, 2:]) // 2, dets.confs, dets.classes)
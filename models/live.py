@@ -0,0 +1,247 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+import cv2
+import numpy as np
+from utils.custom_logger import custom_logger
+import config
+
+logger = custom_logger(__name__)
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS (MB). resource 모듈이 없는 플랫폼 (Windows) 에서는 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 byte 단위
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+class LiveFrame(NamedTuple):
+    seq: int                # 처리 순번 (0부터)
+    annotated: np.ndarray   # BGR 결과 프레임
+    crops: list             # 표시용 사람 크롭 (RGB, crop_size)
+    alert: bool             # 거리 임계값 위반 여부
+    latency: float          # 이 프레임의 추론 + 그리기 시간 (초)
+
+
+class FrameRing:
+    """
+    고정 크기 링 버퍼 (스레드 안전)
+
+    생산자는 처리된 프레임을 계속 넣고, 소비자는 latest() 로 가장 최근 프레임만 가져갑니다.
+    소비자가 느리면 오래된 프레임은 덮어써져 자연스럽게 버려집니다.
+    """
+
+    def __init__(self, capacity: int = 4):
+        self._items = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def put(self, item):
+        with self._lock:
+            self._items.append(item)
+
+    def latest(self):
+        with self._lock:
+            return self._items[-1] if self._items else None
+
+
+class UploadSpool:
+    """
+    업로드 파일 객체를 청크 단위로 임시 파일에 쓰는 스레드
+
+    fileobj.read() 로 전체 복사본을 만들지 않고 chunk_mb 씩 디스크로 옮기며, 쓰는 동안 written 이 증가합니다.
+    임시 파일은 cleanup() (또는 with 블록 종료) 시 삭제됩니다.
+    """
+
+    def __init__(self, fileobj, suffix: str = ".mp4", chunk_mb: int = config.UPLOAD_CHUNK_MB, dir: str = None):
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=dir)
+        os.close(fd)
+        self.fileobj = fileobj
+        self.chunk_size = chunk_mb << 20
+        self.total = getattr(fileobj, "size", None)
+        self.written = 0
+        self.error = None
+        self.finished = threading.Event()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="upload-spool", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait_for(self, nbytes: int, timeout: float = None) -> bool:
+        """nbytes 이상 기록되거나 쓰기가 끝날 때까지 기다립니다. 조건을 만족하면 True"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.written >= nbytes or self.finished.is_set(), timeout)
+
+    def cleanup(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+    def _run(self):
+        try:
+            self.fileobj.seek(0)
+            with open(self.path, "wb") as f:
+                while not self._stop.is_set():
+                    chunk = self.fileobj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    f.flush()
+                    with self._cond:
+                        self.written += len(chunk)
+                        self._cond.notify_all()
+        except Exception as e:
+            logger.error(f"업로드 기록 실패: {e}")
+            self.error = e
+        finally:
+            with self._cond:
+                self.finished.set()
+                self._cond.notify_all()
+
+
+class LiveAnalysisWorker:
+    """
+    화면 표시와 분리된 백그라운드 분석 스레드
+
+    영상을 디코드하며 프레임마다 탐지 / 분류 / 그리기를 수행하고 결과를 FrameRing 에 씁니다.
+    UI 는 자신의 표시 주기에 맞춰 ring.latest() 만 읽으므로, 추론이 느리면 표시 프레임이 건너뛰어지고
+    추론이 빠르면 표시 주기에 묶이지 않고 끝까지 처리됩니다.
+
+    model 은 여러 세션이 공유할 수 있으므로 (st.cache_resource), lock 을 주면 프레임 단위로 잡고 추론합니다.
+
+    source 로 UploadSpool 을 주면 파일이 다 쓰이기 전에 분석을 시작합니다. 점진 디코드가 가능한 컨테이너
+    (mkv, avi, faststart mp4 등) 는 기록된 부분까지 읽고, 끝에 닿으면 더 기록될 때까지 기다렸다가 다시 열어
+    이어 읽습니다. 열 수 없는 경우 (moov 가 끝에 있는 mp4 등) 는 기록이 끝날 때까지 기다립니다.
+    """
+
+    def __init__(self, model, source, ring_size: int = 4, lock: threading.Lock = None,
+                 crop_size=(150, 200), max_crops: int = 12, start_mb: int = config.UPLOAD_START_MB):
+        self.model = model
+        self.spool = source if isinstance(source, UploadSpool) else None
+        self.source = self.spool.path if self.spool is not None else source
+        self.start_bytes = start_mb << 20
+        self.ring = FrameRing(ring_size)
+        self.lock = lock or threading.Lock()
+        self.crop_size = crop_size
+        self.max_crops = max_crops
+        self.total_frames = 0
+        self.processed = 0
+        self.error = None
+        self.latencies = deque(maxlen=30)
+        self._started = None
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="live-analysis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def stats(self):
+        """처리 FPS (시작 이후 평균), 최근 30 프레임 평균 지연 (ms), 진행률"""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {"processed": self.processed,
+                "total": self.total_frames,
+                "fps": self.processed / elapsed if elapsed > 0 else 0.0,
+                "latency_ms": float(np.mean(self.latencies) * 1e3) if self.latencies else 0.0}
+
+    def _run(self):
+        try:
+            for frame in self._frames():
+                t = time.perf_counter()
+                with self.lock:
+                    annotated, crops, alert = self._analyze(frame)
+                latency = time.perf_counter() - t
+                self.latencies.append(latency)
+                self.ring.put(LiveFrame(self.processed, annotated, crops, alert, latency))
+                self.processed += 1
+        except Exception as e:
+            logger.error(f"분석 실패: {e}")
+            self.error = e
+        finally:
+            self._done.set()
+
+    def _frames(self):
+        spool = self.spool
+        if spool is not None:
+            self._wait(lambda: spool.wait_for(self.start_bytes, 0.2))
+        index = 0
+        while not self._stop.is_set():
+            complete = spool is None or spool.finished.is_set()
+            if complete and spool is not None and spool.error is not None:
+                raise spool.error
+            written = spool.written if spool is not None else 0
+
+            cap = cv2.VideoCapture(self.source)
+            if cap.isOpened():
+                self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if complete else 0
+                if index:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                try:
+                    while not self._stop.is_set():
+                        ret, frame = cap.read()
+                        if not ret:
+                            break
+                        index += 1
+                        yield frame
+                finally:
+                    cap.release()
+            elif complete:
+                raise RuntimeError(f"Cannot open video: {self.source}")
+            if complete:
+                return
+            # 기록 중인 파일의 끝에 도달: 더 기록되면 다시 열어 index 프레임부터 이어 읽음
+            self._wait(lambda: spool.wait_for(written + spool.chunk_size, 0.2))
+
+    def _wait(self, ready):
+        while not self._stop.is_set() and not ready():
+            pass
+
+    def _analyze(self, frame):
+        model = self.model
+        dets = model.detector.detect(frame)
+        boxes, centers = dets.boxes, dets.centers
+
+        crops = []
+        genders = None
+        if model.use_classifier:
+            genders, _ = model.classifier.classify_batch(frame, boxes)
+            crops = [cv2.cvtColor(cv2.resize(crop, self.crop_size), cv2.COLOR_BGR2RGB)
+                     for crop in model.classifier.crop_boxes(frame, boxes[:self.max_crops]) if crop.size]
+
+        alert = model.analyzer.proximity.any_violation(centers)
+        annotated = model.analyzer.draw(frame, boxes, genders, centers)
+        return annotated, crops, alert
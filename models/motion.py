@@ -0,0 +1,118 @@
+import cv2
+import numpy as np
+import config
+
+
+class MotionGatedDetector:
+    """
+    움직임 게이트 탐지기
+
+    탐지 전에 축소한 흑백 프레임을 마지막으로 탐지기를 실행한 프레임 (reference) 과 비교합니다.
+    변화한 화소 비율이 area_thres 미만이고 마지막 탐지 결과가 비어 있으면
+    탐지기를 건너뛰고 이전 (빈) 결과를 재사용합니다.
+    reference 와 비교하므로 천천히 들어오는 사람처럼 프레임 간 차이가 작은 변화도 누적되어 잡히며,
+    max_skip 프레임 연속으로 건너뛴 뒤에는 한 번 탐지기를 실행합니다.
+
+    축소 / 흑백 / 차분 버퍼는 미리 할당해 재사용합니다.
+    프레임 순서대로 호출해야 하는 stateful 탐지기이며, 영상마다 reset() 해야 합니다.
+    """
+
+    def __init__(self, detector,
+                 width: int = config.MOTION_GATE_WIDTH,
+                 pixel_thres: int = config.MOTION_PIXEL_THRES,
+                 area_thres: float = config.MOTION_AREA_THRES,
+                 max_skip: int = config.MOTION_MAX_SKIP):
+        self.detector = detector
+        self.width = width
+        self.pixel_thres = pixel_thres
+        self.area_thres = area_thres
+        self.max_skip = max_skip
+        self._size = None
+        self.reset()
+
+    def reset(self):
+        self.last = None
+        self.skipped_run = 0
+        self.stats = {"frames": 0, "skipped": 0}
+        self._has_ref = False
+
+    @property
+    def model(self):
+        return self.detector.model
+
+    @property
+    def skip_fraction(self) -> float:
+        return self.stats["skipped"] / max(self.stats["frames"], 1)
+
+    def detect(self, frame, structured: bool = False):
+        self.stats["frames"] += 1
+        if self._should_skip(frame):
+            self.stats["skipped"] += 1
+            self.skipped_run += 1
+            dets = self.last
+        else:
+            dets = self._run([frame])[0]
+        return dets.to_structured() if structured else dets
+
+    def detect_batch(self, frames, structured: bool = False):
+        """
+        배치 안에서는 탐지기를 실행할 프레임이 생기면 그 결과를 알 수 없으므로
+        이후 프레임은 모두 실행 대상으로 두고 (보수적), 실행 대상만 한 번에 배치 탐지합니다.
+        """
+        out = [None] * len(frames)
+        todo = []
+        for k, frame in enumerate(frames):
+            self.stats["frames"] += 1
+            if not todo and self._should_skip(frame):
+                self.stats["skipped"] += 1
+                self.skipped_run += 1
+                out[k] = self.last
+            else:
+                if todo:
+                    self._shrink(frame)
+                    self._update_reference()
+                todo.append(k)
+        if todo:
+            for k, dets in zip(todo, self._run([frames[k] for k in todo])):
+                out[k] = dets
+        return [d.to_structured() for d in out] if structured else out
+
+    def _run(self, frames):
+        results = self.detector.detect_batch(frames) if len(frames) > 1 else [self.detector.detect(frames[0])]
+        self.last = results[-1]
+        self.skipped_run = 0
+        return results
+
+    def _should_skip(self, frame) -> bool:
+        """현재 프레임을 축소 버퍼에 기록하고, 건너뛸 수 있으면 True (아니면 reference 로 교체)"""
+        self._shrink(frame)
+        if (self.last is None or len(self.last.boxes) or not self._has_ref
+                or self.skipped_run >= self.max_skip):
+            self._update_reference()
+            return False
+        cv2.absdiff(self._gray, self._ref, dst=self._diff)
+        cv2.threshold(self._diff, self.pixel_thres, 255, cv2.THRESH_BINARY, dst=self._diff)
+        if cv2.countNonZero(self._diff) >= self.area_thres * self._diff.size:
+            self._update_reference()
+            return False
+        return True
+
+    def _shrink(self, frame):
+        h, w = frame.shape[:2]
+        if self._size is None or self._src_shape != (h, w):
+            scale = min(1.0, self.width / w)
+            self._src_shape = (h, w)
+            self._size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            self._small = np.empty((self._size[1], self._size[0], 3), dtype=np.uint8)
+            self._gray = np.empty(self._size[::-1], dtype=np.uint8)
+            self._ref = np.empty_like(self._gray)
+            self._diff = np.empty_like(self._gray)
+            self._has_ref = False
+        cv2.resize(frame, self._size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        # 센서 노이즈 / 압축 아티팩트 억제
+        cv2.GaussianBlur(self._gray, (5, 5), 0, dst=self._gray)
+
+    def _update_reference(self):
+        np.copyto(self._ref, self._gray)
+        self._has_ref = True
@@ -0,0 +1,186 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+from utils.video_io import open_writer
+import config
+
+# 워커 프로세스마다 한 번만 생성되는 모델
+_worker_model = None
+
+
+def _init_worker(model_kwargs, torch_threads):
+    """워커 프로세스 초기화: 탐지기/분류기를 한 번만 로드합니다."""
+    global _worker_model
+    import torch
+    from models.threat import ThreatVideoDiscriminator
+
+    torch.set_num_threads(torch_threads)
+    _worker_model = ThreatVideoDiscriminator(**model_kwargs)
+
+
+def _run_job(video_path, output_path, start_frame, end_frame, video_kwargs, roi_source=None):
+    if roi_source is not None:
+        # 영상마다 자기 카메라의 ROI 를 사용
+        from models.regions import video_rois
+        roi_file, camera = roi_source
+        _worker_model.regions.set_rois(video_rois(roi_file, video_path, camera))
+    _worker_model.output_path = output_path
+    _worker_model.process_video(video_path, start_frame=start_frame, end_frame=end_frame, **video_kwargs)
+    return output_path
+
+
+def split_frame_ranges(frame_count: int, shards: int):
+    """[0, frame_count) 를 shards 개의 연속 구간으로 나눕니다. 마지막 구간은 영상 끝까지 (end=None)."""
+    shards = max(1, min(shards, frame_count)) if frame_count > 0 else 1
+    step = frame_count // shards
+    ranges = [(k * step, (k + 1) * step) for k in range(shards)]
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+def concat_segments(segments, output_path: str, fps: float, size, video_backend: str = config.VIDEO_BACKEND,
+                    video_options: dict = None):
+    """
+    구간별 결과 영상을 순서대로 이어 붙여 하나의 영상으로 만듭니다.
+
+    ffmpeg 가 있으면 concat demuxer 로 재인코딩 없이 복사하고,
+    없으면 프레임을 읽어 video_backend 로 다시 기록합니다.
+    """
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    if shutil.which("ffmpeg"):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            for seg in segments:
+                f.write(f"file '{os.path.abspath(seg)}'\n")
+            list_path = f.name
+        try:
+            subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                            "-i", list_path, "-c", "copy", output_path], check=True)
+        finally:
+            os.remove(list_path)
+        return output_path
+
+    # 축소 디코드 (decode_width) 시 구간 영상은 원본보다 작으므로 첫 구간 크기를 따름
+    cap = cv2.VideoCapture(segments[0])
+    if cap.isOpened():
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+    writer = open_writer(output_path, fps, size, backend=video_backend, **(video_options or {}))
+    try:
+        for seg in segments:
+            cap = cv2.VideoCapture(seg)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                writer.write(frame)
+            cap.release()
+    finally:
+        writer.release()
+    return output_path
+
+
+def process_video_parallel(path, workers: int = None,
+                           output_path: str = config.OUTPUT_VIDEO_PATH,
+                           use_classifier: bool = True,
+                           det_model_path: str = config.DET_MODEL_PATH,
+                           cls_model_path: str = config.CLS_MODEL_PATH,
+                           backend: str = "torch",
+                           quantized_classifier: bool = False,
+                           track_genders: bool = False,
+                           keyframe: bool = False,
+                           motion_gate: bool = False,
+                           rois=None,
+                           roi_file: str = None,
+                           camera: str = None,
+                           tiled: bool = False,
+                           video_backend: str = config.VIDEO_BACKEND,
+                           video_options: dict = None,
+                           anonymize: bool = False,
+                           head_source: str = config.HEAD_SOURCE,
+                           head_model_path: str = config.HEAD_MODEL_PATH,
+                           **video_kwargs):
+    """
+    프로세스 풀로 영상을 병렬 처리합니다. (CPU 전용 노드용)
+
+    - path 가 문자열이면: 영상을 프레임 구간(shard)으로 나눠 워커에 분배하고,
+      구간별 결과를 순서대로 이어 붙여 output_path 에 저장합니다.
+      프레임 수와 순서는 직렬 처리와 같습니다.
+    - path 가 리스트이면: 영상 단위로 워커에 분배하며, output_path 는 디렉토리로 취급되어
+      각 결과가 output_path/<원본 파일명> 에 저장됩니다.
+
+    각 워커는 탐지기/분류기를 한 번만 로드하고, 코어를 나눠 쓰도록 torch 스레드 수를 제한합니다.
+    spawn 방식으로 워커를 띄우므로 스크립트에서는 `if __name__ == "__main__":` 안에서 호출해야 합니다.
+
+    Args:
+        path (str | list[str]): 입력 영상 경로 또는 경로 목록
+        workers (int): 워커 프로세스 수 (기본: CPU 코어 수)
+        output_path (str): 결과 영상 경로 (리스트 입력 시 결과 디렉토리)
+        backend (str): 추론 백엔드 ("torch" | "onnxruntime" | "openvino")
+        quantized_classifier (bool): INT8 성별 분류기 사용 여부
+        track_genders (bool): 트랙 단위 성별 캐시 사용 여부 (shard 마다 추적 상태를 새로 시작)
+        keyframe (bool): 적응형 keyframe 탐지 사용 여부 (shard 첫 프레임은 항상 keyframe)
+        motion_gate (bool): 움직임 게이트 사용 여부 (shard 첫 프레임은 항상 탐지)
+        rois (list[np.ndarray]): 관심 영역 다각형 목록 (모든 입력 영상에 같이 적용)
+        roi_file (str): 카메라별 ROI yaml. 지정하면 rois 대신 워커에서 영상마다 models/regions.video_rois 로 읽음
+        camera (str): roi_file 에서 찾을 카메라 ID (기본: 각 입력 영상 파일명)
+        tiled (bool): 타일 탐지 사용 여부
+        video_backend (str): 영상 입출력 백엔드 (utils/video_io)
+        video_options (dict): 결과 영상 인코딩 옵션 {"codec", "crf", "preset"}
+        anonymize (bool): 결과 영상의 머리 영역 가림 여부
+        head_source (str): "person" (사람 박스 윗부분) | "detector" (shard 첫 프레임은 항상 머리 탐지)
+        head_model_path (str): head_source="detector" 의 머리 탐지 가중치 (없으면 realutils.detect_heads)
+        **video_kwargs: ThreatVideoDiscriminator.process_video 에 전달할 추가 인자 (batch_frames 등)
+
+    Returns:
+        str | list[str]: 결과 영상 경로 (리스트 입력 시 입력 순서대로)
+    """
+    workers = workers or os.cpu_count() or 1
+    model_kwargs = dict(use_classifier=use_classifier, backend=backend, quantized_classifier=quantized_classifier,
+                        track_genders=track_genders, keyframe=keyframe,
+                        motion_gate=motion_gate, rois=[] if roi_file else rois, tiled=tiled, det_model_path=det_model_path, cls_model_path=cls_model_path,
+                        video_backend=video_backend, video_options=video_options,
+                        anonymize=anonymize, head_source=head_source,
+                        head_model_path=head_model_path)
+
+    roi_source = (roi_file, camera) if roi_file else None
+
+    if isinstance(path, (list, tuple)):
+        jobs = [(p, os.path.join(output_path, os.path.basename(p)), 0, None) for p in path]
+        return _run_pool(jobs, min(workers, len(jobs)), model_kwargs, video_kwargs, roi_source)
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video: {path}")
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+
+    ranges = split_frame_ranges(frame_count, workers)
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    seg_dir = tempfile.mkdtemp(prefix="threat_shards_", dir=os.path.dirname(output_path) or None)
+    try:
+        jobs = [(path, os.path.join(seg_dir, f"part_{k:04d}.mp4"), start, end)
+                for k, (start, end) in enumerate(ranges)]
+        segments = _run_pool(jobs, len(jobs), model_kwargs, video_kwargs, roi_source)
+        concat_segments(segments, output_path, fps, size, video_backend, video_options)
+    finally:
+        shutil.rmtree(seg_dir, ignore_errors=True)
+    print(f"🎬 병렬 처리 저장 완료 ({len(ranges)} shards) → {output_path}")
+    return output_path
+
+
+def _run_pool(jobs, workers, model_kwargs, video_kwargs, roi_source=None):
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(model_kwargs, torch_threads)) as pool:
+        futures = [pool.submit(_run_job, *job, video_kwargs, roi_source) for job in jobs]
+        return [f.result() for f in futures]
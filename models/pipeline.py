@@ -0,0 +1,161 @@
+import queue
+import threading
+import time
+
+_SENTINEL = object()
+
+
+class QueueStats:
+    """bounded queue 한 개의 깊이/대기 통계"""
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.items = 0
+        self.max_depth = 0
+        self._depth_sum = 0
+        self.blocked_s = 0.0  # 큐가 가득 차서 생산자가 기다린 시간 (backpressure)
+
+    def record(self, depth: int, blocked: float):
+        self.items += 1
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_sum += depth
+        self.blocked_s += blocked
+
+    def as_dict(self):
+        return {
+            "maxsize": self.maxsize,
+            "items": self.items,
+            "max_depth": self.max_depth,
+            "mean_depth": self._depth_sum / self.items if self.items else 0.0,
+            "blocked_s": round(self.blocked_s, 4),
+        }
+
+
+class ThreadedVideoPipeline:
+    """
+    decode → infer → encode 3단계 producer/consumer 파이프라인
+
+    - decoder 스레드가 프레임을 읽어 decode 큐에 넣고,
+    - 호출 스레드가 batch_size 단위로 infer_fn 을 실행해 encode 큐에 넣으며,
+    - encoder 스레드가 결과 프레임을 순서대로 기록합니다.
+
+    각 단계는 bounded queue 로 연결되어 느린 단계가 앞 단계를 멈추게 하고 (backpressure),
+    어느 단계에서든 예외가 나면 모든 단계를 멈춘 뒤 호출 스레드에서 다시 raise 합니다.
+    큐는 FIFO 이고 infer 단계는 하나뿐이므로 출력 프레임 순서는 직렬 처리와 같습니다.
+    """
+
+    def __init__(self, infer_fn, batch_size: int = 1, queue_size: int = 8):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be >= 1, got {queue_size}")
+        self.infer_fn = infer_fn
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.stats = {}
+
+    def run(self, cap, writer):
+        """
+        Args:
+            cap: read() -> (ret, frame) 를 제공하는 입력 (cv2.VideoCapture 등)
+            writer: write(frame) 를 제공하는 출력 (cv2.VideoWriter 등)
+
+        Returns:
+            dict: 단계별 큐 통계
+        """
+        self._stop = threading.Event()
+        self._error = None
+        decode_q = queue.Queue(maxsize=self.queue_size)
+        encode_q = queue.Queue(maxsize=self.queue_size)
+        decode_stats = QueueStats("decode", self.queue_size)
+        encode_stats = QueueStats("encode", self.queue_size)
+
+        decoder = threading.Thread(target=self._decode, args=(cap, decode_q, decode_stats),
+                                   name="pipeline-decode", daemon=True)
+        encoder = threading.Thread(target=self._encode, args=(writer, encode_q),
+                                   name="pipeline-encode", daemon=True)
+        decoder.start()
+        encoder.start()
+
+        try:
+            batch = []
+            while True:
+                item = self._get(decode_q)
+                if item is _SENTINEL:
+                    break
+                batch.append(item)
+                if len(batch) == self.batch_size:
+                    self._infer(batch, encode_q, encode_stats)
+                    batch = []
+            if batch and not self._stop.is_set():
+                self._infer(batch, encode_q, encode_stats)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(encode_q, _SENTINEL, None)
+            decoder.join()
+            encoder.join()
+
+        self.stats = {"decode": decode_stats.as_dict(), "encode": encode_stats.as_dict()}
+        if self._error is not None:
+            raise self._error
+        return self.stats
+
+    def _infer(self, batch, encode_q, encode_stats):
+        for out in self.infer_fn(batch):
+            if not self._put(encode_q, out, encode_stats):
+                return
+
+    def _decode(self, cap, decode_q, decode_stats):
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if not self._put(decode_q, frame, decode_stats):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(decode_q, _SENTINEL, None)
+
+    def _encode(self, writer, encode_q):
+        try:
+            while True:
+                item = self._get(encode_q)
+                if item is _SENTINEL:
+                    break
+                writer.write(item)
+        except BaseException as e:
+            self._fail(e)
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _put(self, q, item, stats):
+        """가득 찬 큐에서는 대기하되, 중단 요청이 오면 False 를 반환합니다."""
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set() and item is not _SENTINEL:
+                return False
+            try:
+                q.put(item, timeout=0.1)
+            except queue.Full:
+                if self._stop.is_set():
+                    return False
+                continue
+            if stats is not None:
+                stats.record(q.qsize(), time.perf_counter() - start)
+            return True
+
+    def _get(self, q):
+        """중단 요청이 오면 _SENTINEL 을 반환합니다."""
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _SENTINEL
@@ -0,0 +1,149 @@
+import cv2
+import numpy as np
+import config
+
+
+def expand_boxes(boxes, shape, pad: float = config.FACE_BLUR_PAD):
+    """박스를 가로 / 세로 크기의 pad 비율만큼 넓히고 프레임 경계로 자릅니다. (N, 4) int64 반환"""
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+    h, w = shape[:2]
+    margin = ((boxes[:, 2:] - boxes[:, :2]) * pad).astype(np.int64)
+    out = np.concatenate([boxes[:, :2] - margin, boxes[:, 2:] + margin], axis=1)
+    out[:, 0::2] = out[:, 0::2].clip(0, w)
+    out[:, 1::2] = out[:, 1::2].clip(0, h)
+    return out
+
+
+def head_regions(person_boxes, top: float = config.HEAD_TOP_RATIO, width: float = config.HEAD_WIDTH_RATIO):
+    """사람 박스의 윗부분 (높이의 top 비율, 가운데 폭의 width 비율) 을 머리 영역으로 추정합니다. (N, 4) int64 반환"""
+    boxes = np.asarray(person_boxes, dtype=np.int64).reshape(-1, 4)
+    cx = (boxes[:, 0] + boxes[:, 2]) // 2
+    half = ((boxes[:, 2] - boxes[:, 0]) * width / 2).astype(np.int64)
+    bottom = boxes[:, 1] + ((boxes[:, 3] - boxes[:, 1]) * top).astype(np.int64)
+    return np.stack([cx - half, boxes[:, 1], cx + half, bottom], axis=1)
+
+
+def pixelate(frame, boxes, cells: int = config.FACE_BLUR_CELLS):
+    """박스 영역을 긴 변 기준 cells 칸의 모자이크로 덮습니다 (in-place)."""
+    for x1, y1, x2, y2 in boxes:
+        roi = frame[y1:y2, x1:x2]
+        h, w = roi.shape[:2]
+        if h == 0 or w == 0:
+            continue
+        step = max(max(h, w) / cells, 1.0)
+        small = cv2.resize(roi, (max(int(w / step), 1), max(int(h / step), 1)), interpolation=cv2.INTER_AREA)
+        roi[:] = cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+    return frame
+
+
+def downsampled_blur(frame, boxes, factor: int = 4, sigma: float = 8.0):
+    """
+    박스 영역을 1/factor 로 줄여 분리형 가우시안 블러 후 다시 키웁니다 (in-place).
+    기존 51x51 GaussianBlur (sigma 8) 와 비슷한 흐림을 factor² 배 적은 화소에서 계산합니다.
+    """
+    for x1, y1, x2, y2 in boxes:
+        roi = frame[y1:y2, x1:x2]
+        h, w = roi.shape[:2]
+        if h == 0 or w == 0:
+            continue
+        small = cv2.resize(roi, (max(w // factor, 1), max(h // factor, 1)), interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(small, (0, 0), sigma / factor)
+        roi[:] = cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+    return frame
+
+
+MASK_METHODS = {"pixelate": pixelate, "blur": downsampled_blur}
+
+
+class HeadMasker:
+    """
+    머리 영역 익명화 단계
+
+    detector 가 None 이면 apply 에 넘긴 사람 박스의 윗부분을 머리 영역으로 추정하여 (head_regions)
+    추가 탐지 없이 매 프레임 가립니다.
+
+    detector 가 있으면 머리 탐지기는 interval 프레임마다 (keyframe) 만 실행하며, 한 번의 apply 호출에
+    들어온 keyframe 들은 한 번의 배치 추론으로 탐지합니다. 사이 프레임은 직전 keyframe 의 박스와
+    (같은 묶음 안에 있으면) 다음 keyframe 의 박스를 합쳐 가립니다. 다음 keyframe 이 같은 묶음에 없는
+    프레임은 keyframe 이후 새로 들어온 사람을 놓치지 않도록 사람 박스 추정 (head_regions) 도 함께 가리며,
+    이때 person_boxes 가 없으면 새로 들어온 사람은 다음 keyframe 까지 가려지지 않습니다.
+
+    모든 박스는 추정 오차 / keyframe 사이의 움직임을 덮도록 pad 비율만큼 넓혀 가립니다.
+
+    프레임 순서대로 호출해야 하는 stateful 단계이며, 영상 (또는 구간) 마다 reset() 해야 합니다.
+    """
+
+    def __init__(self, detector,
+                 interval: int = config.FACE_BLUR_INTERVAL,
+                 pad: float = config.FACE_BLUR_PAD,
+                 method: str = config.FACE_BLUR_METHOD):
+        """
+        Args:
+            detector: detect_batch(frames) → 프레임별 Detections 를 반환하는 머리 탐지기 (models/threat.HeadDetector).
+                None 이면 사람 박스로 머리 영역을 추정
+            method (str): "pixelate" | "blur"
+        """
+        if method not in MASK_METHODS:
+            raise ValueError(f"Unknown mask method: {method} (choose from {sorted(MASK_METHODS)})")
+        self.detector = detector
+        self.interval = max(int(interval), 1)
+        self.pad = pad
+        self.method = method
+        self.mask = MASK_METHODS[method]
+        self.reset()
+
+    def reset(self, start_frame: int = 0):
+        self.start_frame = start_frame
+        self.frame_idx = start_frame
+        self.boxes = np.empty((0, 4), np.int64)  # 직전 keyframe 의 머리 박스
+        self.stats = {"frames": 0, "keyframes": 0}
+
+    def apply(self, frames, person_boxes=None):
+        """
+        프레임들의 머리 영역을 제자리에서 가립니다.
+
+        Args:
+            person_boxes (list[np.ndarray]): 프레임별 사람 박스 (detector 가 None 일 때 필요,
+                detector 가 있으면 다음 keyframe 이 묶음 밖인 프레임에 추정 머리 영역을 더함)
+
+        Returns:
+            list[np.ndarray]: 프레임별로 가린 영역 (N, 4) int64
+        """
+        if not len(frames):
+            return []
+        if self.detector is None:
+            if person_boxes is None:
+                raise ValueError("person_boxes is required when HeadMasker has no head detector")
+            masked = [self._mask(frame, head_regions(boxes)) for frame, boxes in zip(frames, person_boxes)]
+            self.frame_idx += len(frames)
+            self.stats["frames"] += len(frames)
+            return masked
+
+        idx = np.arange(self.frame_idx, self.frame_idx + len(frames))
+        keys = np.flatnonzero((idx - self.start_frame) % self.interval == 0)
+        key_boxes = [d.boxes for d in self.detector.detect_batch([frames[k] for k in keys])] if len(keys) else []
+
+        masked = []
+        prev = self.boxes
+        for k, frame in enumerate(frames):
+            pos = np.searchsorted(keys, k)
+            if pos < len(keys) and keys[pos] == k:
+                prev = boxes = key_boxes[pos]
+            elif pos < len(keys):
+                boxes = np.concatenate([prev, key_boxes[pos]]) if len(prev) else key_boxes[pos]
+            elif person_boxes is not None:
+                boxes = np.concatenate([prev, head_regions(person_boxes[k])])
+            else:
+                boxes = prev
+            masked.append(self._mask(frame, boxes))
+
+        self.boxes = prev
+        self.frame_idx += len(frames)
+        self.stats["frames"] += len(frames)
+        self.stats["keyframes"] += len(keys)
+        return masked
+
+    def _mask(self, frame, boxes):
+        regions = expand_boxes(boxes, frame.shape, self.pad)
+        self.mask(frame, regions)
+        return regions
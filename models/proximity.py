@@ -0,0 +1,53 @@
+import numpy as np
+from scipy.spatial import cKDTree
+import config
+
+
+class ProximityEngine:
+    """
+    사람 중심점 간 거리 임계값 위반 쌍을 계산합니다.
+
+    - N 이 작을 때: np.triu_indices 로 상삼각 쌍 전체를 한 번에 계산 (벡터화)
+    - N 이 클 때: KD-tree 반경 질의로 임계값 이내의 후보 쌍만 계산 (O(N²) 메모리 회피)
+
+    결과 쌍은 (i < j) 이며 기존 이중 for 루프와 같은 순서 (i, j 오름차순) 로 반환됩니다.
+    """
+
+    def __init__(self, distance_threshold: float = config.DISTANCE_THRESHOLD,
+                 kdtree_min_n: int = config.PROXIMITY_KDTREE_MIN_N):
+        self.distance_threshold = distance_threshold
+        self.kdtree_min_n = kdtree_min_n
+
+    def pairs(self, centers):
+        """
+        Args:
+            centers (array-like): (N, 2) 중심점 좌표
+
+        Returns:
+            tuple: (i (M,) int64, j (M,) int64, dist (M,) float64) 거리 < distance_threshold 인 쌍
+        """
+        pts = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        n = len(pts)
+        if n < 2:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty.copy(), np.empty(0, dtype=np.float64)
+
+        if n < self.kdtree_min_n:
+            i, j = np.triu_indices(n, k=1)
+        else:
+            ij = cKDTree(pts).query_pairs(self.distance_threshold, output_type='ndarray')
+            if len(ij) == 0:
+                empty = np.empty(0, dtype=np.int64)
+                return empty, empty.copy(), np.empty(0, dtype=np.float64)
+            ij.sort(axis=1)
+            order = np.lexsort((ij[:, 1], ij[:, 0]))
+            i, j = ij[order, 0].astype(np.int64), ij[order, 1].astype(np.int64)
+
+        diff = pts[i] - pts[j]
+        dist = np.sqrt((diff * diff).sum(axis=1))
+        mask = dist < self.distance_threshold
+        return i[mask], j[mask], dist[mask]
+
+    def any_violation(self, centers) -> bool:
+        """임계값보다 가까운 쌍이 하나라도 있는지 반환합니다."""
+        return len(self.pairs(centers)[0]) > 0
@@ -0,0 +1,172 @@
+import os
+import cv2
+import numpy as np
+import torch
+import yaml
+from utils.prepro import merge_tiled_detections
+from models.detections import Detections
+import config
+
+
+def load_rois(path: str, camera: str):
+    """
+    카메라별 관심 영역 (ROI) 다각형을 yaml 파일에서 읽습니다. (config/rois.yaml 참고)
+
+    Returns:
+        list[np.ndarray] | None: (K, 2) 다각형 목록. 카메라 항목이 없으면 None (전체 프레임)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        table = yaml.safe_load(f) or {}
+    polygons = table.get(camera)
+    if not polygons:
+        return None
+    return [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in polygons]
+
+
+def video_rois(path: str, video_path: str, camera: str = None):
+    """영상의 ROI: camera 가 없으면 입력 영상 파일명 (확장자 제외) 을 카메라 ID 로 사용하여 load_rois"""
+    return load_rois(path, camera or os.path.splitext(os.path.basename(video_path))[0])
+
+
+def tile_windows(height: int, width: int, tile: int, overlap: float):
+    """
+    (height, width) 이미지를 overlap 비율만큼 겹치는 tile x tile 창으로 나눕니다.
+    마지막 창은 이미지 경계에 맞춰 배치합니다.
+
+    Returns:
+        list[tuple]: (x1, y1, x2, y2) 창 목록
+    """
+    def starts(size):
+        if size <= tile:
+            return [0]
+        step = max(1, int(tile * (1 - overlap)))
+        s = list(range(0, size - tile, step))
+        return s + [size - tile]
+
+    return [(x, y, min(x + tile, width), min(y + tile, height))
+            for y in starts(height) for x in starts(width)]
+
+
+class RegionDetector:
+    """
+    ROI 크롭 / 타일 (SAHI 방식) 탐지기
+
+    - rois: 카메라별 관심 영역 다각형 (픽셀 좌표 또는 0~1 정규화 좌표). 다각형마다 외접 사각형만 잘라 탐지하므로
+      하늘 / 벽 등 관심 없는 영역에 입력 해상도를 쓰지 않으며, 발 위치 (박스 하단 중앙) 가
+      다각형 안에 있는 사람만 남깁니다.
+    - tiled: 탐지 영역이 tile_size 보다 크면 겹치는 tile_size 크기의 타일로 나누고
+      (원본 해상도 유지 → 멀리 있는 작은 사람), 영역 전체 패스와 함께 한 번의 배치로 탐지한 뒤
+      utils/prepro 의 NMS 로 병합합니다.
+
+    탐지기는 임의 크기의 크롭 목록을 받는 detect_batch 를 제공해야 합니다.
+    """
+
+    def __init__(self, detector, rois=None, tiled: bool = False,
+                 tile_size: int = config.DET_IMGSZ,
+                 tile_overlap: float = config.TILE_OVERLAP,
+                 max_batch: int = config.TILE_MAX_BATCH,
+                 merge_iou: float = config.DET_IOU_THRES,
+                 merge_ios: float = config.TILE_MERGE_IOS):
+        self.detector = detector
+        self.tiled = tiled
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.max_batch = max_batch
+        self.merge_iou = merge_iou
+        self.merge_ios = merge_ios
+        self.scale = 1.0
+        self.set_rois(rois)
+
+    @property
+    def model(self):
+        return self.detector.model
+
+    def set_rois(self, rois):
+        """ROI 다각형을 교체합니다. None (또는 빈 목록) 이면 전체 프레임을 탐지합니다."""
+        self.rois = list(rois) if rois is not None and len(rois) else None
+        self._cache_shape = None
+
+    def set_scale(self, scale: float):
+        """축소 디코드 시 픽셀 좌표 ROI 를 같은 비율로 맞춥니다 (정규화 좌표 ROI 는 그대로)."""
+        self.scale = scale
+        self._cache_shape = None
+
+    def detect(self, frame, structured: bool = False):
+        return self.detect_batch([frame], structured=structured)[0]
+
+    def detect_batch(self, frames, structured: bool = False):
+        crops, owners = [], []
+        layouts = [self._layout(frame.shape[:2]) for frame in frames]
+        for k, (frame, (windows, _)) in enumerate(zip(frames, layouts)):
+            for x1, y1, x2, y2, cut_bottom in windows:
+                crops.append(frame[y1:y2, x1:x2])
+                owners.append((k, x1, y1, y2 - y1 if cut_bottom else None))
+
+        per_frame = [[] for _ in frames]
+        for start in range(0, len(crops), self.max_batch):
+            chunk = crops[start:start + self.max_batch]
+            for (k, x0, y0, cut_h), dets in zip(owners[start:start + self.max_batch], self.detector.detect_batch(chunk)):
+                boxes, confs, classes = dets.boxes, dets.confs, dets.classes
+                if cut_h is not None:
+                    # 창의 아래 경계에서 잘린 박스는 발 위치를 알 수 없으므로 버림
+                    # (ROI 영역 창이면 발이 ROI 밖, 타일이면 아래쪽 겹치는 타일 / 전체 패스가 잡음)
+                    keep = boxes[:, 3] < cut_h - 1
+                    boxes, confs, classes = boxes[keep], confs[keep], classes[keep]
+                if len(boxes):
+                    boxes = boxes + np.array([x0, y0, x0, y0], dtype=np.int32)
+                    per_frame[k].append(np.column_stack([boxes, confs, classes]))
+
+        out = [self._finalize(parts, *layout) for parts, layout in zip(per_frame, layouts)]
+        return [d.to_structured() for d in out] if structured else out
+
+    def _layout(self, shape):
+        """프레임 크기별 (탐지 창 목록, ROI 마스크) 를 캐시합니다."""
+        if self._cache_shape != shape:
+            self._cache_shape = shape
+            self._cache_layout = self._build(shape)
+        return self._cache_layout
+
+    def _build(self, shape):
+        h, w = shape
+        mask = None
+        if self.rois is None:
+            regions = [(0, 0, w, h)]
+        else:
+            mask = np.zeros((h, w), dtype=np.uint8)
+            regions = []
+            for poly in self.rois:
+                # 0~1 로 정규화된 좌표도 허용. 픽셀 좌표는 원본 해상도 기준이므로 축소 디코드 비율을 곱함
+                pts = poly * (w, h) if poly.max() <= 1.0 else poly * self.scale
+                pts = np.round(pts).astype(np.int32)
+                cv2.fillPoly(mask, [pts], 1)
+                x, y, bw, bh = cv2.boundingRect(pts)
+                x1, y1, x2, y2 = max(x, 0), max(y, 0), min(x + bw, w), min(y + bh, h)
+                if x2 > x1 and y2 > y1:
+                    regions.append((x1, y1, x2, y2))
+
+        # (x1, y1, x2, y2, cut_bottom): cut_bottom 은 아래 경계가 프레임 안쪽에 있는 창
+        windows = []
+        for x1, y1, x2, y2 in regions:
+            windows.append((x1, y1, x2, y2, y2 < h))
+            if self.tiled and max(x2 - x1, y2 - y1) > self.tile_size:
+                windows += [(x1 + a, y1 + b, x1 + c, y1 + d, y1 + d < h)
+                            for a, b, c, d in tile_windows(y2 - y1, x2 - x1, self.tile_size, self.tile_overlap)]
+        return windows, mask
+
+    def _finalize(self, parts, windows, mask):
+        if not parts:
+            return Detections.empty()
+        data = np.concatenate(parts)
+        if len(windows) > 1:
+            data = merge_tiled_detections(torch.from_numpy(data).float(), self.merge_iou, self.merge_ios).numpy()
+        if mask is not None and len(data):
+            # 발 위치 (박스 하단 중앙) 가 ROI 안에 있는 사람만
+            foot_x = ((data[:, 0] + data[:, 2]) / 2).astype(np.int64).clip(0, mask.shape[1] - 1)
+            foot_y = (data[:, 3] - 1).astype(np.int64).clip(0, mask.shape[0] - 1)
+            data = data[mask[foot_y, foot_x] > 0]
+        if not len(data):
+            return Detections.empty()
+        boxes = np.ascontiguousarray(data[:, :4], dtype=np.int32)
+        return Detections(boxes, (boxes[:, :2] + boxes[:, 2:]) // 2,
+                          np.ascontiguousarray(data[:, 4], dtype=np.float32),
+                          np.ascontiguousarray(data[:, 5], dtype=np.int32))
@@ -0,0 +1,313 @@
+import glob
+import json
+import os
+import cv2
+import numpy as np
+from models.detections import Detections
+from models.proximity import ProximityEngine
+from utils.video_io import open_reader, open_writer
+import config
+
+STORE_VERSION = 1
+
+# 프레임 테이블: 프레임마다 1행. det_* / pair_* 는 같은 청크의 탐지 / 쌍 배열 내 구간
+FRAME_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("time", np.float64),         # 초 (frame / fps)
+    ("det_start", np.int64),
+    ("det_count", np.int32),
+    ("pair_start", np.int64),
+    ("pair_count", np.int32),
+    ("alert", np.bool_),          # 거리 임계값 위반 쌍이 있는지
+    ("min_distance", np.float32), # 가장 가까운 위반 쌍의 거리 (없으면 inf)
+])
+
+# 탐지 테이블: 사람 박스마다 1행
+DET_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("box", np.int32, (4,)),
+    ("center", np.int32, (2,)),
+    ("conf", np.float32),
+    ("gender", np.int16),         # 0: Female, 1: Male, -1: 분류 안 함
+    ("track", np.int64),          # 트랙 ID, -1: 추적 안 함
+])
+
+# 위반 쌍 테이블: i, j 는 같은 프레임 탐지 행의 (프레임 내) 인덱스
+PAIR_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("i", np.int32),
+    ("j", np.int32),
+    ("distance", np.float32),
+])
+
+
+def alert_intervals(times, fps: float, max_gap: float = 0.5):
+    """
+    정렬된 경고 프레임 시각 (초) 을 구간으로 묶어 [(시작 초, 끝 초), ...] 로 반환합니다.
+    max_gap 초 이하로 끊긴 경고는 같은 구간으로 이어 붙입니다.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if not len(times):
+        return []
+    breaks = np.flatnonzero(np.diff(times) > max_gap)
+    starts = np.concatenate([[0], breaks + 1])
+    ends = np.concatenate([breaks, [len(times) - 1]])
+    return [(float(times[s]), float(times[e] + 1 / fps)) for s, e in zip(starts, ends)]
+
+
+def _save_atomic(path, write):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+class DetectionStoreWriter:
+    """
+    프레임별 탐지 결과를 청크 단위 NumPy 파일로 기록하는 열 지향 저장소
+
+    chunk_frames 프레임마다 <청크>.{frames,dets,pairs}.npy 를 쓰고 meta.json 의 청크 목록을 갱신합니다.
+    기록이 끝난 청크는 바뀌지 않으므로 중간에 중단되어도 마지막으로 flush 된 청크까지는 읽을 수 있고,
+    append=True 이면 기존 저장소 뒤에 이어 씁니다.
+    """
+
+    def __init__(self, path: str, fps: float, size=None, source: str = None, camera: str = None,
+                 distance_threshold: float = config.DISTANCE_THRESHOLD,
+                 chunk_frames: int = config.STORE_CHUNK_FRAMES, append: bool = False):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.proximity = ProximityEngine(distance_threshold)
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, "meta.json")
+        if append and os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+        else:
+            for old in glob.glob(os.path.join(path, "*.npy")) + [meta_path]:
+                if os.path.exists(old):
+                    os.remove(old)
+            self.meta = {"version": STORE_VERSION, "fps": fps, "size": list(size) if size else None,
+                         "source": source, "camera": camera, "distance_threshold": distance_threshold,
+                         "chunks": []}
+        self._reset_buffers()
+
+    def _reset_buffers(self):
+        self._frames, self._dets, self._pairs = [], [], []
+        self._n_dets = self._n_pairs = 0
+
+    def append(self, frame_idx: int, dets: Detections, genders=None, track_ids=None, pairs=None):
+        """
+        한 프레임의 결과를 추가합니다.
+
+        Args:
+            frame_idx (int): 영상 내 프레임 번호
+            dets (Detections): 탐지 결과
+            genders (np.ndarray): (N,) 성별 클래스 또는 None
+            track_ids (np.ndarray): (N,) 트랙 ID 또는 None
+            pairs (tuple): ProximityEngine.pairs 결과 (i, j, dist). None 이면 centers 로 계산
+        """
+        n = len(dets.boxes)
+        i, j, dist = pairs if pairs is not None else self.proximity.pairs(dets.centers)
+
+        row = np.zeros(1, dtype=FRAME_DTYPE)
+        row["frame"] = frame_idx
+        row["time"] = frame_idx / self.meta["fps"]
+        row["det_start"], row["det_count"] = self._n_dets, n
+        row["pair_start"], row["pair_count"] = self._n_pairs, len(i)
+        row["alert"] = len(i) > 0
+        row["min_distance"] = dist.min() if len(dist) else np.inf
+        self._frames.append(row)
+
+        if n:
+            d = np.empty(n, dtype=DET_DTYPE)
+            d["frame"] = frame_idx
+            d["box"], d["center"], d["conf"] = dets.boxes, dets.centers, dets.confs
+            d["gender"] = -1 if genders is None else genders
+            d["track"] = -1 if track_ids is None else track_ids
+            self._dets.append(d)
+            self._n_dets += n
+        if len(i):
+            p = np.empty(len(i), dtype=PAIR_DTYPE)
+            p["frame"], p["i"], p["j"], p["distance"] = frame_idx, i, j, dist
+            self._pairs.append(p)
+            self._n_pairs += len(i)
+
+        if len(self._frames) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """버퍼에 쌓인 프레임을 새 청크로 기록합니다."""
+        if not self._frames:
+            return
+        tables = {"frames": np.concatenate(self._frames),
+                  "dets": np.concatenate(self._dets) if self._dets else np.empty(0, DET_DTYPE),
+                  "pairs": np.concatenate(self._pairs) if self._pairs else np.empty(0, PAIR_DTYPE)}
+        name = f"{len(self.meta['chunks']):05d}"
+        for table, arr in tables.items():
+            _save_atomic(os.path.join(self.path, f"{name}.{table}.npy"), lambda f, a=arr: np.save(f, a))
+
+        frames = tables["frames"]
+        self.meta["chunks"].append({"name": name,
+                                    "first_frame": int(frames["frame"][0]), "last_frame": int(frames["frame"][-1]),
+                                    "start_time": float(frames["time"][0]), "end_time": float(frames["time"][-1]),
+                                    "frames": len(frames), "detections": len(tables["dets"]),
+                                    "alerts": int(frames["alert"].sum())})
+        meta = json.dumps(self.meta, ensure_ascii=False, indent=2).encode("utf-8")
+        _save_atomic(os.path.join(self.path, "meta.json"), lambda f: f.write(meta))
+        self._reset_buffers()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DetectionStore:
+    """
+    DetectionStoreWriter 로 기록한 저장소 읽기 (청크는 memory-map 으로 필요한 것만 열림)
+
+    시간 구간 질의는 meta.json 의 청크 시간 범위로 관련 청크만 골라 읽습니다.
+
+    사용 예:
+        store = DetectionStore("output/result.store")
+        store.alert_intervals()                       # [(시작 초, 끝 초), ...]
+        store.pairs(60, 120, max_distance=200)        # 1~2분 사이 200px 보다 가까운 쌍
+        store.render("assets/threat_1.mp4", "output/rerender.mp4", start=60, end=120)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.fps = self.meta["fps"]
+        self.distance_threshold = self.meta["distance_threshold"]
+        self._cache = {}
+
+    def __len__(self):
+        return sum(c["frames"] for c in self.meta["chunks"])
+
+    def _table(self, name, table):
+        key = (name, table)
+        if key not in self._cache:
+            self._cache[key] = np.load(os.path.join(self.path, f"{name}.{table}.npy"), mmap_mode="r")
+        return self._cache[key]
+
+    def _chunks(self, start=None, end=None):
+        for c in self.meta["chunks"]:
+            if (start is None or c["end_time"] >= start) and (end is None or c["start_time"] < end):
+                yield c["name"]
+
+    @staticmethod
+    def _time_mask(times, start, end):
+        mask = np.ones(len(times), dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times < end
+        return mask
+
+    def frames(self, start: float = None, end: float = None, alert: bool = None):
+        """[start, end) 초 구간의 프레임 테이블 (FRAME_DTYPE). alert 를 주면 경고 여부로 거름"""
+        out = []
+        for name in self._chunks(start, end):
+            f = self._table(name, "frames")
+            mask = self._time_mask(f["time"], start, end)
+            if alert is not None:
+                mask &= f["alert"] == alert
+            out.append(f[mask])
+        return np.concatenate(out) if out else np.empty(0, FRAME_DTYPE)
+
+    def detections(self, start: float = None, end: float = None):
+        """[start, end) 초 구간의 탐지 테이블 (DET_DTYPE)"""
+        return self._rows("dets", DET_DTYPE, start, end)
+
+    def pairs(self, start: float = None, end: float = None, max_distance: float = None):
+        """
+        [start, end) 초 구간의 위반 쌍 테이블 (PAIR_DTYPE).
+
+        max_distance 가 기록 당시 임계값 이하이면 저장된 쌍을 거르고, 더 크면 저장된 중심점으로
+        다시 계산합니다 (모델 추론 없음).
+        """
+        if max_distance is None or max_distance <= self.distance_threshold:
+            rows = self._rows("pairs", PAIR_DTYPE, start, end)
+            return rows if max_distance is None else rows[rows["distance"] < max_distance]
+
+        proximity = ProximityEngine(max_distance)
+        out = []
+        for name in self._chunks(start, end):
+            f, d = self._table(name, "frames"), self._table(name, "dets")
+            for row in f[self._time_mask(f["time"], start, end) & (f["det_count"] >= 2)]:
+                centers = d["center"][row["det_start"]:row["det_start"] + row["det_count"]]
+                i, j, dist = proximity.pairs(centers)
+                p = np.empty(len(i), dtype=PAIR_DTYPE)
+                p["frame"], p["i"], p["j"], p["distance"] = row["frame"], i, j, dist
+                out.append(p)
+        return np.concatenate(out) if out else np.empty(0, PAIR_DTYPE)
+
+    def _rows(self, table, dtype, start, end):
+        out = []
+        for name in self._chunks(start, end):
+            f, t = self._table(name, "frames"), self._table(name, table)
+            rows = f[self._time_mask(f["time"], start, end)]
+            if len(rows):
+                key = "det" if table == "dets" else "pair"
+                first = rows[f"{key}_start"][0]
+                last = rows[f"{key}_start"][-1] + rows[f"{key}_count"][-1]
+                out.append(t[first:last])
+        return np.concatenate(out) if out else np.empty(0, dtype)
+
+    def alert_intervals(self, start: float = None, end: float = None, max_gap: float = 0.5):
+        """[start, end) 초 구간의 경고 구간 목록 (alert_intervals 참고)"""
+        return alert_intervals(self.frames(start, end, alert=True)["time"], self.fps, max_gap)
+
+    def iter_frames(self, start: float = None, end: float = None):
+        """
+        프레임 순서대로 (frame, Detections, genders, track_ids) 를 생성합니다.
+        genders / track_ids 는 기록되지 않았으면 None 입니다.
+        """
+        for name in self._chunks(start, end):
+            f, d = self._table(name, "frames"), self._table(name, "dets")
+            for row in f[self._time_mask(f["time"], start, end)]:
+                rows = d[row["det_start"]:row["det_start"] + row["det_count"]]
+                dets = Detections(np.ascontiguousarray(rows["box"]), np.ascontiguousarray(rows["center"]),
+                                  np.ascontiguousarray(rows["conf"]), np.zeros(len(rows), np.int32))
+                genders = rows["gender"].astype(np.int64) if len(rows) and (rows["gender"] >= 0).all() else None
+                tracks = rows["track"].copy() if len(rows) and (rows["track"] >= 0).all() else None
+                yield int(row["frame"]), dets, genders, tracks
+
+    def render(self, video_path: str, output_path: str, start: float = None, end: float = None,
+               video_backend: str = config.VIDEO_BACKEND, video_options: dict = None):
+        """
+        저장된 결과를 원본 영상 위에 다시 그려 output_path 에 저장합니다 (모델 추론 없음).
+        기록 당시 축소 디코드 (decode_width) 를 했다면 같은 크기로 디코드합니다.
+        """
+        from models.threat import ThreatAnalyzer
+
+        width = self.meta["size"][0] if self.meta.get("size") else None
+        cap = open_reader(video_path, backend=video_backend, width=width)
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open video: {video_path}")
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        writer = open_writer(output_path, self.fps, cap.size, backend=video_backend, **(video_options or {}))
+        analyzer = ThreatAnalyzer(distance_threshold=self.distance_threshold)
+
+        position = 0
+        try:
+            for frame_idx, dets, genders, _ in self.iter_frames(start, end):
+                if frame_idx != position:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                    position = frame_idx
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                position += 1
+                writer.write(analyzer.draw(frame, dets.boxes, genders, dets.centers))
+        finally:
+            cap.release()
+            writer.release()
@@ -0,0 +1,308 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+import cv2
+import numpy as np
+from utils.custom_logger import custom_logger
+from utils.video_io import open_writer
+import config
+
+logger = custom_logger(__name__)
+
+
+class StreamFrame(NamedTuple):
+    stream: "CameraStream"
+    index: int          # 스트림 내 프레임 번호
+    captured: float     # time.perf_counter() 기준 디코드 완료 시각
+    frame: np.ndarray
+
+
+class CameraStream:
+    """
+    카메라 1대의 디코드 스레드
+
+    - RTSP / HTTP 등 라이브 소스: 최신 프레임만 유지 (큐가 차면 가장 오래된 프레임을 버림),
+      연결이 끊기면 reconnect_s 후 다시 연결
+    - 로컬 파일: RTSP 대용. realtime=True 이면 원본 FPS 로 페이싱하고 라이브처럼 프레임을 버리며,
+      False 이면 모든 프레임을 순서대로 넘김 (큐가 차면 대기). loop=True 이면 끝에서 처음으로 되감음
+    """
+
+    def __init__(self, name: str, source: str, loop: bool = False, realtime: bool = None,
+                 queue_size: int = 2, reconnect_s: float = 2.0):
+        self.name = name
+        self.source = source
+        self.is_file = os.path.exists(source)
+        self.loop = loop
+        self.realtime = (not self.is_file) if realtime is None else realtime
+        self.reconnect_s = reconnect_s
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.fps = 30.0
+        self.size = None
+        self.finished = threading.Event()
+        self.stats = {"decoded": 0, "dropped": 0, "processed": 0}
+        self.latencies = deque(maxlen=1000)  # 디코드 → sink 기록까지 (초)
+        self._thread = None
+
+    def start(self, stop: threading.Event, ready: threading.Event):
+        self._thread = threading.Thread(target=self._run, args=(stop, ready), name=f"decode-{self.name}",
+                                        daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        return cap
+
+    def _run(self, stop, ready):
+        cap = None
+        index = 0
+        next_t = time.perf_counter()
+        try:
+            while not stop.is_set():
+                if cap is None:
+                    cap = self._open()
+                    if cap is None:
+                        if self.is_file:
+                            logger.error(f"[{self.name}] Cannot open video: {self.source}")
+                            return
+                        logger.warning(f"[{self.name}] 연결 실패, {self.reconnect_s}s 후 재시도: {self.source}")
+                        stop.wait(self.reconnect_s)
+                        continue
+
+                ret, frame = cap.read()
+                if not ret:
+                    if self.is_file and self.loop and index > 0:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    if self.is_file:
+                        return
+                    logger.warning(f"[{self.name}] 스트림 끊김, 재연결: {self.source}")
+                    cap.release()
+                    cap = None
+                    stop.wait(self.reconnect_s)
+                    continue
+
+                self.stats["decoded"] += 1
+                item = StreamFrame(self, index, time.perf_counter(), frame)
+                index += 1
+                if self.realtime:
+                    self._put_latest(item)
+                elif not self._put_blocking(item, stop):
+                    return
+                ready.set()
+
+                if self.realtime and self.is_file:
+                    # 파일을 라이브 카메라처럼 원본 FPS 로 재생
+                    next_t += 1.0 / self.fps
+                    delay = next_t - time.perf_counter()
+                    if delay > 0:
+                        stop.wait(delay)
+                    else:
+                        next_t = time.perf_counter()
+        finally:
+            if cap is not None:
+                cap.release()
+            self.finished.set()
+            ready.set()
+
+    def _put_latest(self, item):
+        while True:
+            try:
+                self.frames.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.stats["dropped"] += 1
+                except queue.Empty:
+                    pass
+
+    def _put_blocking(self, item, stop):
+        while not stop.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @property
+    def done(self) -> bool:
+        return self.finished.is_set() and self.frames.empty()
+
+
+class VideoFileSink:
+    """
+    카메라별 결과 영상 sink. 첫 프레임의 크기 (와 fps 가 없으면 스트림 FPS) 로
+    utils/video_io.open_writer 의 writer 를 엽니다.
+    """
+
+    def __init__(self, path: str, fps: float = None, video_backend: str = config.VIDEO_BACKEND,
+                 video_options: dict = None):
+        """
+        Args:
+            video_backend (str): 인코드 백엔드 (auto / pyav / ffmpeg / opencv)
+            video_options (dict): 인코딩 옵션 {"codec", "crf", "preset"}
+        """
+        self.path = path
+        self.fps = fps
+        self.video_backend = video_backend
+        self.video_options = video_options or {}
+        self.writer = None
+
+    def write(self, frame, result):
+        if self.writer is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            h, w = frame.shape[:2]
+            fps = self.fps or result.get("fps") or 30.0
+            self.writer = open_writer(self.path, fps, (w, h), backend=self.video_backend, **self.video_options)
+        self.writer.write(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class MultiStreamServer:
+    """
+    여러 카메라를 하나의 탐지기 / 분류기로 처리하는 서버
+
+    카메라마다 디코드 스레드 (CameraStream) 를 두고, 스케줄러가 모든 스트림의 프레임을 모아
+    스트림 간 배치를 만듭니다. 배치는 max_batch 에 도달하거나, 배치의 첫 프레임이 디코드된 뒤
+    max_wait_ms 가 지나면 실행됩니다 (지연 예산). 한 라운드에 스트림마다 최대 1 프레임씩 가져와
+    카메라 간 공정성을 유지하고, 스트림 내 프레임 순서는 보존됩니다.
+
+    배치는 ThreatVideoDiscriminator.analyze_batch 로 탐지 한 번 + 배치 안의 모든 사람 크롭 분류 한 번으로
+    처리한 뒤, 결과를 카메라별 sink 로 보냅니다.
+    """
+
+    def __init__(self, model, max_batch: int = config.STREAM_MAX_BATCH,
+                 max_wait_ms: float = config.STREAM_MAX_WAIT_MS):
+        """
+        Args:
+            model (ThreatVideoDiscriminator): detector / classifier / analyzer 를 공유할 모델
+                (keyframe / 움직임 게이트 / 추적처럼 스트림별 상태가 있는 옵션은 사용하지 않음)
+        """
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+        self.streams = []
+        self.sinks = {}
+        self.stop_event = threading.Event()
+        self.ready = threading.Event()
+        self.batch_sizes = deque(maxlen=1000)
+        self.infer_times = deque(maxlen=1000)
+
+    def add_stream(self, stream: CameraStream, sink=None):
+        """sink 는 write(annotated_frame, result) / close() 를 제공해야 합니다."""
+        self.streams.append(stream)
+        self.sinks[stream.name] = sink
+
+    def stop(self):
+        self.stop_event.set()
+        self.ready.set()
+
+    def run(self, duration: float = None):
+        """
+        모든 스트림이 끝나거나 (파일 소스), stop() 이 호출되거나, duration 초가 지날 때까지 실행합니다.
+
+        Returns:
+            dict: 스트림별 / 배치 통계 (stats())
+        """
+        for stream in self.streams:
+            stream.start(self.stop_event, self.ready)
+        t_end = None if duration is None else time.perf_counter() + duration
+        try:
+            while not self.stop_event.is_set():
+                if t_end is not None and time.perf_counter() >= t_end:
+                    break
+                batch = self._gather()
+                if batch:
+                    self._infer(batch)
+                elif all(s.done for s in self.streams):
+                    break
+        finally:
+            self.stop()
+            for stream in self.streams:
+                stream.join(timeout=5)
+            for sink in self.sinks.values():
+                if sink is not None:
+                    sink.close()
+        return self.stats()
+
+    def _gather(self):
+        batch = []
+        deadline = None
+        while len(batch) < self.max_batch and not self.stop_event.is_set():
+            self.ready.clear()
+            got = False
+            for stream in self.streams:
+                try:
+                    item = stream.frames.get_nowait()
+                except queue.Empty:
+                    continue
+                if deadline is None:
+                    deadline = item.captured + self.max_wait
+                batch.append(item)
+                got = True
+                if len(batch) == self.max_batch:
+                    return batch
+
+            if got:
+                continue
+            if deadline is None:
+                # 아직 받은 프레임이 없으면 새 프레임을 잠시 기다린 뒤 호출자에게 돌려줌 (종료 조건 확인)
+                if all(s.done for s in self.streams):
+                    return batch
+                self.ready.wait(0.1)
+                if all(s.frames.empty() for s in self.streams):
+                    return batch
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or all(s.done for s in self.streams):
+                break
+            self.ready.wait(remaining)
+        return batch
+
+    def _infer(self, batch):
+        t = time.perf_counter()
+        results = self.model.analyze_batch([item.frame for item in batch])
+        self.infer_times.append(time.perf_counter() - t)
+        self.batch_sizes.append(len(batch))
+
+        for item, res in zip(batch, results):
+            d = res["detections"]
+            result = {"camera": item.stream.name, "frame": item.index, "fps": item.stream.fps,
+                      "boxes": d.boxes, "genders": res["genders"],
+                      "pairs": res["pairs"], "distances": res["distances"]}
+            sink = self.sinks.get(item.stream.name)
+            if sink is not None:
+                pairs = (res["pairs"][:, 0], res["pairs"][:, 1], res["distances"])
+                sink.write(self.model.analyzer.draw(item.frame, d.boxes, res["genders"], d.centers, pairs), result)
+            item.stream.stats["processed"] += 1
+            item.stream.latencies.append(time.perf_counter() - item.captured)
+
+    def stats(self):
+        out = {"batches": len(self.batch_sizes),
+               "mean_batch": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+               "mean_infer_ms": float(np.mean(self.infer_times) * 1e3) if self.infer_times else 0.0,
+               "streams": {}}
+        for s in self.streams:
+            lat = np.asarray(s.latencies) * 1e3
+            out["streams"][s.name] = dict(s.stats,
+                                          p50_latency_ms=float(np.percentile(lat, 50)) if len(lat) else 0.0,
+                                          p95_latency_ms=float(np.percentile(lat, 95)) if len(lat) else 0.0)
+        return out
@@ -2,48 +2,298 @@ import cv2
 import os
 import numpy as np
 import torch
+from PIL import Image
 from ultralytics import YOLO
-from scipy.spatial.distance import cdist
-from utils.prepro import preprocess_v2, load_model
+from utils.prepro import preprocess_v2, load_model, LetterBox, non_max_suppression, scale_boxes, backend_model_path, quantized_model_path
+from models.pipeline import ThreadedVideoPipeline
+from models.proximity import ProximityEngine
+from models.tracker import IoUTracker, TrackGenderCache
+from models.keyframe import KeyframeDetector
+from models.motion import MotionGatedDetector
+from models.regions import RegionDetector
+from models.store import DetectionStoreWriter, alert_intervals
+from models.privacy import HeadMasker
+from models.detections import Detections
+from utils.video_io import open_reader, open_writer
 import config
 
 class PersonDetector:
-    def __init__(self, model_path: str = config.DET_MODEL_PATH):
-        self.model = YOLO(model_path)
+    def __init__(self, model_path: str = config.DET_MODEL_PATH, person_class: int = 0,
+                 backend: str = "torch"):
+        """
+        Args:
+            backend (str): "torch" 는 YOLO() 로 추론하고, "onnxruntime" / "openvino" 는
+                export.py 로 만든 그래프를 utils/prepro 전처리·NMS 경로 (FastPersonDetector) 로 추론
+        """
+        self.backend = backend
+        self.person_class = person_class
+        if backend == "torch":
+            self.runtime = None
+            self.model = YOLO(model_path)
+        else:
+            self.runtime = FastPersonDetector(model_path, person_class=person_class, backend=backend)
+            self.model = self.runtime.model
 
-    def detect(self, frame):
+    def detect(self, frame, structured: bool = False):
+        """
+        Returns:
+            Detections | np.ndarray: structured=True 이면 DETECTION_DTYPE 구조화 배열
+        """
+        if self.runtime is not None:
+            return self.runtime.detect(frame, structured=structured)
         results = self.model(frame)[0]
-        boxes, centers = [], []
-        for box in results.boxes:
-            if int(box.cls[0]) == 0:
-                x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-                boxes.append((x1, y1, x2, y2))
-                centers.append((cx, cy))
-        return boxes, np.array(centers)
+        dets = self._parse(results)
+        return dets.to_structured() if structured else dets
+
+    def detect_batch(self, frames, structured: bool = False):
+        """
+        여러 프레임을 한 번의 배치 추론으로 탐지합니다.
+
+        Args:
+            frames (list[np.ndarray]): BGR 프레임 목록
+            structured (bool): True 이면 프레임별 결과를 구조화 배열로 반환
+
+        Returns:
+            list: 입력 순서와 같은 프레임별 Detections 목록
+        """
+        if self.runtime is not None:
+            return self.runtime.detect_batch(frames, structured=structured)
+        if not frames:
+            return []
+        dets = [self._parse(results) for results in self.model(list(frames))]
+        return [d.to_structured() for d in dets] if structured else dets
+
+    def _parse(self, results):
+        # boxes.data: (N, 6) = x1 y1 x2 y2 conf cls, 한 번의 마스크/복사로 NumPy 변환
+        data = results.boxes.data
+        if len(data) == 0:
+            return Detections.empty()
+        data = data[data[:, 5] == self.person_class].cpu().numpy()
+        boxes = np.ascontiguousarray(data[:, :4], dtype=np.int32)
+        centers = (boxes[:, :2] + boxes[:, 2:]) // 2
+        return Detections(boxes, centers,
+                          np.ascontiguousarray(data[:, 4], dtype=np.float32),
+                          np.ascontiguousarray(data[:, 5], dtype=np.int32))
+
+
+class FastPersonDetector:
+    """
+    ultralytics predictor 를 거치지 않는 사람 탐지기
+
+    AutoBackend 로 가중치를 직접 로드하고, 재사용 버퍼에 letterbox 한 뒤
+    utils/prepro 의 NMS (사람 클래스만) 와 좌표 복원을 적용합니다.
+    YOLO.__call__ 의 호출별 predictor 설정, 콜백, Results 객체 생성 비용이 없습니다.
+    """
+
+    def __init__(self, model_path: str = config.DET_MODEL_PATH, device: str = None,
+                 imgsz: int = config.DET_IMGSZ, conf_thres: float = config.DET_CONF_THRES,
+                 iou_thres: float = config.DET_IOU_THRES, person_class: int = 0,
+                 backend: str = "torch"):
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.backend = backend
+        self.model = load_model(backend_model_path(model_path, backend), device=torch.device(self.device))
+        self.fp16 = self.model.fp16
+        self.imgsz = imgsz
+        self.conf_thres = conf_thres
+        self.iou_thres = iou_thres
+        self.person_class = person_class
+        # 같은 크기의 프레임 묶음은 ultralytics 와 같이 stride 배수의 최소 직사각형으로 letterbox
+        self.letterbox_rect = LetterBox((imgsz, imgsz), auto=True, scaleup=True, stride=32)
+        self.letterbox = LetterBox((imgsz, imgsz), auto=False, scaleup=True, stride=32)
+        self._buffer = np.empty((0, 3, imgsz, imgsz), dtype=np.uint8)
+
+    def detect(self, frame, structured: bool = False):
+        return self.detect_batch([frame], structured=structured)[0]
+
+    def detect_batch(self, frames, structured: bool = False):
+        if not len(frames):
+            return []
+        n = len(frames)
+        # export 된 그래프는 export 시의 정사각 입력 크기로 고정
+        same_shape = all(f.shape == frames[0].shape for f in frames)
+        letterbox = self.letterbox_rect if same_shape and self.backend == "torch" else self.letterbox
+        first = letterbox(image=frames[0])
+        if len(self._buffer) < n or self._buffer.shape[2:] != first.shape[:2]:
+            self._buffer = np.empty((max(n, len(self._buffer)), 3, *first.shape[:2]), dtype=np.uint8)
+        batch = self._buffer[:n]
+        batch[0] = first[..., ::-1].transpose(2, 0, 1)
+        for k in range(1, n):
+            batch[k] = letterbox(image=frames[k])[..., ::-1].transpose(2, 0, 1)
+
+        img = torch.from_numpy(batch).to(self.device, non_blocking=True)
+        img = img.half() if self.fp16 else img.float()
+        img /= 255
+        with torch.inference_mode():
+            preds = self.model(img)
+            preds = non_max_suppression(preds, self.conf_thres, self.iou_thres,
+                                        classes=[self.person_class])
+            for frame, pred in zip(frames, preds):
+                scale_boxes(img.shape[2:], pred[:, :4], frame.shape[:2])
+
+        dets = []
+        for pred in preds:
+            if not len(pred):
+                dets.append(Detections.empty())
+                continue
+            data = pred.float().cpu().numpy()
+            boxes = np.ascontiguousarray(data[:, :4], dtype=np.int32)
+            dets.append(Detections(boxes, (boxes[:, :2] + boxes[:, 2:]) // 2,
+                                   np.ascontiguousarray(data[:, 4], dtype=np.float32),
+                                   np.ascontiguousarray(data[:, 5], dtype=np.int32)))
+        return [d.to_structured() for d in dets] if structured else dets
+
+
+class HeadDetector:
+    """
+    얼굴 익명화용 머리 탐지기
+
+    model_path 가 있으면 YOLO 머리 탐지 가중치를 FastPersonDetector 경로로 배치 추론하고 (PIL 변환 없음),
+    없으면 realutils.detect_heads 로 프레임마다 추론합니다 (선택 의존성, PIL 변환 / 배치 없음).
+    """
+
+    def __init__(self, model_path: str = config.HEAD_MODEL_PATH, conf_thres: float = config.HEAD_CONF_THRES,
+                 head_class: int = 0, device: str = None):
+        if model_path:
+            self.runtime = FastPersonDetector(model_path, device=device, conf_thres=conf_thres, person_class=head_class)
+            self.detect_heads = None
+        else:
+            from realutils.detect import detect_heads
+            self.runtime = None
+            self.detect_heads = detect_heads
+
+    def detect(self, frame):
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames):
+        if self.runtime is not None:
+            return self.runtime.detect_batch(frames)
+        dets = []
+        for frame in frames:
+            results = self.detect_heads(Image.fromarray(frame[..., ::-1]))
+            if not results:
+                dets.append(Detections.empty())
+                continue
+            boxes = np.array([box for box, _, _ in results], dtype=np.int32).reshape(-1, 4)
+            dets.append(Detections(boxes, (boxes[:, :2] + boxes[:, 2:]) // 2,
+                                   np.array([conf for _, _, conf in results], dtype=np.float32),
+                                   np.zeros(len(boxes), dtype=np.int32)))
+        return dets
 
 
 class GenderClassifier:
-    def __init__(self, model_path: str = config.CLS_MODEL_PATH, device: str = None):
+    def __init__(self, model_path: str = config.CLS_MODEL_PATH, device: str = None,
+                 imgsz: int = config.CLS_IMGSZ, max_batch: int = config.CLS_MAX_BATCH,
+                 backend: str = "torch", quantized: bool = False):
+        """
+        Args:
+            backend (str): "torch" | "onnxruntime" | "openvino"
+            quantized (bool): True 이면 quantize.py 로 만든 INT8 ONNX 모델을 onnxruntime 으로 로드
+        """
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = load_model(model_path)
+        self.backend = "onnxruntime" if quantized else backend
+        if quantized:
+            path = quantized_model_path(model_path)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"INT8 model not found: {path} (run `python quantize.py` first)")
+        else:
+            path = backend_model_path(model_path, backend)
+        self.model = load_model(path, device=torch.device(self.device))
         self.fp16 = self.model.fp16
+        self.imgsz = imgsz
+        self.max_batch = max_batch
+        self.letterbox = LetterBox((imgsz, imgsz), scaleup=True, auto=False, stride=32)
+        self._buffer = np.empty((0, 3, imgsz, imgsz), dtype=np.uint8)
 
     def classify(self, crop_img):
-        img = preprocess_v2(crop_img, device=self.device, shape=[224, 224], scaleup=True)
+        img = preprocess_v2(crop_img, device=self.device, shape=[self.imgsz, self.imgsz], scaleup=True)
         img = img if isinstance(img, torch.Tensor) else torch.from_numpy(img).to(self.device)
         img = img.half() if self.fp16 else img.float()
         result = self.model(img)[0]
         return result.argmax().item()
 
+    def classify_batch(self, frame, boxes):
+        """
+        한 프레임의 모든 사람 박스를 한 번의 배치 추론으로 분류합니다.
+
+        Args:
+            frame (np.ndarray): BGR 원본 프레임 (H, W, 3)
+            boxes (Sequence | np.ndarray): (x1, y1, x2, y2) 박스 목록
+
+        Returns:
+            tuple: (classes (N,) int64, probs (N, C) float32)
+        """
+        return self.classify_crops(self.crop_boxes(frame, boxes))
+
+    def classify_frames(self, frames, boxes_list):
+        """
+        여러 프레임 (예: 여러 카메라) 의 사람 박스를 모아 한 번의 배치 추론으로 분류합니다.
+
+        Returns:
+            list[np.ndarray]: 프레임별 (N_k,) int64 성별 클래스
+        """
+        if not len(frames):
+            return []
+        crops = [crop for frame, boxes in zip(frames, boxes_list) for crop in self.crop_boxes(frame, boxes)]
+        classes, _ = self.classify_crops(crops)
+        splits = np.cumsum([len(boxes) for boxes in boxes_list])[:-1]
+        return np.split(classes, splits)
+
+    @staticmethod
+    def crop_boxes(frame, boxes):
+        """프레임 경계로 자른 박스 영역의 크롭 (view) 목록"""
+        h, w = frame.shape[:2]
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        boxes[:, 0::2] = boxes[:, 0::2].clip(0, w)
+        boxes[:, 1::2] = boxes[:, 1::2].clip(0, h)
+        return [frame[y1:y2, x1:x2] for (x1, y1, x2, y2) in boxes]
+
+    def classify_crops(self, crops):
+        """
+        BGR 크롭 이미지 목록을 max_batch 단위 배치 추론으로 분류합니다.
+
+        Returns:
+            tuple: (classes (N,) int64, probs (N, C) float32)
+        """
+        n = len(crops)
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(self.model.names)), dtype=np.float32)
+
+        probs = []
+        for start in range(0, n, self.max_batch):
+            batch = self._letterbox_crops(crops[start:start + self.max_batch])
+            img = torch.from_numpy(batch).to(self.device, non_blocking=True)
+            img = img.half() if self.fp16 else img.float()
+            img /= 255
+            out = self.model(img)
+            out = out[0] if isinstance(out, (list, tuple)) else out
+            probs.append(out.float().cpu().numpy())
+
+        probs = np.concatenate(probs, axis=0)
+        return probs.argmax(axis=1), probs
+
+    def _letterbox_crops(self, crops):
+        """크롭들을 재사용 버퍼 (N, 3, imgsz, imgsz) uint8 에 RGB/CHW 로 채워 넣습니다."""
+        n = len(crops)
+        if len(self._buffer) < n:
+            self._buffer = np.empty((n, 3, self.imgsz, self.imgsz), dtype=np.uint8)
+        batch = self._buffer[:n]
+        for k, crop in enumerate(crops):
+            if crop.size == 0:
+                batch[k] = 114
+                continue
+            batch[k] = self.letterbox(image=crop)[..., ::-1].transpose(2, 0, 1)
+        return batch
+
 
 class ThreatAnalyzer:
     def __init__(self, distance_threshold: int = config.DISTANCE_THRESHOLD):
         self.distance_threshold = distance_threshold
+        self.proximity = ProximityEngine(distance_threshold)
 
-    def draw(self, frame, boxes, genders=None, centers=None):
+    def draw(self, frame, boxes, genders=None, centers=None, pairs=None):
+        """pairs 에 ProximityEngine.pairs 결과를 주면 거리 계산을 다시 하지 않습니다."""
         for i, (x1, y1, x2, y2) in enumerate(boxes):
-            if genders:
+            if genders is not None:
                 gender = genders[i]
                 label = "Female" if gender == 0 else "Male"
                 color = (255, 0, 255) if gender == 0 else (0, 255, 255)
@@ -55,65 +305,337 @@ class ThreatAnalyzer:
             cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
 
         if centers is not None and len(centers) >= 2:
-            dist_matrix = cdist(centers, centers, metric='euclidean')
-            for i in range(len(centers)):
-                for j in range(i + 1, len(centers)):
-                    if dist_matrix[i][j] < self.distance_threshold:
-                        p1, p2 = tuple(centers[i]), tuple(centers[j])
-                        cv2.line(frame, p1, p2, (0, 0, 255), 2)
-                        cv2.putText(frame, f"{int(dist_matrix[i][j])}px", p1,
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+            for i, j, dist in zip(*(pairs if pairs is not None else self.proximity.pairs(centers))):
+                p1, p2 = tuple(centers[i]), tuple(centers[j])
+                cv2.line(frame, p1, p2, (0, 0, 255), 2)
+                cv2.putText(frame, f"{int(dist)}px", p1,
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
         return frame
 
 
+class AlertTimeline:
+    """
+    headless 모드에서 VideoWriter 대신 프레임 결과를 받는 출력
+
+    경고 프레임 번호만 모아 요약하고, on_result 가 있으면 프레임 결과 dict 를 그대로 넘깁니다.
+    """
+
+    def __init__(self, fps: float, on_result=None):
+        self.fps = fps
+        self.on_result = on_result
+        self.frames = 0
+        self.alert_frames = []
+
+    def write(self, result):
+        self.frames += 1
+        if len(result["pairs"]):
+            self.alert_frames.append(result["frame"])
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def release(self):
+        pass
+
+    def summary(self):
+        return {"frames": self.frames,
+                "alert_frames": len(self.alert_frames),
+                "alert_intervals": alert_intervals(np.asarray(self.alert_frames) / self.fps, self.fps)}
+
+
+class FrameRangeReader:
+    """cv2.VideoCapture (또는 utils/video_io 읽기 객체) 를 감싸 [start_frame, end_frame) 구간의 프레임만 읽도록 합니다."""
+
+    def __init__(self, cap, start_frame: int = 0, end_frame: int = None):
+        self.cap = cap
+        self.remaining = None if end_frame is None else max(end_frame - start_frame, 0)
+        if start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != start_frame:
+                # seek 이 정확하지 않은 컨테이너는 처음부터 읽어 넘깁니다.
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                for _ in range(start_frame):
+                    if not cap.grab():
+                        break
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def read(self):
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return False, None
+            self.remaining -= 1
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
 class ThreatVideoDiscriminator:
     def __init__(self,
                  use_classifier=True,
                  det_model_path: str = config.DET_MODEL_PATH,
                  cls_model_path: str = config.CLS_MODEL_PATH,
-                 output_path: str = config.OUTPUT_VIDEO_PATH):
+                 output_path: str = config.OUTPUT_VIDEO_PATH,
+                 fast_detector: bool = False,
+                 backend: str = "torch",
+                 quantized_classifier: bool = False,
+                 track_genders: bool = False,
+                 keyframe: bool = False,
+                 motion_gate: bool = False,
+                 rois=None,
+                 tiled: bool = False,
+                 headless: bool = False,
+                 video_backend: str = config.VIDEO_BACKEND,
+                 video_options: dict = None,
+                 anonymize: bool = False,
+                 head_source: str = config.HEAD_SOURCE,
+                 head_model_path: str = config.HEAD_MODEL_PATH):
+        """
+        Args:
+            track_genders (bool): True 이면 사람을 추적하여 트랙마다 성별을 캐시하고,
+                새 트랙 / 크롭이 커진 경우 / 재분류 주기에만 분류기를 호출 (다수결 평활화)
+            keyframe (bool): True 이면 적응형 간격의 keyframe 에서만 탐지기를 실행하고
+                사이 프레임은 optical flow 로 박스를 전파 (KeyframeDetector 참고)
+            motion_gate (bool): True 이면 마지막 탐지 결과가 비어 있고 화면 변화가 없는 프레임은
+                탐지기를 건너뜀 (MotionGatedDetector 참고)
+            rois (list[np.ndarray]): 관심 영역 다각형 목록 (models/regions.load_rois). 외접 사각형만 잘라 탐지
+            tiled (bool): True 이면 큰 프레임을 겹치는 타일로 나눠 배치 탐지 후 NMS 로 병합 (RegionDetector 참고)
+            headless (bool): True 이면 process_video 가 그리기 / 영상 인코딩 없이 탐지 / 분류 / 거리 판단만 하고
+                경고 요약을 반환 (프레임 결과는 on_result 콜백이나 store_path 로 받음)
+            video_backend (str): 영상 입출력 백엔드 (auto / pyav / ffmpeg / opencv, utils/video_io 참고)
+            video_options (dict): 결과 영상 인코딩 옵션 {"codec", "crf", "preset"} (utils/video_io.open_writer)
+            anonymize (bool): True 이면 결과 영상의 머리 영역을 가림 (models/privacy.HeadMasker).
+                분석은 가리기 전 원본 프레임으로 하므로 별도의 익명화 패스 (face_blur.py) 가 필요 없음
+            head_source (str): "person" 이면 사람 탐지 박스의 윗부분을 머리로 추정 (추가 탐지기 없음),
+                "detector" 이면 별도 머리 탐지기를 keyframe 마다 실행
+            head_model_path (str): head_source="detector" 에 쓸 YOLO 머리 탐지 가중치 (없으면 realutils.detect_heads)
+        """
 
         self.use_classifier = use_classifier
         self.output_path = output_path
+        self.headless = headless
+        self.video_backend = video_backend
+        self.video_options = video_options or {}
+        self.distance_threshold = config.DISTANCE_THRESHOLD
 
-        self.detector = PersonDetector(det_model_path)
-        self.classifier = GenderClassifier(cls_model_path) if use_classifier else None
+        if fast_detector:
+            self.detector = FastPersonDetector(det_model_path, backend=backend)
+        else:
+            self.detector = PersonDetector(det_model_path, backend=backend)
+        self.regions = RegionDetector(self.detector, rois=rois, tiled=tiled) if rois is not None or tiled else None
+        if self.regions is not None:
+            self.detector = self.regions
+        # stateful 탐지기 래퍼 (영상마다 reset). 움직임 게이트는 keyframe 에서만 호출됨
+        self.motion_gate = MotionGatedDetector(self.detector) if motion_gate else None
+        if self.motion_gate is not None:
+            self.detector = self.motion_gate
+        self.keyframe = KeyframeDetector(self.detector, distance_threshold=config.DISTANCE_THRESHOLD) if keyframe else None
+        if self.keyframe is not None:
+            self.detector = self.keyframe
+        self.classifier = GenderClassifier(cls_model_path, backend=backend,
+                                           quantized=quantized_classifier) if use_classifier else None
         self.analyzer = ThreatAnalyzer(distance_threshold=config.DISTANCE_THRESHOLD)
+        self.track_genders = track_genders and use_classifier
+        self.tracker = IoUTracker() if self.track_genders else None
+        self.gender_cache = TrackGenderCache(self.classifier) if self.track_genders else None
+        if head_source not in ("person", "detector"):
+            raise ValueError(f"Unknown head_source: {head_source} (choose from 'person', 'detector')")
+        if anonymize:
+            self.head_masker = HeadMasker(HeadDetector(head_model_path) if head_source == "detector" else None)
+        else:
+            self.head_masker = None
+        self.pipeline_stats = {}
+        self.store = None
+        self.frame_idx = 0
 
     def process_frame(self, frame):
-        boxes, centers = self.detector.detect(frame)
-        genders = []
-        if self.use_classifier:
-            for (x1, y1, x2, y2) in boxes:
-                crop = frame[y1:y2, x1:x2]
-                gender = self.classifier.classify(crop)
-                genders.append(gender)
+        return self._process_frames([frame])[0]
+
+    def _draw(self, frame, result):
+        dets, pairs = result["detections"], result["pairs"]
+        return self.analyzer.draw(frame, dets.boxes, result["genders"], dets.centers,
+                                  (pairs[:, 0], pairs[:, 1], result["distances"]))
+
+    def _analyze(self, frame, dets):
+        """
+        탐지 결과에 트랙 ID / 성별 / 거리 위반 쌍을 더한 프레임 결과 (그리지 않음).
+        저장소가 열려 있으면 함께 기록합니다.
+
+        Returns:
+            dict: {"frame": int, "detections": Detections, "genders": (N,) int64 | None,
+                   "track_ids": (N,) int64 | None, "pairs": (M, 2) int64, "distances": (M,) float64}
+        """
+        boxes = dets.boxes
+        # 저장소 기록 시에는 성별 캐시를 쓰지 않아도 트랙 ID 를 남기기 위해 추적기를 실행
+        track_ids = self.tracker.update(boxes) if self.tracker is not None else None
+        if self.track_genders:
+            self.gender_cache.evict(self.tracker.evicted)
+            genders = self.gender_cache.classify(frame, boxes, track_ids, self.tracker.frame_idx)
+        elif self.use_classifier:
+            genders, _ = self.classifier.classify_batch(frame, boxes)
         else:
             genders = None
 
-        return self.analyzer.draw(frame, boxes, genders, centers)
+        i, j, dist = self.analyzer.proximity.pairs(dets.centers)
+        if self.store is not None:
+            self.store.append(self.frame_idx, dets, genders, track_ids, (i, j, dist))
+        result = {"frame": self.frame_idx, "detections": dets, "genders": genders, "track_ids": track_ids,
+                  "pairs": np.stack([i, j], axis=1), "distances": dist}
+        self.frame_idx += 1
+        return result
+
+    def analyze_batch(self, frames):
+        """
+        서로 무관한 프레임 (여러 카메라 / 여러 요청) 을 한 번의 탐지 배치와 한 번의 분류 배치로 분석합니다.
+        추적 / 성별 캐시는 사용하지 않으며, 그리지 않고 결과만 반환합니다.
+
+        Returns:
+            list[dict]: 프레임별 {"detections": Detections, "genders": (N,) int64 | None,
+                        "pairs": (M, 2) int64, "distances": (M,) float64}
+        """
+        if not len(frames):
+            return []
+        dets = self.detector.detect_batch(frames)
+        if self.use_classifier:
+            genders = self.classifier.classify_frames(frames, [d.boxes for d in dets])
+        else:
+            genders = [None] * len(frames)
+        results = []
+        for d, g in zip(dets, genders):
+            i, j, dist = self.analyzer.proximity.pairs(d.centers)
+            results.append({"detections": d, "genders": g, "pairs": np.stack([i, j], axis=1), "distances": dist})
+        return results
+
+    def process_video(self, video_path: str, batch_frames: int = 1,
+                      threaded: bool = False, queue_size: int = 8,
+                      start_frame: int = 0, end_frame: int = None, store_path: str = None,
+                      on_result=None, decode_width: int = None):
+        """
+        영상을 처리하여 결과 영상을 output_path 에 저장합니다.
+
+        Args:
+            video_path (str): 입력 영상 경로
+            batch_frames (int): 한 번에 탐지할 프레임 수. 1 이면 프레임 단위 처리,
+                2 이상이면 K 프레임을 모아 배치 탐지하는 오프라인 모드 (지연 ↑, 처리량 ↑)
+            threaded (bool): True 이면 decode / infer / encode 를 별도 스레드로 겹쳐 실행
+            queue_size (int): threaded 모드에서 단계 사이 bounded queue 크기
+            start_frame (int): 처리를 시작할 프레임 인덱스 (포함)
+            end_frame (int): 처리를 끝낼 프레임 인덱스 (미포함). None 이면 영상 끝까지
+            store_path (str): 지정하면 프레임별 박스 / 신뢰도 / 성별 / 트랙 ID / 위반 쌍을
+                열 지향 저장소 (models/store.DetectionStore) 디렉토리에 함께 기록
+            on_result (callable): headless 모드에서 프레임마다 _analyze 결과 dict 를 받는 콜백
+            decode_width (int): 지정하면 디코드 단계에서 가로 decode_width 로 축소한 프레임으로 분석 / 기록.
+                결과 영상도 축소된 해상도로 기록됩니다 (원본 크기 프레임은 디코드하지 않음).
+                거리 임계값과 픽셀 좌표 ROI 는 같은 비율로 줄여 적용
+
+        Returns:
+            dict | None: headless 모드이면 {"frames", "alert_frames", "alert_intervals": [(시작 초, 끝 초), ...]}
+        """
+        if batch_frames < 1:
+            raise ValueError(f"batch_frames must be >= 1, got {batch_frames}")
+        # 영상 (또는 구간) 마다 추적 상태를 새로 시작
+        self.tracker = IoUTracker() if self.track_genders or store_path else None
+        if self.track_genders:
+            self.gender_cache = TrackGenderCache(self.classifier)
+        for wrapper in (self.motion_gate, self.keyframe):
+            if wrapper is not None:
+                wrapper.reset()
+        if self.head_masker is not None:
+            self.head_masker.reset(start_frame)
 
-    def process_video(self, video_path: str):
-        cap = cv2.VideoCapture(video_path)
+        cap = open_reader(video_path, backend=self.video_backend, width=decode_width)
         if not cap.isOpened():
             raise RuntimeError(f"Cannot open video: {video_path}")
+        scale = cap.size[0] / cap.source_size[0]
+        source_size = cap.source_size
+        self._set_distance_scale(scale)
+        if self.regions is not None:
+            self.regions.set_scale(scale)
+        if start_frame or end_frame is not None:
+            cap = FrameRangeReader(cap, start_frame, end_frame)
 
         fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        video_writer = cv2.VideoWriter(self.output_path, fourcc, fps, (width, height))
+        if self.headless:
+            # 그리기 / 인코딩 없이 프레임 결과만 받음
+            video_writer = AlertTimeline(fps, on_result)
+            infer_fn = self._analyze_frames
+        else:
+            os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+            if scale != 1:
+                print(f"ℹ️ decode_width: 결과 영상을 축소 해상도 {width}x{height} 로 기록합니다 "
+                      f"(원본 {source_size[0]}x{source_size[1]})")
+            video_writer = open_writer(self.output_path, fps, (width, height), backend=self.video_backend,
+                                       **self.video_options)
+            infer_fn = self._process_frames
+
+        self.frame_idx = start_frame
+        if store_path:
+            self.store = DetectionStoreWriter(store_path, fps, size=(width, height), source=video_path,
+                                              distance_threshold=self.analyzer.distance_threshold)
+        try:
+            if threaded:
+                pipeline = ThreadedVideoPipeline(infer_fn, batch_size=batch_frames,
+                                                 queue_size=queue_size)
+                self.pipeline_stats = pipeline.run(cap, video_writer)
+            else:
+                self._run_serial(cap, video_writer, batch_frames, infer_fn)
+        finally:
+            cap.release()
+            video_writer.release()
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+            if not self.track_genders:
+                self.tracker = None
+        if store_path:
+            print(f"🗂️ 탐지 저장소 → {store_path}")
+        if self.headless:
+            return video_writer.summary()
+        print(f"🎬 저장 완료 → {self.output_path}")
+
+    def _set_distance_scale(self, scale: float):
+        """축소 디코드 시 픽셀 단위 거리 임계값을 같은 비율로 맞춥니다."""
+        threshold = self.distance_threshold * scale
+        if threshold == self.analyzer.distance_threshold:
+            return
+        self.analyzer = ThreatAnalyzer(distance_threshold=threshold)
+        if self.keyframe is not None:
+            self.keyframe.set_distance_threshold(threshold)
 
+    def _run_serial(self, cap, video_writer, batch_frames, infer_fn):
+        pending = []
         while cap.isOpened():
             ret, frame = cap.read()
             if not ret:
                 break
 
-            annotated = self.process_frame(frame)
-            video_writer.write(annotated)
+            pending.append(frame)
+            if len(pending) == batch_frames:
+                for out in infer_fn(pending):
+                    video_writer.write(out)
+                pending = []
 
-        cap.release()
-        video_writer.release()
-        print(f"🎬 저장 완료 → {self.output_path}")
+        for out in infer_fn(pending):
+            video_writer.write(out)
+
+    def _detect_frames(self, frames):
+        if len(frames) == 1:
+            return [self.detector.detect(frames[0])]
+        return self.detector.detect_batch(frames)
+
+    def _process_frames(self, frames):
+        results = self._analyze_frames(frames)
+        if self.head_masker is not None:
+            # 분석 (탐지 / 분류 크롭) 은 원본으로 끝낸 뒤, 그리기 전에 결과 영상의 머리 영역만 가림
+            self.head_masker.apply(frames, [result["detections"].boxes for result in results])
+        return [self._draw(frame, result) for frame, result in zip(frames, results)]
+
+    def _analyze_frames(self, frames):
+        return [self._analyze(frame, dets) for frame, dets in zip(frames, self._detect_frames(frames))]
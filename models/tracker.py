@@ -0,0 +1,145 @@
+from collections import Counter, deque
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+import config
+
+
+def iou_matrix(a, b):
+    """(N, 4) x (M, 4) xyxy 박스의 IoU 행렬 (N, M)"""
+    a = a[:, None, :]
+    b = b[None, :, :]
+    inter_w = (np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])).clip(0)
+    inter_h = (np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])).clip(0)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / (area_a + area_b - inter + 1e-7)
+
+
+class IoUTracker:
+    """
+    외부 서비스 없이 동작하는 경량 다중 객체 추적기
+
+    프레임마다 기존 트랙과 탐지 박스를 IoU 기준 헝가리안 매칭으로 연결하고,
+    IoU 로 연결되지 않은 나머지는 중심점 거리 (박스 높이 대비) 로 한 번 더 매칭합니다.
+    max_age 프레임 동안 보이지 않은 트랙은 제거됩니다.
+    """
+
+    def __init__(self, iou_thres: float = config.TRACK_IOU_THRES,
+                 max_center_dist: float = config.TRACK_MAX_CENTER_DIST,
+                 max_age: int = config.TRACK_MAX_AGE):
+        self.iou_thres = iou_thres
+        self.max_center_dist = max_center_dist
+        self.max_age = max_age
+        self.frame_idx = -1
+        self.next_id = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.boxes = np.empty((0, 4), dtype=np.float64)
+        self.last_seen = np.empty(0, dtype=np.int64)
+        self.evicted = np.empty(0, dtype=np.int64)  # 직전 update 에서 제거된 트랙 ID
+
+    def update(self, boxes):
+        """
+        Args:
+            boxes (array-like): (N, 4) 현재 프레임의 xyxy 박스
+
+        Returns:
+            np.ndarray: (N,) int64 박스별 트랙 ID
+        """
+        self.frame_idx += 1
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        track_ids = np.full(len(boxes), -1, dtype=np.int64)
+
+        if len(self.ids) and len(boxes):
+            iou = iou_matrix(self.boxes, boxes)
+            rows, cols = linear_sum_assignment(-iou)
+            ok = iou[rows, cols] >= self.iou_thres
+            self._assign(rows[ok], cols[ok], boxes, track_ids)
+
+            free_t = np.setdiff1d(np.arange(len(self.ids)), rows[ok])
+            free_d = np.flatnonzero(track_ids < 0)
+            if len(free_t) and len(free_d):
+                tc = (self.boxes[free_t, :2] + self.boxes[free_t, 2:]) / 2
+                dc = (boxes[free_d, :2] + boxes[free_d, 2:]) / 2
+                height = (self.boxes[free_t, 3] - self.boxes[free_t, 1]).clip(1)
+                dist = np.linalg.norm(tc[:, None] - dc[None], axis=2) / height[:, None]
+                rows, cols = linear_sum_assignment(dist)
+                ok = dist[rows, cols] <= self.max_center_dist
+                self._assign(free_t[rows[ok]], free_d[cols[ok]], boxes, track_ids)
+
+        new = np.flatnonzero(track_ids < 0)
+        if len(new):
+            new_ids = np.arange(self.next_id, self.next_id + len(new), dtype=np.int64)
+            self.next_id += len(new)
+            track_ids[new] = new_ids
+            self.ids = np.concatenate([self.ids, new_ids])
+            self.boxes = np.concatenate([self.boxes, boxes[new]])
+            self.last_seen = np.concatenate([self.last_seen, np.full(len(new), self.frame_idx)])
+
+        stale = self.frame_idx - self.last_seen > self.max_age
+        self.evicted = self.ids[stale]
+        if stale.any():
+            self.ids, self.boxes, self.last_seen = self.ids[~stale], self.boxes[~stale], self.last_seen[~stale]
+        return track_ids
+
+    def _assign(self, t_idx, d_idx, boxes, track_ids):
+        track_ids[d_idx] = self.ids[t_idx]
+        self.boxes[t_idx] = boxes[d_idx]
+        self.last_seen[t_idx] = self.frame_idx
+
+
+class TrackGenderCache:
+    """
+    트랙 단위 성별 캐시
+
+    트랙마다 분류 결과를 저장하고, 다음 경우에만 다시 분류합니다.
+        - 새 트랙
+        - 마지막 분류 때보다 박스 면적이 grow_ratio 배 이상 커진 경우 (더 선명한 크롭)
+        - 마지막 분류 후 refresh_interval 프레임이 지난 경우
+    최근 vote_window 개 분류 결과의 다수결로 성별을 정해 프레임 간 라벨 깜빡임을 없앱니다.
+    """
+
+    def __init__(self, classifier,
+                 refresh_interval: int = config.GENDER_REFRESH_INTERVAL,
+                 grow_ratio: float = config.GENDER_GROW_RATIO,
+                 vote_window: int = config.GENDER_VOTE_WINDOW):
+        self.classifier = classifier
+        self.refresh_interval = refresh_interval
+        self.grow_ratio = grow_ratio
+        self.vote_window = vote_window
+        self.entries = {}  # track_id -> {"votes": deque, "area": float, "frame": int}
+        self.stats = {"boxes": 0, "classified": 0}
+
+    def classify(self, frame, boxes, track_ids, frame_idx):
+        """
+        Returns:
+            np.ndarray: (N,) int64 다수결로 평활화된 성별 (0: Female, 1: Male)
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        areas = (boxes[:, 2] - boxes[:, 0]).astype(np.float64) * (boxes[:, 3] - boxes[:, 1])
+        todo = [k for k, tid in enumerate(track_ids) if self._needs_update(tid, areas[k], frame_idx)]
+
+        if todo:
+            classes, _ = self.classifier.classify_batch(frame, boxes[todo])
+            for k, cls in zip(todo, classes):
+                entry = self.entries.setdefault(
+                    int(track_ids[k]), {"votes": deque(maxlen=self.vote_window)})
+                entry["votes"].append(int(cls))
+                entry["area"] = areas[k]
+                entry["frame"] = frame_idx
+
+        self.stats["boxes"] += len(boxes)
+        self.stats["classified"] += len(todo)
+        return np.array([Counter(self.entries[int(tid)]["votes"]).most_common(1)[0][0] for tid in track_ids],
+                        dtype=np.int64)
+
+    def evict(self, track_ids):
+        for tid in track_ids:
+            self.entries.pop(int(tid), None)
+
+    def _needs_update(self, track_id, area, frame_idx):
+        entry = self.entries.get(int(track_id))
+        if entry is None:
+            return True
+        return (area >= entry["area"] * self.grow_ratio
+                or frame_idx - entry["frame"] >= self.refresh_interval)
@@ -2,14 +2,16 @@ import cv2
 import numpy as np  
 import os  
 from ultralytics import YOLO 
-from scipy.spatial.distance import cdist  # scipy 거리 행렬 함수 (cdist = "cross distance")
 import models
 from utils.prepro import box_iou, xywh2xyxy, load_model, LetterBox, preprocess_v2 , non_max_suppression
+from models.threat import GenderClassifier
+from models.proximity import ProximityEngine
 import config
 
 
 model = YOLO(config.DET_MODEL_PATH)  
-gender_model = load_model(config.CLS_MODEL_PATH)
+gender_model = GenderClassifier(config.CLS_MODEL_PATH)
+proximity = ProximityEngine(config.DISTANCE_THRESHOLD)
 
 cap = cv2.VideoCapture(config.INPUT_VIDEO_PATH)
 
@@ -41,14 +43,10 @@ while cap.isOpened():
 
     centers = np.array(centers)
 
-    for i, box in enumerate(boxes):
-        x1, y1, x2, y2 = box
-        person_crop = frame[y1:y2, x1:x2]
-
-        person_rgb = cv2.cvtColor(person_crop, cv2.COLOR_BGR2RGB)
-        pred = gender_model.predict(source=person_rgb, verbose=False)[0]
-        pred_class = int(pred.probs.top1)  
+    pred_classes, _ = gender_model.classify_batch(frame, boxes)
 
+    for box, pred_class in zip(boxes, pred_classes):
+        x1, y1, x2, y2 = box
         label = "Female" if pred_class == 0 else "Male"
         color = (255, 0, 255) if pred_class == 0 else (0, 255, 255)
 
@@ -56,16 +54,12 @@ while cap.isOpened():
         cv2.putText(frame, label, (x1, y1 - 10),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
 
-    if len(centers) >= 2:
-        dist_matrix = cdist(centers, centers, metric='euclidean')
-        for i in range(len(centers)):
-            for j in range(i + 1, len(centers)):
-                if dist_matrix[i][j] < config.DISTANCE_THRESHOLD:
-                    p1 = tuple(centers[i])
-                    p2 = tuple(centers[j])
-                    cv2.line(frame, p1, p2, (0, 0, 255), 2)
-                    cv2.putText(frame, f"{int(dist_matrix[i][j])}px", p1,
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+    for i, j, dist in zip(*proximity.pairs(centers)):
+        p1 = tuple(centers[i])
+        p2 = tuple(centers[j])
+        cv2.line(frame, p1, p2, (0, 0, 255), 2)
+        cv2.putText(frame, f"{int(dist)}px", p1,
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
 
     out.write(frame)
 
@@ -2,11 +2,12 @@ import cv2  # OpenCV: 영상 처리 및 시각화 라이브러리
 import numpy as np  # NumPy: 수치 계산 및 배열 처리
 import os  # OS 관련 기능 (폴더 생성 등)
 from ultralytics import YOLO  # YOLOv8 모델 로딩 라이브러리
-from scipy.spatial.distance import cdist  # scipy 거리 행렬 함수 (cdist = "cross distance")
 import models
+from models.proximity import ProximityEngine  # 거리 위반 쌍 계산 (소규모: 벡터화, 대규모: KD-tree)
 
 # 🚨 거리 임계값 설정 (픽셀 단위) → 이 값보다 가까우면 거리 위반으로 판단
 DISTANCE_THRESHOLD = 300
+proximity = ProximityEngine(DISTANCE_THRESHOLD)
 
 # 🎯 YOLOv8 사전 학습 모델 불러오기
 model = YOLO("models/PersonDet_v3.2.0.pt")  
@@ -54,20 +55,14 @@ while cap.isOpened():
     for box in boxes:
         cv2.rectangle(frame, box[:2], box[2:], (0, 255, 0), 2)  # 초록 박스
 
-    # 📏 사람 간 거리 계산 (N x N 거리 행렬)
-    if len(centers) >= 2:
-        # cdist: center들 간의 유클리디안 거리 계산
-        dist_matrix = cdist(centers, centers, metric='euclidean')
-
-        # 🔴 거리 위반 시각화: 가까운 쌍만 빨간 선/거리 표시
-        for i in range(len(centers)):
-            for j in range(i + 1, len(centers)):  # 중복 방지: (i < j)
-                if dist_matrix[i][j] < DISTANCE_THRESHOLD:
-                    p1 = tuple(centers[i].astype(int))  # 첫 번째 사람 위치
-                    p2 = tuple(centers[j].astype(int))  # 두 번째 사람 위치
-                    cv2.line(frame, p1, p2, (0, 0, 255), 2)  # 빨간 선 그리기
-                    cv2.putText(frame, f"{int(dist_matrix[i][j])}px", p1,
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)  # 거리 숫자 출력
+    # 📏 사람 간 거리 계산: 임계값보다 가까운 쌍 (i < j) 만 인덱스 배열로 반환
+    # 🔴 거리 위반 시각화: 가까운 쌍만 빨간 선/거리 표시
+    for i, j, dist in zip(*proximity.pairs(centers)):
+        p1 = tuple(centers[i].astype(int))  # 첫 번째 사람 위치
+        p2 = tuple(centers[j].astype(int))  # 두 번째 사람 위치
+        cv2.line(frame, p1, p2, (0, 0, 255), 2)  # 빨간 선 그리기
+        cv2.putText(frame, f"{int(dist)}px", p1,
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)  # 거리 숫자 출력
 
     # 📝 프레임 저장 (output/result.mp4에 기록됨)
     out.write(frame)
@@ -1,6 +1,9 @@
 from preprocess.preprocess_aihub import process_aihub_dataset
 from preprocess.preprocess_peta import process_peta_dataset
+from preprocess.transfer import LINK_MODES
+from preprocess.shards import convert_folder_dataset, log_pack
 import argparse
+import config
 from utils.custom_logger import custom_logger
 
 logger = custom_logger(__name__)
@@ -11,23 +14,51 @@ def main():
     
     사용법:
         python preprocess.py --dataset [aihub|peta|all]
+        python preprocess.py --dataset aihub --workers 8 --link-mode hardlink  # 병렬 처리, 같은 파일시스템이면 링크
+        python preprocess.py --dataset all --format shards  # 224 로 줄인 이미지 shard 로 기록 (preprocess/shards.py)
+        python preprocess.py --convert prepro_data/prepro_peta [--shard-dir prepro_data/shards_peta]  # 기존 폴더 결과 변환
+
+    중단된 경우 같은 명령을 다시 실행하면 출력 디렉토리의 manifest 에 기록된 항목은 건너뜁니다.
     """
     parser = argparse.ArgumentParser(description='성별 분류 데이터셋 전처리 스크립트')
     parser.add_argument('-d' , '--dataset', type=str, choices=['aihub', 'peta', 'all'], default='all',
                         help='처리할 데이터셋 (aihub, peta, 또는 all)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='라벨 파싱 프로세스 수 (복사 스레드는 이 값 × PREPRO_THREADS_PER_WORKER, 기본 1: 순차 처리)')
+    parser.add_argument('--link-mode', type=str, choices=list(LINK_MODES), default='copy',
+                        help='출력 파일 배치 방식 (hardlink / reflink 가 불가능하면 copy 로 대체, symlink 는 원본 경로를 가리킴)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='manifest 를 무시하고 처음부터 다시 처리')
+    parser.add_argument('--format', type=str, choices=['folder', 'shards'], default='folder',
+                        help='출력 형식 (folder: ultralytics 폴더 구조, shards: 224 uint8 배열 shard)')
+    parser.add_argument('--convert', type=str, default=None,
+                        help='전처리 대신 기존 폴더 구조 출력 ({split}/{Male,Female}/*) 을 shard 로 변환')
+    parser.add_argument('--shard-dir', type=str, default=None,
+                        help='--convert 출력 디렉토리 (기본: <convert 경로>_shards)')
     
     args = parser.parse_args()
-    
+    threads = args.workers * config.PREPRO_THREADS_PER_WORKER if args.workers > 1 else 1
+
+    if args.convert:
+        shard_dir = args.shard_dir or args.convert.rstrip("/\\") + "_shards"
+        logger.info(f"===== shard 변환: {args.convert} → {shard_dir} =====")
+        for split, result in convert_folder_dataset(args.convert, shard_dir, threads).items():
+            logger.info(f"{split}:")
+            log_pack(logger, result)
+        return
+
     logger.info("===== 성별 분류 데이터셋 전처리 시작 =====")
     
     if args.dataset in ['aihub', 'all']:
         logger.info("\n===== AI Hub 데이터셋 처리 시작 =====")
-        process_aihub_dataset()
+        process_aihub_dataset(workers=args.workers, link_mode=args.link_mode, resume=not args.no_resume,
+                              output_format=args.format)
         logger.info("===== AI Hub 데이터셋 처리 완료 =====")
     
     if args.dataset in ['peta', 'all']:
         logger.info("\n===== PETA 데이터셋 처리 시작 =====")
-        process_peta_dataset()
+        process_peta_dataset(workers=args.workers, link_mode=args.link_mode, resume=not args.no_resume,
+                             output_format=args.format)
         logger.info("===== PETA 데이터셋 처리 완료 =====")
     
     logger.info("\n===== 모든 처리 완료 =====")
@@ -1,20 +1,30 @@
 import os
-import shutil
 import xml.etree.ElementTree as ET
-from tqdm import tqdm
 import config
+from preprocess.transfer import Manifest, map_labels, transfer_files, log_transfer, manifest_path
+from preprocess.shards import pack_images, log_pack
 from utils.custom_logger import custom_logger
 
 # 로거 생성
 logger = custom_logger(__name__)
 
-def process_aihub_dataset():
+def process_aihub_dataset(workers: int = 1, link_mode: str = "copy", resume: bool = True,
+                          output_format: str = "folder"):
     """
     AI Hub 데이터셋을 처리하여 YOLO 성별 분류 학습 데이터셋으로 구성합니다.
     
     - 원본 데이터셋에서 성별 정보를 추출하여 Male/Female 폴더로 이미지를 분류합니다.
     - XML 파일에서 성별 정보를 추출하고, 누락되거나 잘못된 정보의 파일은 건너뜁니다.
     - 처리 결과를 로그로 출력합니다.
+    - 완료한 이미지는 출력 디렉토리의 manifest 에 기록되어, 재실행 시 XML 파싱과 복사를 건너뜁니다.
+    - output_format="shards" 이면 폴더 대신 AIHUB_SHARD_DIR 에 224 로 줄인 이미지 shard 를 기록합니다
+      (preprocess/shards.py). shard 는 split 단위로 새로 쓰므로 manifest 는 사용하지 않습니다.
+
+    Args:
+        workers (int): 1 보다 크면 XML 파싱은 프로세스 풀, 복사는 workers × PREPRO_THREADS_PER_WORKER 스레드로 실행
+        link_mode (str): "copy" | "hardlink" | "symlink" | "reflink" (같은 파일시스템이면 바이트 복사 없이 배치)
+        resume (bool): False 이면 manifest 를 무시하고 처음부터 다시 처리
+        output_format (str): "folder" (ultralytics 폴더 구조) | "shards"
     """
     SPLITS = {
         "train": {
@@ -27,34 +37,58 @@ def process_aihub_dataset():
         },
     }
 
+    if output_format not in ("folder", "shards"):
+        raise ValueError(f"Unknown output format: {output_format}")
+    shards = output_format == "shards"
+
     # 출력 폴더 생성
-    for split in SPLITS:
-        for gender in ["Male", "Female"]:
-            os.makedirs(os.path.join(config.AIHUB_OUTPUT_DIR, split, gender), exist_ok=True)
+    if not shards:
+        for split in SPLITS:
+            for gender in ["Male", "Female"]:
+                os.makedirs(os.path.join(config.AIHUB_OUTPUT_DIR, split, gender), exist_ok=True)
 
     # 누락 로그 저장
     skipped_files = []
+    threads = workers * config.PREPRO_THREADS_PER_WORKER if workers > 1 else 1
+    manifest = None if shards else Manifest(manifest_path(config.AIHUB_OUTPUT_DIR), resume=resume)
 
     for split_name, paths in SPLITS.items():
         logger.info(f"\n📦 처리 중: {split_name}")
         img_files = [f for f in os.listdir(paths["img_dir"]) if os.path.splitext(f)[1].lower() in config.VALID_EXT]
+        todo = [f for f in img_files
+                if manifest is None or not manifest.done(f"{split_name}/{f}", config.AIHUB_OUTPUT_DIR)]
+        # 이미지마다 exists 를 호출하지 않도록 라벨 디렉토리는 한 번만 나열
+        xml_names = set(os.listdir(paths["xml_dir"]))
 
-        for img_file in tqdm(img_files):
+        labeled = []
+        for img_file in todo:
             xml_file = os.path.splitext(img_file)[0] + ".xml"
-            xml_path = os.path.join(paths["xml_dir"], xml_file)
-            img_path = os.path.join(paths["img_dir"], img_file)
-
-            if not os.path.exists(xml_path):
+            if xml_file not in xml_names:
                 skipped_files.append((img_file, "❌ XML 파일 없음"))
                 continue
+            labeled.append(img_file)
 
-            gender, reason = extract_gender(xml_path)
+        xml_paths = [os.path.join(paths["xml_dir"], os.path.splitext(f)[0] + ".xml") for f in labeled]
+        items, samples = [], []
+        for img_file, (gender, reason) in zip(labeled, map_labels(extract_gender, xml_paths, workers,
+                                                                  desc=f"{split_name} XML")):
             if gender not in {"Male", "Female"}:
                 skipped_files.append((img_file, reason))
                 continue
+            src = os.path.join(paths["img_dir"], img_file)
+            items.append((f"{split_name}/{img_file}", src, os.path.join(split_name, gender, img_file)))
+            samples.append((src, gender, img_file))
 
-            dst_path = os.path.join(config.AIHUB_OUTPUT_DIR, split_name, gender, img_file)
-            shutil.copy2(img_path, dst_path)
+        if shards:
+            log_pack(logger, pack_images(samples, config.AIHUB_SHARD_DIR, split_name, threads,
+                                         desc=f"{split_name} shards"))
+            continue
+        result = transfer_files(items, config.AIHUB_OUTPUT_DIR, manifest, link_mode, threads,
+                                desc=f"{split_name} {link_mode}")
+        result["skipped"] += len(img_files) - len(todo)
+        log_transfer(logger, result)
+    if manifest is not None:
+        manifest.close()
 
     # 결과 요약
     logger.info("\n✅ 전처리 완료! YOLO 성별 분류 학습 데이터셋 구성 완료.")
@@ -1,8 +1,9 @@
 import os
-import shutil
 import random
-from tqdm import tqdm
+from bisect import bisect_left
 import config
+from preprocess.transfer import Manifest, map_labels, transfer_files, log_transfer, manifest_path
+from preprocess.shards import pack_images, log_pack
 from utils.custom_logger import custom_logger
 import re
 
@@ -16,20 +17,207 @@ def get_gender_label(label_list):
         return "Female"
     return None
 
-def process_peta_dataset(debug=True):
+def match_label_scan(archive_images, raw_key):
+    """
+    라벨키 하나를 폴더의 전체 이미지 목록을 훑어 매칭합니다. (FilenameIndex 의 기준 구현)
+
+    Returns:
+        tuple: (매칭된 파일명 목록 (원래 목록 순서), 'filename' | 'index' | 'regex' | None)
+    """
+    # 1. CUHK 스타일 (0001.png 또는 0001) - 파일명 직접 매칭
+    if '.' in raw_key:  # 확장자가 있는 경우
+        base_key = raw_key.split('.')[0]  # e.g. 0001
+        matched = [img for img in archive_images if img.startswith(base_key)]
+        if matched:
+            return matched, 'filename'
+
+    # 2. 일반 스타일 (숫자, e.g. 3) - 인덱스 매칭
+    if raw_key.isdigit():
+        pattern = f"^{raw_key}_"  # e.g. "3_"
+        matched = [
+            img for img in archive_images
+            if re.match(pattern, img)
+        ]
+        if matched:
+            return matched, 'index'
+
+    # 3. 더 유연한 정규식 매칭 시도
+    return _match_regex_scan(archive_images, raw_key)
+
+def _match_regex_scan(archive_images, raw_key, stems=None):
+    # 여러 가능한 패턴 시도
+    patterns = [
+        f"^{raw_key}[_-]",  # 시작하는 패턴 (e.g. "3-", "3_")
+        f"[_-]{raw_key}[_-]",  # 중간에 있는 패턴 (e.g. "_3_", "-3-")
+        f"[_-]{raw_key}$"   # 끝나는 패턴 (e.g. "_3", "-3")
+    ]
+    if stems is None:
+        stems = [os.path.splitext(img)[0] for img in archive_images]
+    
+    for pattern in patterns:
+        search = re.compile(pattern).search
+        potential_matches = [
+            img for img, stem in zip(archive_images, stems)
+            if search(stem)
+        ]
+        if potential_matches:
+            return potential_matches, 'regex'
+    return [], None
+
+_SEPARATOR = re.compile(r"[_-]")
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+class FilenameIndex:
+    """
+    폴더 하나의 이미지 파일명 인덱스 (폴더당 한 번 만들고 라벨마다 거의 상수 시간에 조회)
+
+    - 접두어: 정렬한 파일명에서 bisect 로 접두어 구간을 찾음 (filename / index 매칭)
+    - 토큰: 확장자를 뺀 파일명을 '_' / '-' 로 나눈 첫 / 중간 / 마지막 토큰 → 파일 위치 (regex 매칭의 세 패턴)
+
+    결과와 매칭 방식은 match_label_scan 과 같습니다 (파일명은 항상 원래 목록 순서).
+    정규식 특수문자나 구분자가 들어간 라벨키 (누락 이미지의 '0001.png' 등) 는 토큰으로 나타낼 수 없으므로
+    미리 나눈 확장자 없는 파일명에 정규식을 한 번 컴파일하여 탐색합니다.
+    """
+
+    def __init__(self, archive_images):
+        self.images = list(archive_images)
+        self._order = sorted(range(len(self.images)), key=self.images.__getitem__)
+        self._sorted = [self.images[k] for k in self._order]
+        self.stems = [os.path.splitext(img)[0] for img in self.images]
+        self.first, self.inner, self.last = {}, {}, {}
+        for k, stem in enumerate(self.stems):
+            tokens = _SEPARATOR.split(stem)
+            if len(tokens) < 2:
+                continue
+            self.first.setdefault(tokens[0], []).append(k)
+            for token in dict.fromkeys(tokens[1:-1]):
+                self.inner.setdefault(token, []).append(k)
+            self.last.setdefault(tokens[-1], []).append(k)
+
+    def prefix(self, prefix):
+        """prefix 로 시작하는 파일명 (원래 목록 순서)"""
+        hits = []
+        for i in range(bisect_left(self._sorted, prefix), len(self._sorted)):
+            if not self._sorted[i].startswith(prefix):
+                break
+            hits.append(self._order[i])
+        return [self.images[k] for k in sorted(hits)]
+
+    def match(self, raw_key):
+        """match_label_scan 과 같은 (매칭 목록, 방식) 을 반환합니다."""
+        if '.' in raw_key:
+            matched = self.prefix(raw_key.split('.')[0])
+            if matched:
+                return matched, 'filename'
+        if raw_key.isdigit():
+            matched = self.prefix(raw_key + "_")
+            if matched:
+                return matched, 'index'
+        if _REGEX_SPECIAL.intersection(raw_key) or _SEPARATOR.search(raw_key):
+            return _match_regex_scan(self.images, raw_key, self.stems)
+        for table in (self.first, self.inner, self.last):
+            hits = table.get(raw_key)
+            if hits:
+                return [self.images[k] for k in hits], 'regex'
+        return [], None
+
+def collect_folder(folder_path, indexed: bool = True):
+    """
+    PETA 하위 폴더 하나의 라벨을 이미지 파일과 매칭합니다. (프로세스 풀에서 폴더 단위로 실행)
+
+    Args:
+        indexed (bool): False 이면 라벨마다 전체 목록을 훑는 기준 구현 (match_label_scan) 으로 매칭
+
+    Returns:
+        dict: {"folder_name", "status": "ok" | "no_archive" | "no_label", "folder_stats",
+               "matches_by_mode", "labeled": [이미지 항목], "missing": [(폴더, 라벨키, 성별)]}
+    """
+    folder_name = os.path.basename(folder_path)
+    archive_path = os.path.join(folder_path, "archive")
+    label_path = os.path.join(archive_path, config.LABEL_FILENAME)
+
+    # 폴더별 통계 초기화
+    folder_stats = {
+        'label_count': 0,
+        'image_count': 0, 
+        'matched_count': 0,
+        'missing_count': 0
+    }
+    result = {"folder_name": folder_name, "status": "ok", "folder_stats": folder_stats,
+              "matches_by_mode": {'filename': 0, 'index': 0, 'regex': 0}, "labeled": [], "missing": []}
+
+    if not os.path.isdir(archive_path):
+        result["status"] = "no_archive"
+        return result
+    if not os.path.isfile(label_path):
+        result["status"] = "no_label"
+        return result
+
+    # 이미지 파일 목록 (확장자 대소문자 구분 없이)
+    archive_files = os.listdir(archive_path)
+    archive_images = [f for f in archive_files if os.path.splitext(f)[1].lower() in ['.jpg', '.jpeg', '.png', '.bmp']]
+    folder_stats['image_count'] = len(archive_images)
+    index = FilenameIndex(archive_images) if indexed else None
+
+    # 라벨 파일 처리
+    with open(label_path, "r") as f:
+        label_lines = f.readlines()
+        folder_stats['label_count'] = len(label_lines)
+
+    for line in label_lines:
+        parts = line.strip().split()
+        if len(parts) < 2:
+            continue
+
+        raw_key = parts[0]
+        label_list = parts[1:]
+
+        gender = get_gender_label(label_list)
+        if gender is None:
+            continue
+        
+        # 여러 매칭 방식 시도 (파일명 → 인덱스 → 정규식)
+        matched, match_mode = index.match(raw_key) if indexed else match_label_scan(archive_images, raw_key)
+        if not matched:
+            result["missing"].append((folder_name, raw_key, gender))
+            folder_stats['missing_count'] += 1
+            continue
+        
+        result['matches_by_mode'][match_mode] += len(matched)
+        folder_stats['matched_count'] += len(matched)
+        
+        for img_name in matched:
+            result["labeled"].append({
+                "src_path": os.path.join(archive_path, img_name),
+                "gender": gender,
+                "img_name": f"{folder_name}_{img_name}",  # 중복 방지용
+                "match_mode": match_mode
+            })
+    return result
+
+def process_peta_dataset(debug=True, workers: int = 1, link_mode: str = "copy", resume: bool = True,
+                         output_format: str = "folder"):
     """
     PETA 데이터셋을 처리하여 성별 분류 학습용 데이터셋을 생성합니다.
     
     Args:
         debug (bool): 상세 디버깅 정보 출력 여부
+        workers (int): 1 보다 크면 폴더별 라벨 매칭은 프로세스 풀, 복사는 workers × PREPRO_THREADS_PER_WORKER 스레드로 실행
+        link_mode (str): "copy" | "hardlink" | "symlink" | "reflink" (같은 파일시스템이면 바이트 복사 없이 배치)
+        resume (bool): False 이면 manifest 를 무시하고 처음부터 다시 복사
+        output_format (str): "folder" (ultralytics 폴더 구조) | "shards" (PETA_SHARD_DIR 에 224 shard 기록, manifest 미사용)
         
     Returns:
         dict: 처리 결과 통계
     """
+    if output_format not in ("folder", "shards"):
+        raise ValueError(f"Unknown output format: {output_format}")
+
     # ================== 출력 디렉토리 준비 ==================
-    for split in ['train', 'val', 'test']:
-        for gender in ['Male', 'Female']:
-            os.makedirs(os.path.join(config.PETA_OUTPUT_DIR, split, gender), exist_ok=True)
+    if output_format == "folder":
+        for split in ['train', 'val', 'test']:
+            for gender in ['Male', 'Female']:
+                os.makedirs(os.path.join(config.PETA_OUTPUT_DIR, split, gender), exist_ok=True)
 
     # ================== 라벨링된 이미지 수집 ==================
     all_labeled_images = []
@@ -48,128 +236,36 @@ def process_peta_dataset(debug=True):
     # 데이터셋 루트에 있는 모든 폴더 목록
     all_folders = os.listdir(config.PETA_DATASET_ROOT)
     logger.info(f"PETA 데이터셋 루트에서 {len(all_folders)}개 폴더 발견")
-    
-    for folder_name in all_folders:
-        folder_path = os.path.join(config.PETA_DATASET_ROOT, folder_name)
-        if not os.path.isdir(folder_path):
-            continue
-            
-        archive_path = os.path.join(folder_path, "archive")
-        label_path = os.path.join(archive_path, config.LABEL_FILENAME)
-
-        # 폴더별 통계 초기화
-        folder_stats = {
-            'label_count': 0,
-            'image_count': 0, 
-            'matched_count': 0,
-            'missing_count': 0
-        }
-
-        if not os.path.isdir(archive_path):
+    folder_paths = [os.path.join(config.PETA_DATASET_ROOT, name) for name in all_folders]
+    folder_paths = [path for path in folder_paths if os.path.isdir(path)]
+
+    for result in map_labels(collect_folder, folder_paths, workers, chunksize=1, desc="PETA 라벨 매칭"):
+        folder_name = result["folder_name"]
+        folder_stats = result["folder_stats"]
+        if result["status"] == "no_archive":
             logger.warning(f"폴더 '{folder_name}'에 archive 디렉토리가 없음")
             dataset_stats['folders_skipped'] += 1
             continue
-            
-        if not os.path.isfile(label_path):
+        if result["status"] == "no_label":
             logger.warning(f"폴더 '{folder_name}'에 라벨 파일({config.LABEL_FILENAME})이 없음")
             dataset_stats['folders_skipped'] += 1
             continue
 
         dataset_stats['folders_processed'] += 1
-        
-        # 이미지 파일 목록 (확장자 대소문자 구분 없이)
-        archive_files = os.listdir(archive_path)
-        archive_images = [f for f in archive_files if os.path.splitext(f)[1].lower() in ['.jpg', '.jpeg', '.png', '.bmp']]
-        folder_stats['image_count'] = len(archive_images)
-        
-        if debug:
-            logger.debug(f"폴더 '{folder_name}': {len(archive_images)}개 이미지 파일 발견")
-        
-        dataset_stats['total_images'] += len(archive_images)
-
-        # 라벨 파일 처리
-        with open(label_path, "r") as f:
-            label_lines = f.readlines()
-            folder_stats['label_count'] = len(label_lines)
-            dataset_stats['total_labels'] += len(label_lines)
-            
-            if debug:
-                logger.debug(f"폴더 '{folder_name}': {len(label_lines)}개 라벨 발견")
-        
-        for line in label_lines:
-            parts = line.strip().split()
-            if len(parts) < 2:
-                continue
-
-            raw_key = parts[0]
-            label_list = parts[1:]
+        dataset_stats['total_images'] += folder_stats['image_count']
+        dataset_stats['total_labels'] += folder_stats['label_count']
+        dataset_stats['matched_images'] += folder_stats['matched_count']
+        dataset_stats['missing_images'] += folder_stats['missing_count']
+        for mode, count in result["matches_by_mode"].items():
+            dataset_stats['matches_by_mode'][mode] += count
+        all_labeled_images.extend(result["labeled"])
+        missing_images.extend(result["missing"])
 
-            gender = get_gender_label(label_list)
-            if gender is None:
-                continue
-            
-            # 여러 매칭 방식 시도
-            matched = []
-            match_mode = None
-            
-            # 1. CUHK 스타일 (0001.png 또는 0001) - 파일명 직접 매칭
-            if '.' in raw_key:  # 확장자가 있는 경우
-                base_key = raw_key.split('.')[0]  # e.g. 0001
-                matched = [img for img in archive_images if img.startswith(base_key)]
-                if matched:
-                    match_mode = 'filename'
-                    dataset_stats['matches_by_mode']['filename'] += len(matched)
-            
-            # 2. 일반 스타일 (숫자, e.g. 3) - 인덱스 매칭
-            if not matched and raw_key.isdigit():
-                pattern = f"^{raw_key}_"  # e.g. "3_"
-                matched = [
-                    img for img in archive_images
-                    if re.match(pattern, img)
-                ]
-                if matched:
-                    match_mode = 'index'
-                    dataset_stats['matches_by_mode']['index'] += len(matched)
-            
-            # 3. 더 유연한 정규식 매칭 시도
-            if not matched:
-                # 여러 가능한 패턴 시도
-                patterns = [
-                    f"^{raw_key}[_-]",  # 시작하는 패턴 (e.g. "3-", "3_")
-                    f"[_-]{raw_key}[_-]",  # 중간에 있는 패턴 (e.g. "_3_", "-3-")
-                    f"[_-]{raw_key}$"   # 끝나는 패턴 (e.g. "_3", "-3")
-                ]
-                
-                for pattern in patterns:
-                    potential_matches = [
-                        img for img in archive_images
-                        if re.search(pattern, os.path.splitext(img)[0])
-                    ]
-                    if potential_matches:
-                        matched.extend(potential_matches)
-                        match_mode = 'regex'
-                        dataset_stats['matches_by_mode']['regex'] += len(potential_matches)
-                        break
-
-            if not matched:
-                missing_images.append((folder_name, raw_key, gender))
-                folder_stats['missing_count'] += 1
-                dataset_stats['missing_images'] += 1
-                
-                if debug and folder_stats['missing_count'] <= 5:  # 폴더당 최대 5개까지만 출력
-                    logger.debug(f"매칭 실패: 폴더={folder_name}, 라벨키={raw_key}, 성별={gender}")
-                continue
-            
-            folder_stats['matched_count'] += len(matched)
-            dataset_stats['matched_images'] += len(matched)
-            
-            for img_name in matched:
-                all_labeled_images.append({
-                    "src_path": os.path.join(archive_path, img_name),
-                    "gender": gender,
-                    "img_name": f"{folder_name}_{img_name}",  # 중복 방지용
-                    "match_mode": match_mode
-                })
+        if debug:
+            logger.debug(f"폴더 '{folder_name}': {folder_stats['image_count']}개 이미지 파일 발견")
+            logger.debug(f"폴더 '{folder_name}': {folder_stats['label_count']}개 라벨 발견")
+            for _, raw_key, gender in result["missing"][:5]:  # 폴더당 최대 5개까지만 출력
+                logger.debug(f"매칭 실패: 폴더={folder_name}, 라벨키={raw_key}, 성별={gender}")
 
         # 폴더별 통계 저장
         dataset_stats['folder_stats'][folder_name] = folder_stats
@@ -237,11 +333,23 @@ def process_peta_dataset(debug=True):
     logger.info(f"  합계        : {n_train + n_val + n_test}")
 
     # ================== 이미지 복사 ==================
-    for split_name, images in dataset_splits.items():
-        logger.info(f"\n📦 {split_name} 세트: {len(images)}장 복사 중...")
-        for item in tqdm(images):
-            dst_path = os.path.join(config.PETA_OUTPUT_DIR, split_name, item["gender"], item["img_name"])
-            shutil.copy2(item["src_path"], dst_path)
+    threads = workers * config.PREPRO_THREADS_PER_WORKER if workers > 1 else 1
+    if output_format == "shards":
+        for split_name, images in dataset_splits.items():
+            logger.info(f"\n📦 {split_name} 세트: {len(images)}장 shard 기록 중...")
+            samples = [(item["src_path"], item["gender"], item["img_name"]) for item in images]
+            log_pack(logger, pack_images(samples, config.PETA_SHARD_DIR, split_name, threads,
+                                         desc=f"{split_name} shards"))
+    else:
+        with Manifest(manifest_path(config.PETA_OUTPUT_DIR), resume=resume) as manifest:
+            for split_name, images in dataset_splits.items():
+                logger.info(f"\n📦 {split_name} 세트: {len(images)}장 복사 중...")
+                items = []
+                for item in images:
+                    rel = os.path.join(split_name, item["gender"], item["img_name"])
+                    items.append((rel, item["src_path"], rel))
+                log_transfer(logger, transfer_files(items, config.PETA_OUTPUT_DIR, manifest, link_mode, threads,
+                                                    desc=f"{split_name} {link_mode}"))
 
     # ================== 누락 보고 ==================
     logger.warning(f"\n⚠️ 누락된 라벨(이미지 없음): {len(missing_images)}")
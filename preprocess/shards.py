@@ -0,0 +1,263 @@
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import torch
+from torch.utils.data import IterableDataset, get_worker_info
+from tqdm import tqdm
+import config
+from utils.prepro import LetterBox
+
+CLASSES = ("Female", "Male")  # ultralytics 폴더 데이터셋과 같은 클래스 순서 (알파벳 순, 여자: 0, 남자: 1)
+FORMAT_VERSION = 1
+
+
+def _save_atomic(path, write):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+class ShardWriter:
+    """
+    성별 분류 학습 이미지를 고정 크기 uint8 배열 shard 로 묶어 기록합니다.
+
+    <root>/<split>/ 아래에 shard 마다 `<00000>.images.npy` ((N, imgsz, imgsz, 3) uint8 RGB,
+    GenderClassifier 와 같은 letterbox 114 패딩), `<00000>.labels.npy` ((N,) uint8 클래스),
+    `<00000>.names.txt` (원본 이름) 를 쓰고, `meta.json` 에 shard 목록을 기록합니다.
+    images.npy 는 np.load(mmap_mode="r") 로 memory-map 하거나 한 번의 순차 읽기로 불러올 수 있습니다.
+    """
+
+    def __init__(self, root: str, split: str, imgsz: int = config.CLS_IMGSZ,
+                 shard_size: int = config.PACK_SHARD_SIZE):
+        self.path = os.path.join(root, split)
+        os.makedirs(self.path, exist_ok=True)
+        self.imgsz = imgsz
+        self.shard_size = shard_size
+        self.letterbox = LetterBox((imgsz, imgsz), auto=False, scaleup=True)
+        self._images = np.empty((shard_size, imgsz, imgsz, 3), dtype=np.uint8)
+        self._labels = np.empty(shard_size, dtype=np.uint8)
+        self._names = []
+        self.shards = []
+        self.count = 0
+
+    def add(self, image, label: str, name: str):
+        """BGR 이미지 하나를 letterbox 하여 현재 shard 에 추가합니다."""
+        k = len(self._names)
+        self._images[k] = self.letterbox(image=image)[..., ::-1]
+        self._labels[k] = CLASSES.index(label)
+        self._names.append(name)
+        if len(self._names) == self.shard_size:
+            self.flush()
+
+    def flush(self):
+        n = len(self._names)
+        if n == 0:
+            return
+        name = f"{len(self.shards):05d}"
+        images, labels = self._images[:n], self._labels[:n]
+        _save_atomic(os.path.join(self.path, f"{name}.images.npy"), lambda f: np.save(f, images))
+        _save_atomic(os.path.join(self.path, f"{name}.labels.npy"), lambda f: np.save(f, labels))
+        with open(os.path.join(self.path, f"{name}.names.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self._names) + "\n")
+        self.shards.append({"name": name, "count": n})
+        self.count += n
+        self._names = []
+
+    def close(self):
+        self.flush()
+        meta = {"version": FORMAT_VERSION, "imgsz": self.imgsz, "classes": list(CLASSES),
+                "layout": "NHWC RGB uint8 letterbox", "count": self.count, "shards": self.shards}
+        _save_atomic(os.path.join(self.path, "meta.json"),
+                     lambda f: f.write(json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8")))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # 예외로 중단되면 meta.json 을 쓰지 않아 불완전한 split 을 PackedShards 가 읽지 않도록 함
+        if exc[0] is None:
+            self.close()
+
+
+def _read_image(path):
+    """
+    한글 경로 (AI Hub NAS) 에서도 동작하도록 imread 대신 바이트로 읽어 디코드
+
+    Returns:
+        tuple: (BGR 이미지 또는 None, 실패 사유 또는 None)
+    """
+    try:
+        data = np.fromfile(path, dtype=np.uint8)
+    except OSError as e:  # 깨진 심볼릭 링크, NAS 일시 오류 등
+        return None, str(e)
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    return image, None if image is not None else "이미지 디코드 실패"
+
+
+def pack_images(samples, root: str, split: str, threads: int = 1, imgsz: int = config.CLS_IMGSZ,
+                shard_size: int = config.PACK_SHARD_SIZE, desc: str = None):
+    """
+    (원본 경로, 클래스 이름, 저장 이름) 목록을 <root>/<split> shard 로 기록합니다. 기존 split 은 새로 씁니다.
+    threads > 1 이면 이미지 읽기 / 디코드를 스레드 풀에서 실행하며, 기록 순서는 입력 순서와 같습니다.
+    읽기 / 디코드에 실패한 이미지는 건너뛰고 failed 에 기록합니다.
+    임시 디렉토리 (<root>/.<split>.tmp) 에 기록한 뒤 끝까지 성공해야 기존 split 과 교체하므로,
+    도중에 예외가 나도 기존 shard 는 그대로 남습니다.
+
+    Returns:
+        dict: {"images": 기록한 수, "shards": shard 수, "failed": [(원본 경로, 오류)]}
+    """
+    split_dir = os.path.join(root, split)
+    tmp_split = f".{split}.tmp"
+    tmp_dir = os.path.join(root, tmp_split)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    failed = []
+    try:
+        with ShardWriter(root, tmp_split, imgsz, shard_size) as writer, \
+                ThreadPoolExecutor(max_workers=max(threads, 1)) as pool:
+            # 메모리를 묶어 두지 않도록 shard 크기 단위로 읽어 기록
+            for start in tqdm(range(0, len(samples), shard_size), desc=desc):
+                chunk = samples[start:start + shard_size]
+                for (src, label, name), (image, error) in zip(chunk, pool.map(_read_image, [s[0] for s in chunk])):
+                    if image is None:
+                        failed.append((src, error))
+                        continue
+                    writer.add(image, label, name)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    old_dir = os.path.join(root, f".{split}.old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.isdir(split_dir):
+        os.replace(split_dir, old_dir)
+    os.replace(tmp_dir, split_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return {"images": writer.count, "shards": len(writer.shards), "failed": failed}
+
+
+def convert_folder_dataset(src_root: str, dst_root: str, threads: int = 1,
+                           imgsz: int = config.CLS_IMGSZ, shard_size: int = config.PACK_SHARD_SIZE):
+    """
+    기존 폴더 구조 ({split}/{Male,Female}/*) 의 전처리 결과를 shard 로 변환합니다.
+
+    Returns:
+        dict: split 별 pack_images 결과
+    """
+    results = {}
+    for split in sorted(os.listdir(src_root)):
+        split_dir = os.path.join(src_root, split)
+        if not os.path.isdir(split_dir):
+            continue
+        samples = []
+        for label in CLASSES:
+            folder = os.path.join(split_dir, label)
+            if not os.path.isdir(folder):
+                continue
+            samples += [(os.path.join(folder, f), label, f) for f in sorted(os.listdir(folder))
+                        if os.path.splitext(f)[1].lower() in config.VALID_EXT]
+        if samples:
+            results[split] = pack_images(samples, dst_root, split, threads, imgsz, shard_size, desc=split)
+    return results
+
+
+class PackedShards:
+    """
+    ShardWriter 로 만든 split 디렉토리 읽기
+
+    iter_batches 는 shard 하나를 한 번의 순차 읽기로 메모리에 올린 뒤 (파일별 open / stat 없음)
+    그 안에서 섞어 배치를 만듭니다. shard 순서도 epoch 마다 섞을 수 있습니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.classes = self.meta["classes"]
+        self.imgsz = self.meta["imgsz"]
+        self.shards = self.meta["shards"]
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def load_shard(self, k: int, mmap: bool = False):
+        """
+        Returns:
+            tuple: (images (N, H, W, 3) uint8 RGB, labels (N,) uint8)
+        """
+        name = self.shards[k]["name"]
+        images = np.load(os.path.join(self.path, f"{name}.images.npy"), mmap_mode="r" if mmap else None)
+        labels = np.load(os.path.join(self.path, f"{name}.labels.npy"))
+        return images, labels
+
+    def labels(self):
+        return np.concatenate([self.load_shard(k, mmap=True)[1] for k in range(len(self.shards))]) \
+            if self.shards else np.empty(0, np.uint8)
+
+    def iter_batches(self, batch_size: int = 256, shuffle: bool = False, seed=0, shard_ids=None):
+        """
+        Args:
+            shard_ids (list[int]): 읽을 shard 와 순서 (None 이면 전체, shuffle 이면 섞은 순서)
+
+        Yields:
+            tuple: (images (B, H, W, 3) uint8 RGB, labels (B,) int64)
+        """
+        rng = np.random.default_rng(seed)
+        order = list(range(len(self.shards))) if shard_ids is None else list(shard_ids)
+        if shuffle and shard_ids is None:
+            rng.shuffle(order)
+        for k in order:
+            images, labels = self.load_shard(k)
+            index = rng.permutation(len(labels)) if shuffle else np.arange(len(labels))
+            for start in range(0, len(index), batch_size):
+                batch = index[start:start + batch_size]
+                yield images[batch], labels[batch].astype(np.int64)
+
+
+class ShardDataset(IterableDataset):
+    """
+    torch DataLoader 용 shard 데이터셋. DataLoader 워커마다 shard 를 나눠 순차로 읽고,
+    (B, 3, H, W) float32 [0, 1] 이미지와 (B,) int64 라벨 배치를 내보냅니다 (DataLoader(batch_size=None) 으로 사용).
+    epoch 마다 set_epoch 로 shard / 샘플 순서를 바꿉니다.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, shuffle: bool = True, seed: int = 0):
+        self.shards = PackedShards(path)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def __len__(self):
+        return sum(-(-s["count"] // self.batch_size) for s in self.shards.shards)
+
+    def __iter__(self):
+        info = get_worker_info()
+        ids = list(range(len(self.shards.shards)))
+        if self.shuffle:
+            np.random.default_rng((self.seed, self.epoch)).shuffle(ids)
+        worker = 0
+        if info is not None:
+            worker = info.id
+            ids = ids[info.id::info.num_workers]
+        batches = self.shards.iter_batches(self.batch_size, shuffle=self.shuffle,
+                                           seed=(self.seed, self.epoch, worker), shard_ids=ids)
+        for images, labels in batches:
+            x = torch.from_numpy(np.ascontiguousarray(images.transpose(0, 3, 1, 2))).float().div_(255)
+            yield x, torch.from_numpy(labels)
+
+
+def log_pack(logger, result):
+    """pack_images 결과 요약 로그"""
+    logger.info(f"  shard 기록: 이미지 {result['images']}개, shard {result['shards']}개")
+    if result["failed"]:
+        logger.warning(f"  ⚠️ 읽기 실패 {len(result['failed'])}개")
+        for src, error in result["failed"][:10]:
+            logger.warning(f"   - {src}: {error}")
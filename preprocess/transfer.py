@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+import config
+
+LINK_MODES = ("copy", "hardlink", "symlink", "reflink")
+FICLONE = 0x40049409  # linux/fs.h: ioctl(dst_fd, FICLONE, src_fd)
+
+
+class Manifest:
+    """
+    전처리 완료 항목을 한 줄씩 기록하는 JSONL 파일
+
+    항목마다 {"key": 원본 식별자, "dst": 출력 루트 기준 상대 경로} 를 기록하며, 재실행 시
+    기록된 항목 중 출력 파일이 남아 있는 것은 다시 처리하지 않습니다 (중단 후 이어서 처리).
+    여러 복사 스레드에서 동시에 record 해도 됩니다.
+    """
+
+    def __init__(self, path: str, resume: bool = True):
+        self.path = path
+        self.entries = {}
+        tail = ""
+        if resume and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    tail = line
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 중단으로 잘린 마지막 줄
+                    self.entries[entry["key"]] = entry
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if tail and not tail.endswith("\n"):
+            self._file.write("\n")
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def done(self, key: str, root: str):
+        entry = self.entries.get(key)
+        return entry is not None and os.path.lexists(os.path.join(root, entry["dst"]))
+
+    def record(self, key: str, dst: str):
+        entry = {"key": key, "dst": dst}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.entries[key] = entry
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _reflink(src: str, dst: str):
+    import fcntl  # POSIX 전용
+
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    shutil.copystat(src, dst)
+
+
+def place_file(src: str, dst: str, mode: str = "copy"):
+    """
+    src 를 dst 에 mode 방식으로 둡니다.
+
+    hardlink / reflink 가 불가능하면 (다른 파일시스템, 미지원 파일시스템) copy2 로 대체합니다.
+    기존 dst 는 먼저 지웁니다 (이전 실행의 symlink 를 통해 원본을 덮어쓰지 않도록).
+
+    Returns:
+        str: 실제로 사용한 방식
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if mode == "symlink":
+        os.symlink(os.path.abspath(src), dst)
+        return "symlink"
+    if mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    elif mode == "reflink":
+        try:
+            _reflink(src, dst)
+            return "reflink"
+        except (OSError, ImportError):
+            if os.path.lexists(dst):
+                os.remove(dst)
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def map_labels(fn, args, workers: int = 1, chunksize: int = 64, desc: str = None):
+    """
+    라벨 파싱 함수 fn 을 args 에 적용합니다. workers > 1 이면 프로세스 풀에서 실행 (fn 은 모듈 수준 함수).
+
+    Returns:
+        list: args 순서와 같은 결과 목록
+    """
+    if workers <= 1:
+        return [fn(a) for a in tqdm(args, desc=desc)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(tqdm(pool.map(fn, args, chunksize=chunksize), total=len(args), desc=desc))
+
+
+def transfer_files(items, root: str, manifest: Manifest = None, mode: str = "copy",
+                   threads: int = 1, desc: str = None):
+    """
+    (key, 원본 경로, 출력 루트 기준 상대 경로) 목록을 복사 / 링크합니다. threads > 1 이면 스레드 풀에서 실행.
+
+    manifest 가 있으면 이미 완료된 항목은 건너뛰고, 완료한 항목을 기록합니다.
+
+    Returns:
+        dict: {"skipped": 건너뛴 수, "failed": [(원본 경로, 오류)], <사용한 방식>: 건수, ...}
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {mode} (choose from {LINK_MODES})")
+    todo = [item for item in items if manifest is None or not manifest.done(item[0], root)]
+    result = {"skipped": len(items) - len(todo), "failed": []}
+
+    def run(item):
+        key, src, rel = item
+        used = place_file(src, os.path.join(root, rel), mode)
+        if manifest is not None:
+            manifest.record(key, rel)
+        return used
+
+    def finish(item, future_or_fn):
+        try:
+            used = future_or_fn()
+        except OSError as e:
+            result["failed"].append((item[1], str(e)))
+            return
+        result[used] = result.get(used, 0) + 1
+
+    if threads <= 1:
+        for item in tqdm(todo, desc=desc):
+            finish(item, lambda: run(item))
+        return result
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {pool.submit(run, item): item for item in todo}
+        for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+            finish(futures[future], future.result)
+    return result
+
+
+def log_transfer(logger, result):
+    """transfer_files 결과 요약 로그"""
+    used = ", ".join(f"{mode}={result[mode]}" for mode in LINK_MODES if result.get(mode))
+    logger.info(f"  완료: {used or '-'}, 이전 실행에서 완료되어 건너뜀: {result['skipped']}")
+    if result["failed"]:
+        logger.warning(f"  ⚠️ 복사 실패 {len(result['failed'])}개")
+        for src, error in result["failed"][:10]:
+            logger.warning(f"   - {src}: {error}")
+
+
+def manifest_path(output_dir: str):
+    return os.path.join(output_dir, config.PREPRO_MANIFEST_NAME)
@@ -0,0 +1,184 @@
+import argparse
+import os
+import random
+import time
+import cv2
+import numpy as np
+import onnx
+from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+from export import export_model
+from models.threat import GenderClassifier
+from utils.prepro import LetterBox, quantized_model_path
+from utils.custom_logger import custom_logger
+import config
+
+logger = custom_logger(__name__)
+
+GENDERS = ["Female", "Male"]
+
+
+def collect_images(roots, split):
+    """
+    전처리 결과 폴더 (root/split/{Male,Female}/*) 에서 (이미지 경로, 성별) 목록을 수집합니다.
+    """
+    samples = []
+    for root in roots:
+        for gender in GENDERS:
+            folder = os.path.join(root, split, gender)
+            if not os.path.isdir(folder):
+                continue
+            samples += [(os.path.join(folder, f), gender) for f in sorted(os.listdir(folder))
+                        if os.path.splitext(f)[1].lower() in config.VALID_EXT]
+    return samples
+
+
+def read_crop(path):
+    """크롭 이미지를 읽습니다. 읽을 수 없으면 경고를 남기고 None 을 반환합니다 (한글 경로 대응)."""
+    image = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR) if os.path.exists(path) else None
+    if image is None:
+        logger.warning(f"⚠️ 이미지를 읽을 수 없어 건너뜀: {path}")
+    return image
+
+
+class CropCalibrationReader(CalibrationDataReader):
+    """GenderClassifier 와 같은 letterbox 전처리로 calibration 배치를 공급합니다."""
+
+    def __init__(self, paths, input_name, imgsz=config.CLS_IMGSZ, batch=32):
+        self.paths = paths
+        self.input_name = input_name
+        self.batch = batch
+        self.letterbox = LetterBox((imgsz, imgsz), scaleup=True, auto=False, stride=32)
+        self._iter = iter(range(0, len(paths), batch))
+
+    def get_next(self):
+        for start in self._iter:
+            crops = [c for c in map(read_crop, self.paths[start:start + self.batch]) if c is not None]
+            if not crops:
+                continue
+            imgs = [self.letterbox(image=c)[..., ::-1].transpose(2, 0, 1) for c in crops]
+            return {self.input_name: np.ascontiguousarray(np.stack(imgs), dtype=np.float32) / 255}
+        return None
+
+
+def evaluate(classifier, samples):
+    """
+    top-1 정확도 (%) 와 이미지당 추론 시간 (ms) 을 반환합니다. 읽을 수 없는 이미지는 제외합니다.
+    """
+    name_to_idx = {v: k for k, v in classifier.model.names.items()}
+    preds, labels, elapsed = [], [], 0.0
+    for start in range(0, len(samples), classifier.max_batch):
+        batch = [(read_crop(p), g) for p, g in samples[start:start + classifier.max_batch]]
+        batch = [(c, g) for c, g in batch if c is not None]
+        if not batch:
+            continue
+        t = time.perf_counter()
+        preds.append(classifier.classify_crops([c for c, _ in batch])[0])
+        elapsed += time.perf_counter() - t
+        labels += [name_to_idx.get(g, GENDERS.index(g)) for _, g in batch]
+    preds = np.concatenate(preds) if preds else np.empty(0, dtype=np.int64)
+    acc = float((preds == np.array(labels)).mean() * 100) if labels else 0.0
+    return acc, elapsed / max(len(labels), 1) * 1e3
+
+
+def quantize_classifier(model_path=config.CLS_MODEL_PATH,
+                        data_roots=(config.AIHUB_OUTPUT_DIR, config.PETA_OUTPUT_DIR),
+                        calib_samples=config.QUANT_CALIB_SAMPLES,
+                        max_acc_drop=config.QUANT_MAX_ACC_DROP,
+                        max_val=None, seed=42):
+    """
+    성별 분류기를 static INT8 로 양자화하고 val 정확도 하락을 검사합니다.
+
+    1. .pt → FP32 ONNX export (없거나 .pt 보다 오래된 경우)
+    2. train split 크롭에서 calib_samples 장을 뽑아 calibration (QDQ, per-channel)
+    3. val split 에서 FP32(torch) / INT8 top-1 정확도 비교. 처리 시간은 양자화 효과만 보도록
+       같은 ONNX Runtime 설정의 FP32 ONNX 와 INT8 을 비교
+    4. 하락폭이 max_acc_drop (%p) 이하일 때만 <가중치>_int8.onnx 를 저장
+
+    Returns:
+        dict: 정확도 / 처리 시간 리포트
+
+    Raises:
+        RuntimeError: 정확도 하락이 허용치를 초과한 경우 (산출물은 저장하지 않음)
+    """
+    calib = collect_images(data_roots, "train")
+    val = collect_images(data_roots, "val")
+    if not calib or not val:
+        raise FileNotFoundError(f"calibration/val 이미지가 없습니다: {list(data_roots)} (preprocess.py 선행)")
+
+    rng = random.Random(seed)
+    calib_paths = [p for p, _ in rng.sample(calib, min(calib_samples, len(calib)))]
+    if max_val:
+        val = rng.sample(val, min(max_val, len(val)))
+    logger.info(f"calibration {len(calib_paths)}장, val {len(val)}장")
+
+    fp32_onnx = os.path.splitext(model_path)[0] + ".onnx"
+    if not os.path.exists(fp32_onnx) or os.path.getmtime(fp32_onnx) < os.path.getmtime(model_path):
+        # 가중치가 바뀐 뒤 남아 있는 예전 ONNX 는 다시 export
+        fp32_onnx = export_model(model_path, config.CLS_IMGSZ, ["onnx"])["onnx"]
+
+    int8_path = quantized_model_path(model_path)
+    tmp_path = os.path.splitext(int8_path)[0] + ".tmp.onnx"
+    fp32_model = onnx.load(fp32_onnx)
+    reader = CropCalibrationReader(calib_paths, fp32_model.graph.input[0].name)
+    logger.info("🔄 static INT8 quantization (QDQ, per-channel) 진행 중...")
+    quantize_static(fp32_onnx, tmp_path, reader, quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+    # AutoBackend 가 names / imgsz 등을 읽을 수 있도록 메타데이터를 복사
+    int8_model = onnx.load(tmp_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, tmp_path)
+
+    try:
+        fp32_acc, torch_ms = evaluate(GenderClassifier(model_path, device="cpu"), val)
+        onnx_acc, fp32_ms = evaluate(GenderClassifier(fp32_onnx, device="cpu"), val)
+        int8_acc, int8_ms = evaluate(GenderClassifier(tmp_path, device="cpu"), val)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    drop = fp32_acc - int8_acc
+    report = {"fp32_acc": fp32_acc, "fp32_onnx_acc": onnx_acc, "int8_acc": int8_acc, "acc_drop": drop,
+              "torch_ms": torch_ms, "fp32_ms": fp32_ms, "int8_ms": int8_ms, "val_images": len(val)}
+    logger.info(f"📊 val top-1: FP32 {fp32_acc:.2f}% (ONNX {onnx_acc:.2f}%) → INT8 {int8_acc:.2f}% (하락 {drop:.2f}%p)")
+    logger.info(f"📊 CPU 처리 시간 (ONNX Runtime): FP32 {fp32_ms:.2f} ms/img → INT8 {int8_ms:.2f} ms/img "
+                f"({fp32_ms / max(int8_ms, 1e-9):.2f}x), 참고: FP32 torch {torch_ms:.2f} ms/img")
+
+    if drop > max_acc_drop:
+        os.remove(tmp_path)
+        raise RuntimeError(f"❌ 정확도 하락 {drop:.2f}%p 가 허용치 {max_acc_drop}%p 를 초과하여 INT8 모델을 저장하지 않습니다")
+
+    os.replace(tmp_path, int8_path)
+    logger.info(f"✅ 저장 완료: {int8_path}")
+    return report
+
+
+def main():
+    """
+    성별 분류기 INT8 양자화 스크립트
+
+    사용법:
+        python quantize.py [--calib-samples 512] [--max-drop 1.0]
+
+    생성된 모델은 GenderClassifier(quantized=True) 또는 main.py --int8-cls 로 사용합니다.
+    """
+    parser = argparse.ArgumentParser(description='성별 분류기 static INT8 양자화 (정확도 게이트 포함)')
+    parser.add_argument('-m', '--model', type=str, default=config.CLS_MODEL_PATH)
+    parser.add_argument('--data', type=str, nargs='+', default=[config.AIHUB_OUTPUT_DIR, config.PETA_OUTPUT_DIR],
+                        help='전처리된 데이터셋 루트 (root/{train,val}/{Male,Female})')
+    parser.add_argument('--calib-samples', type=int, default=config.QUANT_CALIB_SAMPLES)
+    parser.add_argument('--max-drop', type=float, default=config.QUANT_MAX_ACC_DROP,
+                        help='허용하는 val top-1 정확도 하락 (%%p)')
+    parser.add_argument('--max-val', type=int, default=None, help='평가에 사용할 최대 val 이미지 수')
+    args = parser.parse_args()
+
+    try:
+        quantize_classifier(args.model, args.data, args.calib_samples, args.max_drop, args.max_val)
+    except RuntimeError as e:
+        logger.error(str(e))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import numpy as np
+from models.store import DetectionStore
+from utils.custom_logger import custom_logger
+
+logger = custom_logger(__name__)
+
+
+def main():
+    """
+    탐지 결과 저장소 (main.py --store) 질의 / 재렌더링 스크립트. 모델 추론 없이 동작합니다.
+
+    사용법:
+        python query.py output/threat_1.store                                   # 요약 + 경고 구간
+        python query.py output/threat_1.store --pairs --max-distance 300 --start 10 --end 60
+        python query.py output/threat_1.store --render output/rerender.mp4 --start 10 --end 60
+    """
+    parser = argparse.ArgumentParser(description='탐지 결과 저장소 질의 / 재렌더링')
+    parser.add_argument('store', type=str, help='저장소 디렉토리')
+    parser.add_argument('--start', type=float, default=None, help='구간 시작 (초)')
+    parser.add_argument('--end', type=float, default=None, help='구간 끝 (초, 미포함)')
+    parser.add_argument('--pairs', action='store_true', help='구간 내 거리 위반 쌍 출력')
+    parser.add_argument('--max-distance', type=float, default=None,
+                        help='이 거리 (px) 보다 가까운 쌍만 (기록 임계값보다 크면 저장된 중심점으로 재계산)')
+    parser.add_argument('--render', type=str, default=None, help='구간을 다시 그린 결과 영상 경로')
+    parser.add_argument('--video', type=str, default=None, help='재렌더링할 원본 영상 (기본: 기록 당시 입력 경로)')
+    args = parser.parse_args()
+
+    store = DetectionStore(args.store)
+    meta = store.meta
+    frames = store.frames(args.start, args.end)
+    logger.info(f"🗂️ {args.store}: 카메라 {meta['camera'] or '-'}, 원본 {meta['source']}, "
+                f"{meta['fps']:.2f} FPS, 거리 임계값 {meta['distance_threshold']}px")
+    logger.info(f"📊 구간 프레임 {len(frames)}, 탐지 {int(frames['det_count'].sum())}, "
+                f"경고 프레임 {int(frames['alert'].sum())}")
+    for start, end in store.alert_intervals(args.start, args.end):
+        logger.info(f"🚨 경고 {start:8.2f}s ~ {end:8.2f}s")
+
+    if args.pairs:
+        pairs = store.pairs(args.start, args.end, max_distance=args.max_distance)
+        for frame, count in zip(*np.unique(pairs["frame"], return_counts=True)):
+            rows = pairs[pairs["frame"] == frame]
+            logger.info(f"   프레임 {frame} ({frame / store.fps:.2f}s): {count}쌍, "
+                        f"최소 거리 {rows['distance'].min():.0f}px")
+
+    if args.render:
+        video = args.video or meta["source"]
+        store.render(video, args.render, args.start, args.end)
+        logger.info(f"🎬 재렌더링 완료 → {args.render}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import signal
+from models.threat import ThreatVideoDiscriminator
+from models.streams import CameraStream, MultiStreamServer, VideoFileSink
+from utils.custom_logger import custom_logger
+import config
+
+logger = custom_logger(__name__)
+
+
+def parse_source(spec: str, index: int):
+    """'이름=URI' 또는 'URI' 형식의 소스 지정을 (이름, URI) 로 나눕니다."""
+    name, sep, uri = spec.partition("=")
+    if sep and "://" not in name:
+        return name, uri
+    stem = os.path.splitext(os.path.basename(spec))[0]
+    return f"cam{index:02d}_{stem}" if stem else f"cam{index:02d}", spec
+
+
+def main():
+    """
+    멀티 카메라 위협 분석 서버
+
+    카메라마다 디코드 스레드를 두고, 하나의 탐지기 / 분류기로 스트림 간 배치 추론을 합니다.
+    로컬 영상 파일은 RTSP 카메라 대용으로 사용할 수 있습니다 (--loop 로 반복 재생).
+
+    사용법:
+        python serve.py -s lobby=rtsp://10.0.0.5/stream gate=rtsp://10.0.0.6/stream -o output/cameras
+        python serve.py -s assets/threat_1.mp4 assets/threat_1.mp4 --loop --realtime --duration 60
+    """
+    parser = argparse.ArgumentParser(description='멀티 카메라 위협 분석 서버 (공유 배치 추론)')
+    parser.add_argument('-s', '--source', type=str, nargs='+', required=True,
+                        help='카메라 소스 목록 (이름=URI 또는 URI, URI 는 RTSP/HTTP 주소 또는 영상 파일)')
+    parser.add_argument('-o', '--output', type=str, default='output/cameras',
+                        help='카메라별 결과 영상 저장 디렉토리 (<이름>.mp4)')
+    parser.add_argument('--det-model', type=str, default=config.DET_MODEL_PATH)
+    parser.add_argument('--cls-model', type=str, default=config.CLS_MODEL_PATH)
+    parser.add_argument('--no-cls', action='store_true', help='성별 분류 없이 사람 탐지 + 거리 위협 판단만 수행')
+    parser.add_argument('--backend', type=str, choices=['torch', 'onnxruntime', 'openvino'], default='torch')
+    parser.add_argument('--int8-cls', action='store_true', help='quantize.py 로 만든 INT8 성별 분류기 사용')
+    parser.add_argument('--max-batch', type=int, default=config.STREAM_MAX_BATCH,
+                        help='스트림 간 최대 배치 크기')
+    parser.add_argument('--max-wait-ms', type=float, default=config.STREAM_MAX_WAIT_MS,
+                        help='배치를 채우기 위해 기다리는 최대 시간 (ms, 지연 예산)')
+    parser.add_argument('--loop', action='store_true', help='영상 파일 소스를 끝에서 처음으로 반복 재생')
+    parser.add_argument('--realtime', action='store_true',
+                        help='영상 파일 소스를 원본 FPS 로 재생하고 밀리면 프레임을 버림 (라이브 카메라 모사)')
+    parser.add_argument('--duration', type=float, default=None, help='실행 시간 (초, 기본: 종료 신호까지)')
+    parser.add_argument('--video-backend', type=str, choices=['auto', 'pyav', 'ffmpeg', 'opencv'],
+                        default=config.VIDEO_BACKEND, help='결과 영상 인코드 백엔드')
+    parser.add_argument('--codec', type=str, default=config.VIDEO_CODEC,
+                        help='결과 영상 인코더 (pyav / ffmpeg: libx264, libx265, h264_nvenc ..., opencv: mp4v 등 FourCC)')
+    parser.add_argument('--crf', type=int, default=config.VIDEO_CRF, help='결과 영상 품질 (낮을수록 고화질)')
+    parser.add_argument('--preset', type=str, default=config.VIDEO_PRESET, help='인코딩 속도 프리셋 (ultrafast ~ veryslow)')
+    args = parser.parse_args()
+
+    # 스트림별 상태가 없는 탐지기 / 분류기만 공유 (FastPersonDetector 로 임의 크기 배치)
+    model = ThreatVideoDiscriminator(use_classifier=not args.no_cls, fast_detector=True,
+                                     det_model_path=args.det_model, cls_model_path=args.cls_model,
+                                     backend=args.backend, quantized_classifier=args.int8_cls)
+    server = MultiStreamServer(model, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    video_options = dict(codec=args.codec, crf=args.crf, preset=args.preset)
+    for k, spec in enumerate(args.source):
+        name, uri = parse_source(spec, k)
+        stream = CameraStream(name, uri, loop=args.loop, realtime=True if args.realtime else None)
+        server.add_stream(stream, VideoFileSink(os.path.join(args.output, f"{name}.mp4"),
+                                                video_backend=args.video_backend, video_options=video_options))
+        logger.info(f"📷 {name}: {uri}")
+
+    signal.signal(signal.SIGINT, lambda *_: server.stop())
+    signal.signal(signal.SIGTERM, lambda *_: server.stop())
+    stats = server.run(duration=args.duration)
+
+    logger.info(f"📊 배치 {stats['batches']}회, 평균 배치 크기 {stats['mean_batch']:.2f}, "
+                f"평균 추론 {stats['mean_infer_ms']:.1f} ms")
+    for name, s in stats["streams"].items():
+        logger.info(f"📊 {name}: {s}")
+
+
+if __name__ == "__main__":
+    main()
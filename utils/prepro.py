@@ -1,4 +1,5 @@
 from ultralytics.nn.autobackend import AutoBackend
+import os
 import torch
 import cv2
 import numpy as np
@@ -43,6 +44,29 @@ def xywh2xyxy(x):
     y[..., 3] = x[..., 1] + x[..., 3] / 2  # bottom right y
     return y
 
+def scale_boxes(img1_shape, boxes, img0_shape):
+    """
+    Rescale xyxy boxes from the letterboxed image shape (img1_shape) back to the original image shape (img0_shape)
+    and clip them to the original image.
+
+    Args:
+        img1_shape (tuple): (height, width) of the letterboxed image the boxes were predicted on.
+        boxes (torch.Tensor): (N, 4+) boxes in (x1, y1, x2, y2) format. Modified in place.
+        img0_shape (tuple): (height, width) of the original image.
+    Returns:
+        boxes (torch.Tensor): The rescaled boxes.
+    """
+    gain = min(img1_shape[0] / img0_shape[0], img1_shape[1] / img0_shape[1])  # gain  = old / new
+    pad_w = round((img1_shape[1] - img0_shape[1] * gain) / 2 - 0.1)
+    pad_h = round((img1_shape[0] - img0_shape[0] * gain) / 2 - 0.1)
+    boxes[..., [0, 2]] -= pad_w
+    boxes[..., [1, 3]] -= pad_h
+    boxes[..., :4] /= gain
+    boxes[..., [0, 2]] = boxes[..., [0, 2]].clamp(0, img0_shape[1])
+    boxes[..., [1, 3]] = boxes[..., [1, 3]].clamp(0, img0_shape[0])
+    return boxes
+
+
 def non_max_suppression(
     prediction,
     conf_thres=0.25,
@@ -291,4 +315,73 @@ def is_within_bounds(lt_x, lt_y, rb_x, rb_y, max_value=640):
 
 
 def load_model(model_path, device = torch.device(DEVICE)):
-    return AutoBackend(weights=model_path, device=device)
\ No newline at end of file
+    return AutoBackend(weights=model_path, device=device)
+
+
+BACKENDS = ("torch", "onnxruntime", "openvino")
+
+
+def backend_model_path(model_path, backend="torch"):
+    """
+    Return the weights path AutoBackend should load for the given inference backend.
+    Exported files follow the ultralytics naming next to the .pt file (see export.py):
+        torch       -> models/PersonDet_v3.2.0.pt
+        onnxruntime -> models/PersonDet_v3.2.0.onnx
+        openvino    -> models/PersonDet_v3.2.0_openvino_model/
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    if backend == "torch":
+        return model_path
+    stem = os.path.splitext(model_path)[0]
+    path = f"{stem}.onnx" if backend == "onnxruntime" else f"{stem}_openvino_model"
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{backend} model not found: {path} (run `python export.py` first)")
+    return path
+
+
+def quantized_model_path(model_path):
+    """Return the INT8 ONNX path produced by quantize.py for the given .pt weights."""
+    return f"{os.path.splitext(model_path)[0]}_int8.onnx"
+
+
+def merge_tiled_detections(dets, iou_thres=0.5, ios_thres=0.8, max_det=300):
+    """
+    Merge detections gathered from overlapping tiles (and the full-frame pass) of one image.
+
+    The boxes are packed back into the YOLO output layout (1, 4 + nc, N) so that the same
+    non_max_suppression is applied across tiles. Boxes mostly covered by a higher scoring box
+    (intersection over the smaller box >= ios_thres), typical for people cut at a tile border,
+    are then dropped as well.
+
+    Args:
+        dets (torch.Tensor): (N, 6) detections in image coordinates (x1, y1, x2, y2, conf, cls).
+    Returns:
+        (torch.Tensor): (M, 6) merged detections sorted by confidence.
+    """
+    if len(dets) < 2:
+        return dets
+    nc = int(dets[:, 5].max().item()) + 1
+    pred = torch.zeros((1, 4 + nc, len(dets)), device=dets.device)
+    pred[0, 0] = (dets[:, 0] + dets[:, 2]) / 2
+    pred[0, 1] = (dets[:, 1] + dets[:, 3]) / 2
+    pred[0, 2] = dets[:, 2] - dets[:, 0]
+    pred[0, 3] = dets[:, 3] - dets[:, 1]
+    pred[0, 4 + dets[:, 5].long(), torch.arange(len(dets))] = dets[:, 4].float()
+    out = non_max_suppression(pred, conf_thres=0.0, iou_thres=iou_thres, max_det=max_det)[0]
+    if len(out) < 2:
+        return out
+
+    # inter = iou * (area_a + area_b) / (1 + iou)
+    iou = box_iou(out[:, :4], out[:, :4])
+    area = (out[:, 2] - out[:, 0]) * (out[:, 3] - out[:, 1])
+    inter = iou * (area[:, None] + area[None]) / (1 + iou)
+    ios = inter / torch.min(area[:, None], area[None]).clamp(min=1e-7)
+    same_cls = out[:, 5:6] == out[:, 5:6].T
+    keep = torch.ones(len(out), dtype=torch.bool, device=out.device)
+    for i in range(len(out)):
+        if keep[i]:
+            covered = (ios[i] >= ios_thres) & same_cls[i]
+            covered[:i + 1] = False
+            keep &= ~covered
+    return out[keep]
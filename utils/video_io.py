@@ -0,0 +1,459 @@
+import json
+import shutil
+import subprocess
+from abc import ABC, abstractmethod
+from fractions import Fraction
+import cv2
+import numpy as np
+from utils.custom_logger import custom_logger
+import config
+
+try:
+    import av
+except ImportError:
+    av = None
+
+logger = custom_logger(__name__)
+
+BACKENDS = ("auto", "pyav", "ffmpeg", "opencv")
+
+
+def resolve_backend(backend: str = config.VIDEO_BACKEND) -> str:
+    """auto 이면 PyAV → ffmpeg 실행 파일 → OpenCV 순으로 사용 가능한 백엔드를 고릅니다."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown video backend: {backend} (choose from {BACKENDS})")
+    if backend == "auto":
+        if av is not None:
+            return "pyav"
+        if shutil.which("ffmpeg"):
+            return "ffmpeg"
+        return "opencv"
+    if backend == "pyav" and av is None:
+        raise ImportError("PyAV is not installed: pip install av")
+    if backend == "ffmpeg" and not shutil.which("ffmpeg"):
+        raise RuntimeError("ffmpeg executable not found in PATH")
+    return backend
+
+
+def probe(path: str):
+    """
+    영상 메타데이터 (fps, (width, height), frame_count). 열 수 없으면 None.
+    ffprobe 가 있으면 사용하고, 없으면 OpenCV 로 읽습니다.
+    """
+    if shutil.which("ffprobe"):
+        out = subprocess.run(["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries",
+                              "stream=width,height,avg_frame_rate,nb_frames", "-of", "json", path],
+                             capture_output=True, text=True)
+        streams = json.loads(out.stdout or "{}").get("streams") if out.returncode == 0 else None
+        if not streams:
+            return None
+        info = streams[0]
+        num, _, den = (info.get("avg_frame_rate") or "0/0").partition("/")
+        fps = float(num) / float(den) if den and float(den) else 30.0
+        return fps, (int(info["width"]), int(info["height"])), int(info.get("nb_frames") or 0)
+
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return None
+        return (cap.get(cv2.CAP_PROP_FPS) or 30.0,
+                (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    finally:
+        cap.release()
+
+
+def _scaled_size(src_size, width):
+    """가로 width 로 비율 유지 축소한 (w, h). 인코더 호환을 위해 짝수로 맞춤. 원본보다 크면 원본 크기"""
+    w, h = src_size
+    if not width or width >= w:
+        return w, h
+    return width - width % 2, max(2, int(round(h * width / w / 2)) * 2)
+
+
+def _even_size(size):
+    """yuv420p 인코딩은 가로 / 세로가 짝수여야 하므로 홀수 크기는 1 픽셀 늘린 (w, h)"""
+    return size[0] + size[0] % 2, size[1] + size[1] % 2
+
+
+class VideoReader(ABC):
+    """
+    cv2.VideoCapture 호환 읽기 인터페이스 (read / grab / get / set / isOpened / release)
+
+    width 를 주면 디코드 단계에서 가로 width 로 축소한 프레임을 돌려줍니다.
+    fps, size (출력 프레임 크기), source_size (원본 크기), frame_count 속성을 제공합니다.
+    """
+
+    fps = 30.0
+    size = (0, 0)
+    source_size = (0, 0)
+    frame_count = 0
+    position = 0
+
+    @abstractmethod
+    def isOpened(self):
+        ...
+
+    @abstractmethod
+    def read(self):
+        ...
+
+    @abstractmethod
+    def release(self):
+        ...
+
+    def get(self, prop_id):
+        return float({cv2.CAP_PROP_FPS: self.fps,
+                      cv2.CAP_PROP_FRAME_WIDTH: self.size[0],
+                      cv2.CAP_PROP_FRAME_HEIGHT: self.size[1],
+                      cv2.CAP_PROP_FRAME_COUNT: self.frame_count,
+                      cv2.CAP_PROP_POS_FRAMES: self.position}.get(prop_id, 0.0))
+
+    def set(self, prop_id, value):
+        if prop_id != cv2.CAP_PROP_POS_FRAMES:
+            return False
+        self._seek(int(value))
+        return True
+
+    def grab(self):
+        return self.read()[0]
+
+    @abstractmethod
+    def _seek(self, index):
+        """다음 read 가 index 번째 프레임을 돌려주도록 위치를 옮김"""
+
+
+class OpenCVReader(VideoReader):
+    """cv2.VideoCapture. 축소는 디코드 후 cv2.resize (INTER_AREA)"""
+
+    def __init__(self, path: str, width: int = None, threads: int = 0):
+        params = [cv2.CAP_PROP_N_THREADS, threads] if threads and hasattr(cv2, "CAP_PROP_N_THREADS") else []
+        self.cap = cv2.VideoCapture(path, cv2.CAP_ANY, params) if params else cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.source_size = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.size = _scaled_size(self.source_size, width)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self.position += 1
+            if self.size != self.source_size:
+                frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return ret, frame
+
+    def grab(self):
+        ret = self.cap.grab()
+        self.position += ret
+        return ret
+
+    def set(self, prop_id, value):
+        ok = self.cap.set(prop_id, value)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        return ok
+
+    def _seek(self, index):
+        self.set(cv2.CAP_PROP_POS_FRAMES, index)
+
+    def release(self):
+        self.cap.release()
+
+
+class PyAVReader(VideoReader):
+    """
+    PyAV (libavcodec) 디코더. 프레임 / 슬라이스 스레드 디코드를 켜고,
+    축소와 BGR 변환은 swscale 한 번으로 처리합니다 (VideoFrame.to_ndarray).
+    """
+
+    def __init__(self, path: str, width: int = None, threads: int = 0):
+        self.path = path
+        self.width = width
+        self.threads = threads
+        self.container = None
+        try:
+            self._open()
+        except av.error.FFmpegError as e:
+            logger.error(f"Cannot open video: {path} ({e})")
+            self.container = None
+
+    def _open(self):
+        self.container = av.open(self.path)
+        stream = self.container.streams.video[0]
+        stream.thread_type = "AUTO"
+        if self.threads:
+            stream.codec_context.thread_count = self.threads
+        self.stream = stream
+        self.fps = float(stream.average_rate or stream.guessed_rate or 30.0)
+        self.source_size = (stream.codec_context.width, stream.codec_context.height)
+        self.size = _scaled_size(self.source_size, self.width)
+        self.frame_count = stream.frames or 0
+        self._frames = self.container.decode(stream)
+        self._pending = None  # seek 에서 목표 위치를 찾느라 미리 디코드한 프레임
+        self.position = 0
+
+    def isOpened(self):
+        return self.container is not None
+
+    def _next(self):
+        if self.container is None:
+            return None
+        if self._pending is not None:
+            frame, self._pending = self._pending, None
+            return frame
+        try:
+            return next(self._frames)
+        except (StopIteration, av.error.FFmpegError):
+            return None
+
+    def read(self):
+        frame = self._next()
+        if frame is None:
+            return False, None
+        self.position += 1
+        w, h = self.size
+        return True, frame.to_ndarray(format="bgr24", width=w, height=h)
+
+    def grab(self):
+        if self._next() is None:
+            return False
+        self.position += 1
+        return True
+
+    def _seek(self, index):
+        """
+        index 이하의 가장 가까운 키프레임으로 seek 한 뒤, pts 가 index 번째 프레임 시각에 닿을 때까지 디코드합니다.
+        (구간 병렬 처리 / 재렌더링에서 앞부분 전체를 디코드하지 않도록)
+        seek 가 목표를 지나친 경우 (MPEG-TS 등) 1, 2, 4 초 앞에서 다시 시도하고,
+        그래도 안 되거나 pts 가 없는 스트림은 처음부터 다시 디코드하며 건너뜁니다.
+        """
+        if self.container is None:
+            return
+        self._pending = None
+        if index > 0:
+            stream = self.stream
+            start = stream.start_time or 0
+            frame_pts = 1 / (self.fps * stream.time_base)  # 한 프레임의 pts 간격
+            target = start + int(round(index * frame_pts))
+            for back in (0, 1, 2, 4):
+                found = self._seek_pts(max(target - int(back / stream.time_base), start), target, frame_pts / 2)
+                if found is not None:
+                    self.position = index
+                    return
+        self.release()
+        self._open()
+        for _ in range(index):
+            if not self.grab():
+                break
+
+    def _seek_pts(self, seek_pts, target, tol):
+        """seek_pts 에서 디코드를 시작하여 target 프레임을 _pending 에 둡니다. 지나쳤거나 pts 가 없으면 None"""
+        try:
+            self.container.seek(seek_pts, backward=True, any_frame=False, stream=self.stream)
+            self._frames = self.container.decode(self.stream)
+            first = True
+            while True:
+                frame = next(self._frames)
+                if frame.pts is None or (first and frame.pts > target + tol):
+                    return None
+                first = False
+                if frame.pts >= target - tol:
+                    self._pending = frame
+                    return frame
+        except StopIteration:
+            # 디코드한 프레임이 모두 목표 앞이면 영상 끝 이후, 하나도 없으면 마지막 키프레임 뒤로 지나친 것
+            return None if first else False
+        except av.error.FFmpegError:
+            return None
+
+    def release(self):
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+
+
+class FFmpegReader(VideoReader):
+    """
+    ffmpeg 하위 프로세스 디코더. rawvideo (bgr24) 를 파이프로 받아 별도 프로세스에서 디코드 / 축소합니다.
+    메타데이터는 probe() 로 읽습니다.
+    """
+
+    def __init__(self, path: str, width: int = None, threads: int = 0):
+        self.path = path
+        self.threads = threads
+        self.proc = None
+        meta = probe(path)
+        if meta is None:
+            logger.error(f"Cannot open video: {path}")
+            return
+        self.fps, self.source_size, self.frame_count = meta
+        self.size = _scaled_size(self.source_size, width)
+        self._frame_bytes = self.size[0] * self.size[1] * 3
+        self._start(0)
+
+    def _start(self, index):
+        cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+        if self.threads:
+            cmd += ["-threads", str(self.threads)]
+        if index:
+            cmd += ["-ss", f"{index / self.fps:.6f}"]  # 입력 앞 -ss: 키프레임 seek 후 정확한 위치까지 디코드
+        cmd += ["-i", self.path, "-map", "0:v:0"]
+        if self.size != self.source_size:
+            cmd += ["-vf", f"scale={self.size[0]}:{self.size[1]}:flags=area"]
+        cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "-"]
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=self._frame_bytes)
+        self.position = index
+
+    def isOpened(self):
+        return self.proc is not None
+
+    def read(self):
+        if self.proc is None:
+            return False, None
+        buf = bytearray(self._frame_bytes)
+        view, got = memoryview(buf), 0
+        while got < self._frame_bytes:
+            n = self.proc.stdout.readinto(view[got:])
+            if not n:
+                return False, None
+            got += n
+        self.position += 1
+        return True, np.frombuffer(buf, dtype=np.uint8).reshape(self.size[1], self.size[0], 3)
+
+    def _seek(self, index):
+        self.release()
+        self._start(index)
+
+    def release(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc.stdout.close()
+            self.proc = None
+
+
+class OpenCVWriter:
+    """cv2.VideoWriter. codec 이 4글자 FourCC 가 아니거나 열 수 없으면 mp4v 로 대체 (crf / preset 무시)"""
+
+    def __init__(self, path, fps, size, codec: str = "mp4v", **_):
+        fourcc = codec if len(codec) == 4 else "mp4v"
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self.writer.isOpened() and fourcc != "mp4v":
+            logger.warning(f"OpenCV 에서 {fourcc} 인코더를 열 수 없어 mp4v 로 대체합니다")
+            self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+
+    def isOpened(self):
+        return self.writer.isOpened()
+
+    def write(self, frame):
+        self.writer.write(frame)
+
+    def release(self):
+        self.writer.release()
+
+
+class PyAVWriter:
+    """PyAV (libavcodec) 인코더. H.264 등 codec 과 crf / preset 을 지정합니다. 홀수 크기는 아래 / 오른쪽 1 픽셀을 검게 채움"""
+
+    def __init__(self, path, fps, size, codec: str = config.VIDEO_CODEC, crf: int = config.VIDEO_CRF,
+                 preset: str = config.VIDEO_PRESET):
+        self.container = av.open(path, "w")
+        stream = self.container.add_stream(codec, rate=Fraction(fps).limit_denominator(1001))
+        self.size = tuple(size)
+        self._pad = (_even_size(size)[1] - size[1], _even_size(size)[0] - size[0])  # (아래, 오른쪽)
+        stream.width, stream.height = _even_size(size)
+        stream.pix_fmt = "yuv420p"
+        stream.thread_type = "AUTO"
+        stream.options = {"crf": str(crf), "preset": preset}
+        self.stream = stream
+
+    def isOpened(self):
+        return self.container is not None
+
+    def write(self, frame):
+        if any(self._pad):
+            frame = cv2.copyMakeBorder(frame, 0, self._pad[0], 0, self._pad[1], cv2.BORDER_CONSTANT, value=0)
+        for packet in self.stream.encode(av.VideoFrame.from_ndarray(frame, format="bgr24")):
+            self.container.mux(packet)
+
+    def release(self):
+        if self.container is None:
+            return
+        for packet in self.stream.encode():
+            self.container.mux(packet)
+        self.container.close()
+        self.container = None
+
+
+class FFmpegWriter:
+    """
+    ffmpeg 하위 프로세스 인코더. bgr24 rawvideo 를 stdin 파이프로 넘겨 별도 프로세스에서 인코딩합니다.
+    홀수 크기는 pad 필터로 짝수로 채워 인코딩합니다.
+    """
+
+    def __init__(self, path, fps, size, codec: str = config.VIDEO_CODEC, crf: int = config.VIDEO_CRF,
+                 preset: str = config.VIDEO_PRESET):
+        self.size = tuple(size)
+        cmd = ["ffmpeg", "-y", "-v", "error", "-f", "rawvideo", "-pix_fmt", "bgr24",
+               "-s", f"{size[0]}x{size[1]}", "-r", f"{fps:.6f}", "-i", "-",
+               "-c:v", codec, "-crf", str(crf), "-preset", preset, "-pix_fmt", "yuv420p"]
+        if _even_size(size) != self.size:
+            cmd += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]  # yuv420p 는 홀수 크기를 인코딩할 수 없음
+        cmd.append(path)
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def isOpened(self):
+        return self.proc is not None
+
+    def write(self, frame):
+        if frame.shape[1::-1] != self.size:
+            raise ValueError(f"Frame size {frame.shape[1::-1]} does not match writer size {self.size}")
+        self.proc.stdin.write(np.ascontiguousarray(frame).data)
+
+    def release(self):
+        if self.proc is None:
+            return
+        self.proc.stdin.close()
+        code = self.proc.wait()
+        self.proc = None
+        if code != 0:
+            raise RuntimeError(f"ffmpeg encoder exited with code {code}")
+
+
+_READERS = {"pyav": PyAVReader, "ffmpeg": FFmpegReader, "opencv": OpenCVReader}
+_WRITERS = {"pyav": PyAVWriter, "ffmpeg": FFmpegWriter, "opencv": OpenCVWriter}
+
+
+def open_reader(path: str, backend: str = config.VIDEO_BACKEND, width: int = None,
+                threads: int = config.VIDEO_DECODE_THREADS) -> VideoReader:
+    """
+    영상 읽기 객체를 엽니다 (cv2.VideoCapture 호환).
+
+    Args:
+        path (str): 영상 경로 (OpenCV 백엔드는 RTSP 등 URL 도 가능)
+        backend (str): auto / pyav / ffmpeg / opencv
+        width (int): 디코드 출력 가로 크기 (비율 유지 축소). None 이면 원본 해상도
+        threads (int): 디코드 스레드 수 (0: 자동)
+    """
+    return _READERS[resolve_backend(backend)](path, width=width, threads=threads)
+
+
+def open_writer(path: str, fps: float, size, backend: str = config.VIDEO_BACKEND,
+                codec: str = config.VIDEO_CODEC, crf: int = config.VIDEO_CRF, preset: str = config.VIDEO_PRESET):
+    """
+    영상 쓰기 객체를 엽니다 (write / release).
+
+    Args:
+        size (tuple): (width, height)
+        codec (str): pyav / ffmpeg 는 인코더 이름 (libx264, libx265, h264_nvenc ...),
+            opencv 는 4글자 FourCC (그 외는 mp4v)
+        crf (int): 품질 (낮을수록 고화질, libx264 기본 23)
+        preset (str): 인코딩 속도 / 압축률 (ultrafast ... veryslow)
+    """
+    backend = resolve_backend(backend)
+    if backend == "opencv" and len(codec) != 4:
+        codec = "mp4v"
+    return _WRITERS[backend](path, fps, tuple(size), codec=codec, crf=crf, preset=preset)